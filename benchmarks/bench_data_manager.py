@@ -0,0 +1,165 @@
+# benchmarks/bench_data_manager.py
+"""
+Times the database core DataManager runs on (database.async_repository)
+against synthetic databases. Every call is awaited, so the numbers include
+the hop to the database executor that GUI requests make too.
+
+    python -m benchmarks.bench_data_manager --sizes 1000,10000
+    python -m benchmarks.bench_data_manager --sizes 100000 --scenarios notes. --compare old.json
+
+Run from the project root. Needs no Qt. Generated corpora
+are cached in --corpus-dir and copied before each run, so write scenarios
+never change the cached data.
+"""
+
+import argparse
+import asyncio
+import logging
+import random
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+from database.async_repository import AsyncRepository, RowStream
+from database.models import Note, Snippet
+from benchmarks.corpus import RARE_TOKEN, CorpusGenerator, corpus_summary, ensure_corpus
+from benchmarks.results import DEFAULT_REGRESSION_THRESHOLD, compare_results, format_comparison, format_results, load_results, measure, new_results, parse_sizes, summarize, write_results
+
+logger = logging.getLogger(__name__)
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_CORPUS_DIR = Path(tempfile.gettempdir()) / "notes_manager_bench"
+DEFAULT_RESULTS_DIR = ROOT / "benchmarks" / "results"
+NO_MATCH_QUERY = "qqxnomatchqq"
+
+async def _first_chunk(stream: RowStream) -> int:
+    """Reads a stream's first chunk and abandons the rest (time to first visible row)."""
+    async with stream: return len(await stream.__anext__())
+
+async def _all_chunks(stream: RowStream) -> int:
+    async with stream:
+        async for _ in stream: pass
+    return stream.rows_read
+
+def _read_scenarios(core: AsyncRepository, run: Callable, gen: CorpusGenerator) -> List[Tuple[str, Callable[[], int]]]:
+    """Read-only scenarios, repeated --repeat times each. Every callable returns the row count."""
+    return [
+        ("notes.load_all", lambda: len(run(core.list_notes()))),
+        ("notes.tag_filter_common", lambda: len(run(core.list_notes(gen.common_tag())))),
+        ("notes.tag_filter_rare", lambda: len(run(core.list_notes(gen.rare_tag())))),
+        ("notes.search_common_word", lambda: len(run(core.search_notes(gen.common_word())))),
+        ("notes.search_mid_word", lambda: len(run(core.search_notes(gen.mid_word())))),
+        ("notes.search_rare_token", lambda: len(run(core.search_notes(RARE_TOKEN)))),
+        ("notes.search_no_match", lambda: len(run(core.search_notes(NO_MATCH_QUERY)))),
+        ("notes.search_with_tag", lambda: len(run(core.search_notes(gen.common_word(), gen.common_tag())))),
+        ("notes.stream_first_chunk", lambda: run(_first_chunk(core.stream_notes()))),
+        ("notes.stream_all", lambda: run(_all_chunks(core.stream_notes()))),
+        ("notes.stream_search_first_chunk", lambda: run(_first_chunk(core.stream_notes(gen.common_word())))),
+        ("snippets.load_all", lambda: len(run(core.list_snippets()))),
+        ("snippets.tag_filter_common", lambda: len(run(core.list_snippets(gen.common_tag())))),
+        ("snippets.search_common_word", lambda: len(run(core.search_snippets(gen.common_word())))),
+        ("snippets.search_language", lambda: len(run(core.search_snippets("Python")))),
+        ("snippets.search_no_match", lambda: len(run(core.search_snippets(NO_MATCH_QUERY)))),
+        ("snippets.stream_first_chunk", lambda: run(_first_chunk(core.stream_snippets()))),
+        ("tags.refresh", lambda: len(run(core.all_tags()))),
+        ("recent.load", lambda: len(run(core.recent_items(20)))),
+    ]
+
+def _run_bursts(core: AsyncRepository, run: Callable, gen: CorpusGenerator, burst: int, wanted: Callable[[str], bool]) -> Dict[str, dict]:
+    """Add, update, then delete `burst` notes and snippets, timing each call. Leaves the row counts unchanged."""
+    results = {}
+    def timed(name: str, items: list, call: Callable) -> list:
+        samples = []; outputs = []
+        for item in items:
+            started = time.perf_counter(); outputs.append(call(item)); samples.append(time.perf_counter() - started)
+        if wanted(name): results[name] = summarize(samples, rows=len(items))
+        return outputs
+
+    rng = random.Random(gen.seed)
+    notes = [Note(title=f"Bench note {i}", content=gen.note_html(), tags=gen.item_tags()) for i in range(burst)]
+    added = timed("notes.add_burst", notes, lambda note: run(core.add_note(note)))
+    for note in added: note.content = gen.note_html(); note.tags = gen.item_tags()
+    timed("notes.update_burst", rng.sample(added, len(added)), lambda note: run(core.update_note(note)))
+    timed("notes.delete_burst", [note.id for note in added], lambda note_id: run(core.delete_note(note_id)))
+
+    snippets = []
+    for i in range(burst):
+        language = rng.choice(("Python", "JavaScript", "SQL"))
+        snippets.append(Snippet(title=f"Bench snippet {i}", code=gen.snippet_code(language), language=language, tags=gen.item_tags()))
+    added = timed("snippets.add_burst", snippets, lambda snippet: run(core.add_snippet(snippet)))
+    for snippet in added: snippet.code = gen.snippet_code(snippet.language)
+    timed("snippets.update_burst", rng.sample(added, len(added)), lambda snippet: run(core.update_snippet(snippet)))
+    timed("snippets.delete_burst", [snippet.id for snippet in added], lambda snippet_id: run(core.delete_snippet(snippet_id)))
+    return results
+
+def run_dataset(corpus_path: Path, gen: CorpusGenerator, work_dir: Path, repeat: int, burst: int, wanted: Callable[[str], bool]) -> Dict[str, dict]:
+    work_path = work_dir / corpus_path.name
+    shutil.copyfile(corpus_path, work_path)
+    core = AsyncRepository.open(work_path); loop = asyncio.new_event_loop()
+    try:
+        results = {}
+        for name, func in _read_scenarios(core, loop.run_until_complete, gen):
+            if not wanted(name): continue
+            samples, rows = measure(func, repeat)
+            results[name] = summarize(samples, rows=rows)
+            logger.info("%s: median %.3f ms (%s rows)", name, results[name]["median_ms"], rows)
+        if burst > 0: results.update(_run_bursts(core, loop.run_until_complete, gen, burst, wanted))
+        return results
+    finally:
+        loop.close(); core.close()
+        work_path.unlink(missing_ok=True)
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bench_data_manager", description="Benchmark the database core on synthetic databases.")
+    parser.add_argument("--sizes", default="1k,10k", help="Comma-separated note counts, e.g. 1k,10k,100k,1m (default: 1k,10k)")
+    parser.add_argument("--snippet-ratio", type=float, default=1.0, help="Snippets per note (default: 1.0)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--content-scale", type=float, default=1.0, help="Multiplies note and snippet lengths")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per read scenario (after one warm-up run)")
+    parser.add_argument("--burst", type=int, default=100, help="Operations per add/update/delete burst (0 skips bursts)")
+    parser.add_argument("--scenarios", default="", help="Comma-separated scenario name prefixes to run (default: all)")
+    parser.add_argument("--corpus-dir", type=Path, default=DEFAULT_CORPUS_DIR, help=f"Cache for generated databases (default: {DEFAULT_CORPUS_DIR})")
+    parser.add_argument("--out", type=Path, default=None, help="Results JSON path (default: benchmarks/results/data_manager-<time>.json)")
+    parser.add_argument("--compare", type=Path, default=None, help="Baseline results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_REGRESSION_THRESHOLD, help="Regression threshold in percent (default: %(default)s)")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Exit with status 1 if the comparison finds regressions")
+    parser.add_argument("--verbose", action="store_true")
+    return parser
+
+def main(argv: List[str] = None) -> int:
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    logging.getLogger("benchmarks").setLevel(logging.INFO)
+    prefixes = [p.strip() for p in args.scenarios.split(",") if p.strip()]
+    wanted = lambda name: not prefixes or any(name.startswith(prefix) for prefix in prefixes)
+    sizes = parse_sizes(args.sizes)
+    results = new_results("data_manager", ROOT, {"sizes": sizes, "snippet_ratio": args.snippet_ratio, "seed": args.seed, "content_scale": args.content_scale, "repeat": args.repeat, "burst": args.burst})
+    results["datasets"] = {}
+
+    with tempfile.TemporaryDirectory(prefix="notes_bench_") as work_dir:
+        for size in sizes:
+            snippets = int(size * args.snippet_ratio)
+            corpus_path, gen = ensure_corpus(args.corpus_dir, size, snippets, args.seed, args.content_scale)
+            dataset = f"{size}n-{snippets}s"
+            results["datasets"][dataset] = corpus_summary(corpus_path)
+            logger.info("Running dataset %s", dataset)
+            results["results"][dataset] = run_dataset(corpus_path, gen, Path(work_dir), args.repeat, args.burst, wanted)
+
+    out = args.out or DEFAULT_RESULTS_DIR / f"data_manager-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    write_results(results, out)
+    print(format_results(results))
+    print(f"Results written to {out}")
+
+    if args.compare:
+        rows = compare_results(load_results(args.compare), results, args.threshold)
+        print(format_comparison(rows))
+        if args.fail_on_regression and any(row["status"] == "regression" for row in rows): return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
+
+# benchmarks/bench_data_manager.py
+# --- END OF FILE bench_data_manager.py ---
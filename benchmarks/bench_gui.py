@@ -0,0 +1,367 @@
+# benchmarks/bench_gui.py
+"""
+Times the user-facing Qt work: list population, tag filter switches, opening,
+closing and waking hibernated editor tabs, typing bursts and syntax
+highlighting of large snippets. MainWindow is driven with an in-memory SyntheticDataManager that
+answers requests from memory, so only UI cost is measured.
+
+    QT_QPA_PLATFORM=offscreen python -m benchmarks.bench_gui --sizes 1000,5000
+    QT_QPA_PLATFORM=offscreen python -m benchmarks.bench_gui --compare old.json
+
+Each timed step includes processing the events it posts (layout, paint), so
+the numbers correspond to how long the window is unresponsive.
+"""
+
+import argparse
+import logging
+import os
+import random
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+from PyQt6.QtGui import QTextDocument
+from PyQt6.QtTest import QTest
+from PyQt6.QtWidgets import QApplication, QMessageBox
+from database.async_repository import STREAM_CHUNK, STREAM_FIRST_CHUNK
+from database.models import Note, Snippet
+from benchmarks.corpus import CORPUS_END, CorpusGenerator
+from benchmarks.results import DEFAULT_REGRESSION_THRESHOLD, compare_results, format_comparison, format_results, load_results, measure, new_results, parse_sizes, summarize, write_results
+
+logger = logging.getLogger(__name__)
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_RESULTS_DIR = ROOT / "benchmarks" / "results"
+TYPING_TEXT = "The quick brown fox jumps over the lazy dog 0123456789 "
+
+class _SyntheticMaintenance(QObject):
+    problem_detected = pyqtSignal(str, str)
+
+class SyntheticDataManager(QObject):
+    """
+    Stands in for DataManager with the same signals. Requests are answered
+    immediately from in-memory lists instead of a worker thread; streamed
+    queries send all their chunks on the next event-loop tick, after the
+    caller has stored the stream id.
+    """
+    note_added = pyqtSignal(Note)
+    note_updated = pyqtSignal(Note)
+    note_deleted = pyqtSignal(int)
+    all_notes_loaded = pyqtSignal(list)
+    note_searched = pyqtSignal(list)
+    snippet_added = pyqtSignal(Snippet)
+    snippet_updated = pyqtSignal(Snippet)
+    snippet_deleted = pyqtSignal(int)
+    all_snippets_loaded = pyqtSignal(list)
+    snippet_searched = pyqtSignal(list)
+    recent_items_loaded = pyqtSignal(list)
+    all_tags_loaded = pyqtSignal(list)
+    tags_updated = pyqtSignal()
+    db_error = pyqtSignal(str, str)
+    backup_progress = pyqtSignal(int, int)
+    backup_completed = pyqtSignal(str)
+    notes_chunk_loaded = pyqtSignal(int, list, bool)
+    snippets_chunk_loaded = pyqtSignal(int, list, bool)
+
+    def __init__(self, notes: List[Note], snippets: List[Snippet]):
+        super().__init__()
+        self._last_stream_id = 0
+        self.maintenance = _SyntheticMaintenance(self)
+        self.set_items(notes, snippets)
+
+    def set_items(self, notes: List[Note], snippets: List[Snippet]):
+        self.notes = notes; self.snippets = snippets
+        self._notes_by_id = {note.id: note for note in notes}; self._snippets_by_id = {snippet.id: snippet for snippet in snippets}
+        # Precomputed so tag filter timings contain no filtering cost of the stand-in itself.
+        self._notes_by_tag: Dict[str, List[Note]] = {}; self._snippets_by_tag: Dict[str, List[Snippet]] = {}
+        for index, items in ((self._notes_by_tag, notes), (self._snippets_by_tag, snippets)):
+            for item in items:
+                for tag in (t.strip() for t in (item.tags or "").split(",")):
+                    if tag: index.setdefault(tag, []).append(item)
+        self.tags = sorted(set(self._notes_by_tag) | set(self._snippets_by_tag))
+        self._next_id = max([0] + list(self._notes_by_id) + list(self._snippets_by_id)) + 1
+
+    # --- DataManager API used by MainWindow and the editors ---
+    def has_pending_tasks(self) -> bool: return False
+    def start_maintenance(self, idle_minutes: float): pass
+    def notify_user_activity(self): pass
+    def configure_backups(self, interval_hours: float, keep: int, backup_dir=None): pass
+    def backup_now_async(self, compact: bool = False) -> bool: return False
+    def metrics_snapshot(self) -> dict: return {"tasks": {}}
+    def reset_metrics(self): pass
+    def load_all_notes_async(self, filter_tag: Optional[str] = None): self.all_notes_loaded.emit(self._notes_by_tag.get(filter_tag, []) if filter_tag else self.notes)
+    def load_all_snippets_async(self, filter_tag: Optional[str] = None): self.all_snippets_loaded.emit(self._snippets_by_tag.get(filter_tag, []) if filter_tag else self.snippets)
+    def search_notes_async(self, query: str, filter_tag: Optional[str] = None): self.note_searched.emit([n for n in self.notes if query in n.title])
+    def search_snippets_async(self, query: str, filter_tag: Optional[str] = None): self.snippet_searched.emit([s for s in self.snippets if query in s.title])
+    def load_all_tags_async(self): self.all_tags_loaded.emit(self.tags)
+    def stream_notes_async(self, query: Optional[str] = None, filter_tag: Optional[str] = None) -> int:
+        notes = self._notes_by_tag.get(filter_tag, []) if filter_tag else self.notes
+        return self._stream(self.notes_chunk_loaded, [n for n in notes if query in n.title] if query else notes)
+    def stream_snippets_async(self, query: Optional[str] = None, filter_tag: Optional[str] = None) -> int:
+        snippets = self._snippets_by_tag.get(filter_tag, []) if filter_tag else self.snippets
+        return self._stream(self.snippets_chunk_loaded, [s for s in snippets if query in s.title] if query else snippets)
+    def cancel_stream(self, stream_id: int): pass
+    def get_note_sync(self, note_id: int) -> Optional[Note]: return self._notes_by_id.get(note_id)
+    def get_snippet_sync(self, snippet_id: int) -> Optional[Snippet]: return self._snippets_by_id.get(snippet_id)
+    def get_attachment_sync(self, digest: str): return None
+    def add_attachment_sync(self, data: bytes, mime: str): return None
+    def add_note_async(self, note: Note): note.id = self._next_id; self._next_id += 1; self.note_added.emit(note)
+    def update_note_async(self, note: Note): self.note_updated.emit(note)
+    def delete_note_async(self, note_id: int): self.note_deleted.emit(note_id)
+    def add_snippet_async(self, snippet: Snippet): snippet.id = self._next_id; self._next_id += 1; self.snippet_added.emit(snippet)
+    def update_snippet_async(self, snippet: Snippet): self.snippet_updated.emit(snippet)
+    def delete_snippet_async(self, snippet_id: int): self.snippet_deleted.emit(snippet_id)
+    def shutdown(self): pass
+
+    def _stream(self, signal, items: list) -> int:
+        self._last_stream_id += 1; stream_id = self._last_stream_id
+        def send():
+            start, size = 0, STREAM_FIRST_CHUNK
+            while True:
+                chunk = items[start:start + size]; start += size; last = len(chunk) < size
+                signal.emit(stream_id, chunk, last)
+                if last: break
+                size = STREAM_CHUNK
+        QTimer.singleShot(0, send)
+        return stream_id
+
+def synthetic_items(gen: CorpusGenerator, notes: int, snippets: int):
+    """
+    Note and Snippet objects built from the benchmark corpus generator, newest
+    first like the DB queries return them. Note HTML is passed through
+    QTextDocument once, as it is when the application saves a note.
+    """
+    note_items = []; document = QTextDocument()
+    for i in range(notes):
+        title, content, tags, created, updated = gen.note_row(i, notes)
+        document.setHtml(content); content = document.toHtml()
+        note_items.append(Note(id=i + 1, title=title, content=content, tags=tags, created_at=datetime.fromisoformat(created), updated_at=datetime.fromisoformat(updated)))
+    snippet_items = []
+    for i in range(snippets):
+        title, code, language, tags, created = gen.snippet_row(i, snippets)
+        snippet_items.append(Snippet(id=notes + i + 1, title=title, code=code, language=language, tags=tags, created_at=datetime.fromisoformat(created)))
+    note_items.reverse(); snippet_items.reverse()
+    return note_items, snippet_items
+
+def auto_answer_prompts():
+    """Modal message boxes would block an unattended run; answer them the way a user discarding edits would."""
+    QMessageBox.question = staticmethod(lambda *args, **kwargs: QMessageBox.StandardButton.Discard)
+    QMessageBox.warning = staticmethod(lambda *args, **kwargs: QMessageBox.StandardButton.Ok)
+    QMessageBox.critical = staticmethod(lambda *args, **kwargs: QMessageBox.StandardButton.Ok)
+    QMessageBox.information = staticmethod(lambda *args, **kwargs: QMessageBox.StandardButton.Ok)
+
+class GuiBenchmark:
+    def __init__(self, app: QApplication, dm: SyntheticDataManager, repeat: int, wanted: Callable[[str], bool]):
+        from main import DEFAULT_SETTINGS
+        from ui.main_window import MainWindow
+        self.app = app; self.dm = dm; self.repeat = repeat; self.wanted = wanted
+        settings = dict(DEFAULT_SETTINGS); settings["window_geometry"] = {"x": 0, "y": 0, "width": 1200, "height": 800}
+        settings["maintenance_idle_minutes"] = 0; settings["backup_interval_hours"] = 0
+        self.window = MainWindow(dm, settings)
+        self.window.show(); self.settle()
+        self.rng = random.Random(1)
+
+    def settle(self):
+        self.app.processEvents(); self.app.processEvents()
+
+    def timed(self, func: Callable[[], object]) -> Callable[[], object]:
+        def run():
+            result = func(); self.settle(); return result
+        return run
+
+    def run(self, name: str, func: Callable[[], object], repeat: Optional[int] = None, rows: Optional[int] = None) -> Optional[dict]:
+        if not self.wanted(name): return None
+        samples, _ = measure(self.timed(func), repeat or self.repeat)
+        summary = summarize(samples, rows=rows)
+        logger.info("%s: median %.3f ms", name, summary["median_ms"])
+        return summary
+
+    def run_each(self, name: str, items: list, func: Callable[[object], object]) -> Optional[dict]:
+        """Times func(item) for every item separately (one sample per item)."""
+        if not self.wanted(name) or not items: return None
+        samples = []
+        for item in items:
+            started = time.perf_counter(); func(item); self.settle(); samples.append(time.perf_counter() - started)
+        return summarize(samples, rows=len(items))
+
+    # --- Scenarios ---
+    def list_scenarios(self) -> Dict[str, dict]:
+        dm = self.dm; results = {}
+        results["list.notes_rebuild"] = self.run("list.notes_rebuild", lambda: dm.all_notes_loaded.emit(dm.notes), rows=len(dm.notes))
+        results["list.snippets_rebuild"] = self.run("list.snippets_rebuild", lambda: dm.all_snippets_loaded.emit(dm.snippets), rows=len(dm.snippets))
+        half = dm.notes[::2]
+        results["list.notes_search_results"] = self.run("list.notes_search_results", lambda: dm.note_searched.emit(half), rows=len(half))
+        narrower = [note for i, note in enumerate(half) if i % 20] # One more typed character drops ~5% of the matches
+        refine_steps = [narrower if i % 2 == 0 else half for i in range(self.repeat * 2)]
+        results["list.notes_search_refine"] = self.run_each("list.notes_search_refine", refine_steps, lambda notes: dm.note_searched.emit(notes))
+
+        tags = [tag for tag in dm.tags[:6]]
+        def switch_tag(tag: str):
+            item = next((self.window.tag_list_widget.item(i) for i in range(self.window.tag_list_widget.count()) if self.window.tag_list_widget.item(i).text() == tag), None)
+            if item is not None: self.window._on_tag_item_clicked(item)
+        results["list.tag_filter_switch"] = self.run_each("list.tag_filter_switch", [tags[i % len(tags)] for i in range(self.repeat * 2)] if tags else [], switch_tag)
+        self.window._clear_tag_filter(); self.settle()
+
+        sample = self.rng.sample(dm.notes, min(50, len(dm.notes)))
+        def update_note(note: Note):
+            dm.note_updated.emit(Note(id=note.id, title=note.title + " (edited)", content=note.content, tags=note.tags, created_at=note.created_at, updated_at=CORPUS_END))
+        results["list.note_updated"] = self.run_each("list.note_updated", sample, update_note)
+        sample = self.rng.sample(dm.snippets, min(50, len(dm.snippets)))
+        results["list.snippet_updated"] = self.run_each("list.snippet_updated", sample, lambda s: dm.snippet_updated.emit(s))
+        dm.all_notes_loaded.emit(dm.notes); dm.all_snippets_loaded.emit(dm.snippets); self.settle()
+        return results
+
+    def tab_scenarios(self) -> Dict[str, dict]:
+        results = {}; content = self.window.content_area
+        for kind, items in (("note", self.dm.notes), ("snippet", self.dm.snippets)):
+            sample = self.rng.sample(items, min(max(self.repeat, 10), len(items)))
+            results[f"tabs.open_{kind}"] = self.run_each(f"tabs.open_{kind}", sample, lambda item, kind=kind: self.window._open_editor_tab(kind, item))
+            results[f"tabs.switch_{kind}"] = self.run_each(f"tabs.switch_{kind}", list(range(content.count())), content.setCurrentIndex)
+            if self.wanted(f"tabs.wake_{kind}"): # Switching to tabs whose editors were released by hibernation
+                asleep = [i for i in range(content.count()) if i != content.currentIndex()]
+                for i in asleep: self.window._hibernate_tab(i)
+                self.settle(); results[f"tabs.wake_{kind}"] = self.run_each(f"tabs.wake_{kind}", asleep, content.setCurrentIndex)
+            results[f"tabs.close_{kind}"] = self.run_each(f"tabs.close_{kind}", list(range(content.count())), lambda _: self.window._close_tab_request(content.count() - 1))
+        return results
+
+    def editor_scenarios(self) -> Dict[str, dict]:
+        results = {}
+        note = max(self.dm.notes[:200], key=lambda n: len(n.content or ""), default=None)
+        snippet = max(self.dm.snippets[:200], key=lambda s: len(s.code or ""), default=None)
+        for kind, item, attr in (("note", note, "content_editor"), ("snippet", snippet, "code_editor")):
+            name = f"editor.{kind}_typing_per_key"
+            if item is None or not self.wanted(name): continue
+            self.window._open_editor_tab(kind, item); self.settle()
+            editor = self.window.content_area.currentWidget(); text_edit = getattr(editor, attr)
+            text_edit.setFocus(); text_edit.moveCursor(text_edit.textCursor().MoveOperation.End)
+            samples = []
+            for _ in range(self.repeat):
+                started = time.perf_counter(); QTest.keyClicks(text_edit, TYPING_TEXT); self.settle()
+                samples.append((time.perf_counter() - started) / len(TYPING_TEXT))
+            results[name] = summarize(samples, rows=len(item.content if kind == "note" else item.code))
+            self.window._close_tab_request(self.window.content_area.indexOf(editor)); self.settle()
+        name = "editor.open_large_note_longest_turn"
+        if note is not None and self.wanted(name): # Worst single event-loop turn while a ~4 MB note body is built in slices
+            from ui.note_editor import split_note_html
+            head, pieces = split_note_html(note.content or "", 1); body = "".join(pieces)
+            big = Note(id=10**9, title="Large note", content=head + body * max(1, 4_000_000 // max(1, len(body))) + "</body></html>", tags="", created_at=CORPUS_END)
+            self.dm._notes_by_id[big.id] = big; self.window.settings["note_preview_min_chars"] = 0; samples = []
+            for _ in range(max(1, self.repeat // 2)):
+                self.window._open_editor_tab("note", big); editor = self.window.content_area.currentWidget(); longest = 0.0
+                while editor._body_loading:
+                    started = time.perf_counter(); self.app.processEvents(); longest = max(longest, time.perf_counter() - started)
+                samples.append(longest); self.window._remove_editor_tab(self.window.content_area.count() - 1); self.settle()
+            results[name] = summarize(samples, rows=len(big.content))
+        return results
+
+    def highlighter_scenarios(self, gen: CorpusGenerator, lines: int) -> Dict[str, dict]:
+        from ui.syntax_highlighter import SyntaxHighlighter
+        results = {}
+        for language in ("Python", "JavaScript", "HTML", "SQL"):
+            name = f"highlighter.{language.lower()}_{lines}_lines"
+            if not self.wanted(name): continue
+            code_lines = []
+            while len(code_lines) < lines: code_lines.extend(gen.snippet_code(language).splitlines())
+            document = QTextDocument(); document.setPlainText("\n".join(code_lines[:lines]))
+            highlighter = SyntaxHighlighter(document, language)
+            samples, _ = measure(lambda: self.highlight_fully(highlighter, highlighter.rehighlight), max(1, self.repeat // 2))
+            results[name] = summarize(samples, rows=lines)
+            highlighter.setDocument(None)
+        name = "highlighter.new_instance"
+        if self.wanted(name): # Rule setup only: what every snippet editor pays on construction
+            document = QTextDocument()
+            samples, _ = measure(lambda: SyntaxHighlighter(document, "Python").setDocument(None), self.repeat * 20)
+            results[name] = summarize(samples)
+        name = f"highlighter.switch_language_{lines}_lines"
+        if self.wanted(name):
+            code_lines = []
+            while len(code_lines) < lines: code_lines.extend(gen.snippet_code("SQL").splitlines())
+            document = QTextDocument(); document.setPlainText("\n".join(code_lines[:lines]))
+            highlighter = SyntaxHighlighter(document, "Python"); languages = iter(["SQL", "Python"] * self.repeat)
+            samples, _ = measure(lambda: self.highlight_fully(highlighter, lambda: highlighter.set_language(next(languages))), max(1, self.repeat // 2) * 2, warmup=0)
+            results[name] = summarize(samples, rows=lines)
+            highlighter.setDocument(None)
+        name = f"tabs.open_snippet_{lines}_lines"; big = None
+        if self.wanted(name) or self.wanted(f"highlighter.longest_turn_{lines}_lines"):
+            code = "\n".join(gen.snippet_code("Python") for _ in range(max(1, lines // 25))).splitlines()[:lines]
+            big = Snippet(id=10**9, title="Large snippet", code="\n".join(code), language="Python", tags="", created_at=CORPUS_END)
+            self.dm._snippets_by_id[big.id] = big
+        if self.wanted(name):
+            def open_and_close():
+                self.window._open_editor_tab("snippet", big); self.settle()
+                self.window._remove_editor_tab(self.window.content_area.count() - 1)
+            samples, _ = measure(open_and_close, max(1, self.repeat // 2), warmup=0)
+            results[name] = summarize(samples, rows=lines)
+        name = f"highlighter.longest_turn_{lines}_lines"
+        if self.wanted(name) and big is not None: # Worst single event-loop turn while a big snippet is highlighted in slices
+            samples = []
+            for _ in range(max(1, self.repeat // 2)):
+                self.window._open_editor_tab("snippet", big); editor = self.window.content_area.currentWidget(); longest = 0.0
+                while not editor.highlighter.finished:
+                    started = time.perf_counter(); self.app.processEvents(); longest = max(longest, time.perf_counter() - started)
+                samples.append(longest); self.window._remove_editor_tab(self.window.content_area.count() - 1); self.settle()
+            results[name] = summarize(samples, rows=lines)
+        return results
+
+    def highlight_fully(self, highlighter, start: Callable[[], object]):
+        """Runs `start` and then the event loop until the highlighter has finished its time-sliced pass."""
+        start()
+        while not highlighter.finished: self.app.processEvents()
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bench_gui", description="Benchmark MainWindow and editor UI work offscreen.")
+    parser.add_argument("--sizes", default="1k,5k", help="Comma-separated list sizes (notes and snippets each), e.g. 1k,5k,20k")
+    parser.add_argument("--highlight-lines", type=int, default=10000, help="Lines in the large-snippet highlighter scenarios (default: %(default)s)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--scenarios", default="", help="Comma-separated scenario name prefixes to run (default: all)")
+    parser.add_argument("--out", type=Path, default=None, help="Results JSON path (default: benchmarks/results/gui-<time>.json)")
+    parser.add_argument("--compare", type=Path, default=None, help="Baseline results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_REGRESSION_THRESHOLD)
+    parser.add_argument("--fail-on-regression", action="store_true")
+    parser.add_argument("--verbose", action="store_true")
+    return parser
+
+def main(argv: List[str] = None) -> int:
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    auto_answer_prompts()
+    prefixes = [p.strip() for p in args.scenarios.split(",") if p.strip()]
+    wanted = lambda name: not prefixes or any(name.startswith(prefix) for prefix in prefixes)
+    sizes = parse_sizes(args.sizes)
+    results = new_results("gui", ROOT, {"sizes": sizes, "seed": args.seed, "repeat": args.repeat, "highlight_lines": args.highlight_lines, "qpa_platform": os.environ.get("QT_QPA_PLATFORM")})
+
+    gen = CorpusGenerator(args.seed)
+    dm = SyntheticDataManager([], [])
+    bench = GuiBenchmark(app, dm, args.repeat, wanted)
+    for size in sizes:
+        logger.info("Running list size %s", size)
+        dm.set_items(*synthetic_items(CorpusGenerator(args.seed), size, size))
+        dm.load_all_tags_async(); bench.settle()
+        dataset = {}
+        for group in (bench.list_scenarios(), bench.tab_scenarios(), bench.editor_scenarios()):
+            dataset.update({name: summary for name, summary in group.items() if summary})
+        results["results"][f"gui-{size}"] = dataset
+    highlight = bench.highlighter_scenarios(gen, args.highlight_lines)
+    if highlight: results["results"]["highlighter"] = highlight
+    bench.window._is_closing = True; bench.window.close()
+
+    out = args.out or DEFAULT_RESULTS_DIR / f"gui-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    write_results(results, out)
+    print(format_results(results))
+    print(f"Results written to {out}")
+    if args.compare:
+        rows = compare_results(load_results(args.compare), results, args.threshold)
+        print(format_comparison(rows))
+        if args.fail_on_regression and any(row["status"] == "regression" for row in rows): return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
+
+# benchmarks/bench_gui.py
+# --- END OF FILE bench_gui.py ---
@@ -0,0 +1,31 @@
+# benchmarks/compare.py
+"""
+Compares two benchmark result files (any suite):
+
+    python -m benchmarks.compare baseline.json current.json [--threshold 10] [--fail-on-regression]
+"""
+
+import argparse
+import sys
+from pathlib import Path
+from typing import List
+from benchmarks.results import DEFAULT_REGRESSION_THRESHOLD, compare_results, format_comparison, load_results
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.compare", description="Compare two benchmark result files.")
+    parser.add_argument("baseline", type=Path)
+    parser.add_argument("current", type=Path)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_REGRESSION_THRESHOLD, help="Regression threshold in percent (default: %(default)s)")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args(argv)
+    baseline, current = load_results(args.baseline), load_results(args.current)
+    if baseline.get("suite") != current.get("suite"): print(f"Warning: comparing suite '{baseline.get('suite')}' with '{current.get('suite')}'", file=sys.stderr)
+    rows = compare_results(baseline, current, args.threshold)
+    print(format_comparison(rows))
+    return 1 if args.fail_on_regression and any(row["status"] == "regression" for row in rows) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
+
+# benchmarks/compare.py
+# --- END OF FILE compare.py ---
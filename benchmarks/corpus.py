@@ -0,0 +1,223 @@
+# benchmarks/corpus.py
+
+import logging
+import math
+import random
+import sqlite3
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Tuple
+from database.db_handler import DBHandler
+
+logger = logging.getLogger(__name__)
+
+# Bump when the generated data changes so cached corpora are not reused across versions.
+GENERATOR_VERSION = 1
+INSERT_BATCH_SIZE = 5000
+# All timestamps fall in the three years before this fixed date, so a seed always gives the same database.
+CORPUS_END = datetime(2024, 1, 1)
+CORPUS_SPAN_DAYS = 3 * 365
+
+# Token planted in a small fraction of notes and snippets so searches can be tested with a known, low selectivity.
+RARE_TOKEN = "zephyrquartz"
+RARE_TOKEN_RATE = 0.001
+
+TAG_POOL_SIZE = 200
+# Number of tags per item: 0..4 with these weights.
+TAG_COUNT_WEIGHTS = (15, 35, 30, 15, 5)
+
+# Roughly what a personal snippet collection looks like; names match the editor's language list.
+LANGUAGE_WEIGHTS = {
+    "Python": 30, "JavaScript": 20, "SQL": 10, "HTML": 8, "CSS": 6, "Java": 6,
+    "C++": 5, "C#": 4, "Go": 4, "PHP": 3, "Ruby": 2, "Text": 2,
+}
+
+_COMMON_WORDS = (
+    "the of and to in is that for it as with was on be at by this had not are but from or have an they which one "
+    "you were all we when there can more if out so what up about into than them some could time only new would "
+    "other then these two may first any like now my such make over our even most after also made many before must "
+    "through back years where much your way well down should because each just those people how too little state "
+    "good very world still own see men work long get here between both life being under never day same another "
+    "know while last might us great old year off come since against go came right used take three"
+).split()
+_SYLLABLES = ("ka", "lo", "mi", "ne", "ra", "to", "vu", "shi", "den", "por", "tal", "quin", "bre", "sto", "mar", "fel", "gri", "von", "zu", "ax")
+
+# Qt's QTextDocument.toHtml() preamble; notes are stored as this kind of HTML.
+_HTML_HEAD = (
+    '<!DOCTYPE HTML PUBLIC "-//W3C//DTD HTML 4.0//EN" "http://www.w3.org/TR/REC-html40/strict.dtd">\n'
+    '<html><head><meta name="qrichtext" content="1" /><meta charset="utf-8" /><style type="text/css">\n'
+    'p, li { white-space: pre-wrap; }\nhr { height: 1px; border-width: 0; }\n'
+    'li.unchecked::marker { content: "\\2610"; }\nli.checked::marker { content: "\\2612"; }\n'
+    "</style></head><body style=\" font-family:'Sans Serif'; font-size:10pt; font-weight:400; font-style:normal;\">\n"
+)
+_HTML_P = '<p style=" margin-top:0px; margin-bottom:0px; margin-left:0px; margin-right:0px; -qt-block-indent:0; text-indent:0px;">'
+_HTML_LI = '<li style=" margin-top:0px; margin-bottom:0px; margin-left:0px; margin-right:0px; -qt-block-indent:0; text-indent:0px;">'
+
+_CODE_LINES = {
+    "Python": ("def {w}_{v}(self, {v}):", "    return {w}({v}) + {n}", "    if {v} is None: raise ValueError(\"{w}\")", "import {w}", "# {s}", "{v} = [{w} for {w} in range({n})]"),
+    "JavaScript": ("function {w}({v}) {{", "  const {v} = await fetch('/{w}/{n}');", "  return {v}.{w}();", "}}", "// {s}", "export default {w};"),
+    "SQL": ("SELECT {v}, {w} FROM {w}s WHERE id = {n};", "-- {s}", "CREATE INDEX idx_{w} ON {w}s({v});", "UPDATE {w}s SET {v} = {n};"),
+    "HTML": ("<div class=\"{w}\">", "  <span id=\"{v}\">{s}</span>", "</div>", "<!-- {s} -->", "<a href=\"/{w}/{n}\">{v}</a>"),
+    "CSS": (".{w} {{", "  margin: {n}px;", "  color: #{n}a{n};", "}}", "/* {s} */"),
+    "Java": ("public class {W} {{", "    private int {v} = {n};", "    public String {w}() {{ return \"{s}\"; }}", "}}", "// {s}"),
+    "C++": ("#include <{w}>", "int {w}(int {v}) {{", "    return {v} * {n};", "}}", "// {s}"),
+    "C#": ("public class {W} {{", "    public int {V} {{ get; set; }} = {n};", "}}", "// {s}"),
+    "Go": ("func {w}({v} int) int {{", "\treturn {v} + {n}", "}}", "// {s}", "import \"{w}\""),
+    "PHP": ("<?php", "function {w}(${v}) {{", "    return ${v} . '{s}';", "}}", "// {s}"),
+    "Ruby": ("def {w}({v})", "  {v}.map {{ |x| x * {n} }}", "end", "# {s}"),
+    "Text": ("{s}",),
+}
+
+class CorpusGenerator:
+    """
+    Deterministic synthetic data: the same seed and sizes always produce the
+    same rows. Word, tag and size distributions are skewed the way real
+    collections are (a few very common tags and words, a long tail of rare
+    ones, mostly short notes with occasional very long ones).
+    """
+    def __init__(self, seed: int = 1, content_scale: float = 1.0):
+        self.seed = seed
+        self.content_scale = max(0.01, content_scale)
+        self._rng = random.Random(seed)
+        self.vocabulary = self._build_vocabulary()
+        self._word_weights = self._zipf_cumulative(len(self.vocabulary), 1.0)
+        self.tags = self._build_tags()
+        self._tag_weights = self._zipf_cumulative(len(self.tags), 1.1)
+        self._languages = list(LANGUAGE_WEIGHTS); self._language_weights = list(LANGUAGE_WEIGHTS.values())
+
+    # --- Vocabulary ---
+    def _build_vocabulary(self) -> List[str]:
+        rng = random.Random(self.seed ^ 0x5EED); words = list(_COMMON_WORDS); seen = set(words)
+        while len(words) < 5000:
+            word = "".join(rng.choice(_SYLLABLES) for _ in range(rng.randint(2, 4)))
+            if word not in seen: seen.add(word); words.append(word)
+        return words
+
+    def _build_tags(self) -> List[str]:
+        rng = random.Random(self.seed ^ 0x7A6)
+        tags = ["work", "personal", "python", "todo", "ideas", "linux", "sql", "meeting", "reference", "draft"]
+        while len(tags) < TAG_POOL_SIZE:
+            tag = f"{rng.choice(self.vocabulary[len(_COMMON_WORDS):])}-{rng.choice(('notes', 'project', 'howto', 'misc', 'api', 'ops', 'docs'))}"
+            if tag not in tags: tags.append(tag)
+        return tags
+
+    @staticmethod
+    def _zipf_cumulative(count: int, exponent: float) -> List[float]:
+        total = 0.0; cumulative = []
+        for rank in range(1, count + 1): total += 1.0 / (rank ** exponent); cumulative.append(total)
+        return cumulative
+
+    def common_tag(self) -> str: return self.tags[0]
+    def rare_tag(self) -> str: return self.tags[int(TAG_POOL_SIZE * 0.75)]
+    def common_word(self) -> str: return self.vocabulary[len(_COMMON_WORDS) + 1] # Most frequent non-stopword
+    def mid_word(self) -> str: return self.vocabulary[len(_COMMON_WORDS) + 200]
+
+    # --- Item pieces ---
+    def _words(self, count: int) -> List[str]:
+        return self._rng.choices(self.vocabulary, cum_weights=self._word_weights, k=count)
+
+    def _sentence(self, low: int, high: int) -> str:
+        words = self._words(self._rng.randint(low, high))
+        if self._rng.random() < RARE_TOKEN_RATE: words[self._rng.randrange(len(words))] = RARE_TOKEN
+        return " ".join(words)
+
+    def item_tags(self) -> str:
+        count = self._rng.choices(range(len(TAG_COUNT_WEIGHTS)), weights=TAG_COUNT_WEIGHTS)[0]
+        return ", ".join(dict.fromkeys(self._rng.choices(self.tags, cum_weights=self._tag_weights, k=count)))
+
+    def _timestamp(self, index: int, total: int) -> str:
+        # Older items first, with jitter, like a collection that grew over time.
+        fraction = (index + self._rng.random()) / max(1, total)
+        return (CORPUS_END - timedelta(days=CORPUS_SPAN_DAYS * (1 - fraction), seconds=self._rng.randint(0, 86399))).isoformat()
+
+    def _paragraph_count(self) -> int:
+        # Log-normal: median ~8 paragraphs (~3 KB of HTML), a long tail up to a few hundred KB.
+        return max(1, min(2000, int(self._rng.lognormvariate(math.log(8), 1.0) * self.content_scale)))
+
+    def note_html(self) -> str:
+        parts = [_HTML_HEAD]; in_list = False
+        for _ in range(self._paragraph_count()):
+            roll = self._rng.random(); text = self._sentence(6, 60)
+            if roll < 0.08:
+                url = f"https://{self._rng.choice(self.vocabulary[len(_COMMON_WORDS):])}.example.com/{self._rng.randint(1, 9999)}"
+                text += f' <a href="{url}"><span style=" text-decoration: underline; color:#0000ff;">{url}</span></a>'
+            elif roll < 0.18:
+                words = text.split(" "); cut = len(words) // 2
+                text = " ".join(words[:cut]) + f' <span style=" font-weight:700;">{" ".join(words[cut:])}</span>'
+            if roll > 0.85:
+                if not in_list: parts.append('<ul style="margin-top: 0px; margin-bottom: 0px; margin-left: 0px; margin-right: 0px; -qt-list-indent: 1;">'); in_list = True
+                parts.append(f"{_HTML_LI}{text}</li>\n")
+            else:
+                if in_list: parts.append("</ul>\n"); in_list = False
+                parts.append(f"{_HTML_P}{text}</p>\n")
+        if in_list: parts.append("</ul>\n")
+        parts.append("</body></html>")
+        return "".join(parts)
+
+    def snippet_code(self, language: str) -> str:
+        templates = _CODE_LINES.get(language, _CODE_LINES["Text"])
+        line_count = max(1, min(5000, int(self._rng.lognormvariate(math.log(25), 0.9) * self.content_scale)))
+        lines = []
+        for _ in range(line_count):
+            word, var = self._words(2)
+            lines.append(self._rng.choice(templates).format(w=word, W=word.capitalize(), v=var, V=var.capitalize(), n=self._rng.randint(0, 999), s=self._sentence(3, 12)))
+        return "\n".join(lines)
+
+    def note_row(self, index: int, total: int) -> Tuple[str, str, str, str, str]:
+        title = self._sentence(2, 8).capitalize(); created = self._timestamp(index, total)
+        updated = created if self._rng.random() < 0.6 else min(CORPUS_END, datetime.fromisoformat(created) + timedelta(days=self._rng.expovariate(1 / 30))).isoformat()
+        return (title, self.note_html(), self.item_tags(), created, updated)
+
+    def snippet_row(self, index: int, total: int) -> Tuple[str, str, str, str, str]:
+        language = self._rng.choices(self._languages, weights=self._language_weights)[0]
+        return (self._sentence(2, 7).capitalize(), self.snippet_code(language), language, self.item_tags(), self._timestamp(index, total))
+
+    # --- Database ---
+    def populate(self, db_path: Path, notes: int, snippets: int):
+        """Creates the application schema at `db_path` and fills it. The file must not exist yet."""
+        started = time.perf_counter()
+        DBHandler(db_path).close() # Same schema and pragmas the application creates
+        conn = sqlite3.connect(db_path)
+        try:
+            conn.execute("PRAGMA synchronous = OFF"); conn.execute("PRAGMA journal_mode = MEMORY")
+            self._insert_batches(conn, "INSERT INTO notes (title, content, tags, created_at, updated_at) VALUES (?, ?, ?, ?, ?)", self.note_row, notes)
+            self._insert_batches(conn, "INSERT INTO snippets (title, code, language, tags, created_at) VALUES (?, ?, ?, ?, ?)", self.snippet_row, snippets)
+            conn.execute("ANALYZE"); conn.commit()
+        finally:
+            conn.close()
+        logger.info("Corpus: Generated %s notes and %s snippets in %.1fs (%s, %.1f MB)", notes, snippets, time.perf_counter() - started, db_path, db_path.stat().st_size / 1e6)
+
+    def _insert_batches(self, conn: sqlite3.Connection, sql: str, make_row, total: int):
+        for start in range(0, total, INSERT_BATCH_SIZE):
+            conn.executemany(sql, [make_row(index, total) for index in range(start, min(total, start + INSERT_BATCH_SIZE))])
+            conn.commit()
+            logger.debug("Corpus: %s/%s rows", min(total, start + INSERT_BATCH_SIZE), total)
+
+def corpus_file_name(notes: int, snippets: int, seed: int, content_scale: float) -> str:
+    return f"corpus-v{GENERATOR_VERSION}-n{notes}-s{snippets}-seed{seed}-x{content_scale:g}.db"
+
+def ensure_corpus(corpus_dir: Path, notes: int, snippets: int, seed: int = 1, content_scale: float = 1.0) -> Tuple[Path, CorpusGenerator]:
+    """Returns a cached corpus database for these parameters, generating it on first use."""
+    generator = CorpusGenerator(seed, content_scale)
+    corpus_dir.mkdir(parents=True, exist_ok=True)
+    path = corpus_dir / corpus_file_name(notes, snippets, seed, content_scale)
+    if not path.exists():
+        partial = path.with_name(path.name + ".partial")
+        if partial.exists(): partial.unlink()
+        generator.populate(partial, notes, snippets)
+        partial.replace(path)
+    else: logger.info("Corpus: Reusing %s", path)
+    return path, generator
+
+def corpus_summary(db_path: Path) -> Dict[str, float]:
+    conn = sqlite3.connect(db_path)
+    try:
+        notes, note_bytes = conn.execute("SELECT COUNT(*), COALESCE(SUM(LENGTH(content)), 0) FROM notes").fetchone()
+        snippets, snippet_bytes = conn.execute("SELECT COUNT(*), COALESCE(SUM(LENGTH(code)), 0) FROM snippets").fetchone()
+    finally:
+        conn.close()
+    return {"notes": notes, "snippets": snippets, "note_content_bytes_mean": note_bytes / notes if notes else 0.0, "snippet_code_bytes_mean": snippet_bytes / snippets if snippets else 0.0, "file_bytes": db_path.stat().st_size}
+
+# benchmarks/corpus.py
+# --- END OF FILE corpus.py ---
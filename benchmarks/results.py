@@ -0,0 +1,107 @@
+# benchmarks/results.py
+
+import json
+import platform
+import sqlite3
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+RESULTS_SCHEMA = 1
+DEFAULT_REGRESSION_THRESHOLD = 10.0 # Percent change of the median that counts as a regression
+
+def summarize(samples: List[float], rows: Optional[int] = None) -> Dict[str, Any]:
+    """Timing summary in milliseconds for a list of samples in seconds."""
+    ordered = sorted(samples)
+    summary = {
+        "runs": len(ordered),
+        "min_ms": ordered[0] * 1000,
+        "median_ms": statistics.median(ordered) * 1000,
+        "mean_ms": statistics.fmean(ordered) * 1000,
+        "p95_ms": ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))] * 1000,
+        "max_ms": ordered[-1] * 1000,
+        "stdev_ms": statistics.stdev(ordered) * 1000 if len(ordered) > 1 else 0.0,
+    }
+    if rows is not None: summary["rows"] = rows
+    return summary
+
+def measure(func: Callable[[], Any], repeat: int, warmup: int = 1) -> Tuple[List[float], Any]:
+    """Runs `func` warmup + repeat times. Returns the timed samples and the last result."""
+    result = None
+    for _ in range(warmup): result = func()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter(); result = func(); samples.append(time.perf_counter() - started)
+    return samples, result
+
+def parse_sizes(text: str) -> List[int]:
+    """Parses "1k,10k,1m" style size lists."""
+    sizes = []
+    for part in text.split(","):
+        part = part.strip().lower()
+        if not part: continue
+        multiplier = 1_000_000 if part.endswith("m") else 1_000 if part.endswith("k") else 1
+        sizes.append(int(float(part.rstrip("km")) * multiplier))
+    return sizes
+
+def environment_info(root: Path) -> Dict[str, Any]:
+    info = {"python": sys.version.split()[0], "sqlite": sqlite3.sqlite_version, "platform": platform.platform(), "machine": platform.machine(), "created_at": time.strftime("%Y-%m-%dT%H:%M:%S")}
+    try:
+        info["git_commit"] = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=root, capture_output=True, text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError): info["git_commit"] = None
+    return info
+
+def new_results(suite: str, root: Path, parameters: Dict[str, Any]) -> Dict[str, Any]:
+    return {"schema": RESULTS_SCHEMA, "suite": suite, "environment": environment_info(root), "parameters": parameters, "results": {}}
+
+def write_results(results: Dict[str, Any], path: Path) -> Path:
+    path = Path(path); path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f: json.dump(results, f, indent=2)
+    return path
+
+def load_results(path: Path) -> Dict[str, Any]:
+    with open(path, "r", encoding="utf-8") as f: results = json.load(f)
+    if results.get("schema") != RESULTS_SCHEMA: raise ValueError(f"{path}: unsupported results schema {results.get('schema')!r}")
+    return results
+
+def compare_results(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float = DEFAULT_REGRESSION_THRESHOLD) -> List[Dict[str, Any]]:
+    """
+    Compares median times of every benchmark present in both result sets.
+    Keys are "<dataset>/<scenario>". A change above +threshold percent is a
+    regression, below -threshold an improvement.
+    """
+    rows = []
+    for dataset, scenarios in current.get("results", {}).items():
+        for scenario, summary in scenarios.items():
+            old = baseline.get("results", {}).get(dataset, {}).get(scenario)
+            if not old or not old.get("median_ms"): continue
+            change = (summary["median_ms"] - old["median_ms"]) / old["median_ms"] * 100
+            status = "regression" if change > threshold else "improvement" if change < -threshold else "same"
+            rows.append({"benchmark": f"{dataset}/{scenario}", "baseline_ms": old["median_ms"], "current_ms": summary["median_ms"], "change_pct": change, "status": status})
+    return rows
+
+def format_comparison(rows: List[Dict[str, Any]]) -> str:
+    if not rows: return "No common benchmarks to compare."
+    width = max(len(row["benchmark"]) for row in rows)
+    lines = [f"{'Benchmark':<{width}}  {'Baseline ms':>12}  {'Current ms':>12}  {'Change':>8}  Status"]
+    for row in rows:
+        lines.append(f"{row['benchmark']:<{width}}  {row['baseline_ms']:>12.3f}  {row['current_ms']:>12.3f}  {row['change_pct']:>+7.1f}%  {row['status']}")
+    regressions = sum(1 for row in rows if row["status"] == "regression")
+    lines.append(f"{len(rows)} benchmarks compared, {regressions} regressions.")
+    return "\n".join(lines)
+
+def format_results(results: Dict[str, Any]) -> str:
+    lines = []
+    for dataset, scenarios in results.get("results", {}).items():
+        lines.append(f"[{dataset}]")
+        width = max((len(name) for name in scenarios), default=0)
+        for name, summary in scenarios.items():
+            rows = f"  rows={summary['rows']}" if "rows" in summary else ""
+            lines.append(f"  {name:<{width}}  median {summary['median_ms']:>10.3f} ms  p95 {summary['p95_ms']:>10.3f} ms{rows}")
+    return "\n".join(lines)
+
+# benchmarks/results.py
+# --- END OF FILE results.py ---
@@ -0,0 +1,178 @@
+# database/async_repository.py
+"""
+asyncio API over Repository, without Qt. Every query runs on one dedicated
+executor thread, so coroutines never block their event loop on SQLite and
+database work is serialized in submission order. DataManager adapts this to
+Qt signals; scripts and benchmarks can use it with asyncio.run():
+
+    async with AsyncRepository.open(db_path) as core:
+        notes = await core.search_notes("meeting")
+        async with core.stream_notes() as stream:
+            async for chunk in stream: ...
+
+Cancelling a call that has not started yet skips it. A call that is already
+running finishes (a write still commits) and its result is dropped. Streams
+stop between chunks and close their cursor.
+"""
+import asyncio
+import concurrent.futures
+import logging
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, List, Optional, Tuple
+from .db_handler import DBHandler
+from .metrics import TASK_METRICS, count_rows
+from .models import Note, Snippet, RecentItem
+from .repository import Repository
+
+logger = logging.getLogger(__name__)
+
+STREAM_FIRST_CHUNK = 100 # Rows in the first chunk of a stream, returned as soon as they are read
+STREAM_CHUNK = 2000 # Rows per later chunk
+
+class RowStream:
+    """
+    Async iterator over a summary query in chunks (lists of models): the first
+    `first_chunk` rows, then `chunk_size` at a time, each fetched on the
+    executor. The final chunk is shorter than requested (possibly empty);
+    `exhausted` is True once it has been returned. The cursor is closed after
+    the final chunk, on close()/aclose() and when a fetch is cancelled; use
+    `async with` so a stream abandoned early (break, cancellation) closes too.
+    """
+    def __init__(self, core: "AsyncRepository", open_cursor: Callable[[], sqlite3.Cursor], from_row: Callable, task_type: str, first_chunk: int = STREAM_FIRST_CHUNK, chunk_size: int = STREAM_CHUNK):
+        self._core = core; self._open_cursor = open_cursor; self._from_row = from_row; self._task_type = task_type
+        self._size = max(1, first_chunk); self._chunk_size = max(1, chunk_size)
+        self._cursor: Optional[sqlite3.Cursor] = None # Only touched on the executor thread
+        self._closed = False; self.exhausted = False; self.rows_read = 0
+
+    def __aiter__(self) -> "RowStream": return self
+    async def __aenter__(self) -> "RowStream": return self
+    async def __aexit__(self, *exc_info): self.close()
+
+    async def __anext__(self) -> list:
+        if self._closed: raise StopAsyncIteration
+        size = self._size
+        try: rows = await self._core.run(self._fetch, size, task_type=self._task_type)
+        except BaseException: self.close(); raise
+        self.rows_read += len(rows); self._size = self._chunk_size
+        if len(rows) < size: self.exhausted = self._closed = True # _fetch has closed the cursor
+        return rows
+
+    def _fetch(self, size: int) -> list:
+        if self._closed: return []
+        if self._cursor is None: self._cursor = self._open_cursor()
+        rows = self._cursor.fetchmany(size)
+        if len(rows) < size: self._close_cursor()
+        return [self._from_row(row) for row in rows]
+
+    def _close_cursor(self):
+        if self._cursor is not None: self._cursor.close(); self._cursor = None
+
+    def close(self):
+        """Stops the stream. The cursor is closed on the executor, after any fetch already queued."""
+        if self._closed and self._cursor is None: return
+        self._closed = True
+        try: self._core._executor.submit(self._close_cursor)
+        except RuntimeError: pass # Executor already shut down; the connection closes the cursor with it
+
+    async def aclose(self): self.close()
+
+class AsyncRepository:
+    def __init__(self, repository: Repository, executor: Optional[ThreadPoolExecutor] = None):
+        self.repository = repository
+        self._executor = executor or ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite")
+        self._owns_executor = executor is None
+        self._handler: Optional[DBHandler] = None
+
+    @classmethod
+    def open(cls, db_path: Path, storage_profile: Optional[str] = None) -> "AsyncRepository":
+        """Opens (and if needed creates) the database at `db_path`; close() closes it again."""
+        handler = DBHandler(Path(db_path), storage_profile)
+        if handler.connection is None: raise sqlite3.OperationalError(f"Could not open database {db_path}")
+        core = cls(Repository(handler.connection)); core._handler = handler
+        return core
+
+    def close(self, wait: bool = True):
+        """Shuts the executor down (after the queued calls if `wait`) and closes a database opened by open()."""
+        if self._owns_executor: self._executor.shutdown(wait=wait)
+        if self._handler: self._handler.close(); self._handler = None
+
+    async def __aenter__(self) -> "AsyncRepository": return self
+    async def __aexit__(self, *exc_info): self.close()
+
+    async def run(self, func: Callable, *args, task_type: Optional[str] = None) -> Any:
+        """Awaits `func(*args)` run on the database executor. Queue wait and run time are recorded in TASK_METRICS under `task_type` (default: the function name)."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._timed, task_type or func.__name__, time.perf_counter(), func, args)
+
+    @staticmethod
+    def _timed(task_type: str, queued_at: float, func: Callable, args: tuple) -> Any:
+        started = time.perf_counter(); rows = 0; error = None
+        try: result = func(*args); rows = count_rows(result); return result
+        except Exception as e: error = str(e); raise
+        finally: TASK_METRICS.record(task_type, started - queued_at, time.perf_counter() - started, rows, error)
+
+    # --- Notes ---
+    async def get_note(self, note_id: int) -> Optional[Note]: return await self.run(self.repository.get_note, note_id)
+    async def list_notes(self, filter_tag: Optional[str] = None) -> List[Note]: return await self.run(self.repository.list_notes, filter_tag)
+    async def search_notes(self, query: str, filter_tag: Optional[str] = None) -> List[Note]: return await self.run(self.repository.search_notes, query, filter_tag)
+    async def add_note(self, note: Note) -> Optional[Note]: return await self.run(self.repository.add_note, note)
+    async def update_note(self, note: Note) -> Optional[Note]: return await self.run(self.repository.update_note, note)
+    async def delete_note(self, note_id: int) -> bool: return await self.run(self.repository.delete_note, note_id)
+
+    def stream_notes(self, query: Optional[str] = None, filter_tag: Optional[str] = None, first_chunk: int = STREAM_FIRST_CHUNK, chunk_size: int = STREAM_CHUNK) -> RowStream:
+        """Note summaries (content left empty, newest first) matching `query`/`filter_tag`, chunk by chunk."""
+        return RowStream(self, lambda: self.repository.note_summaries(query, filter_tag), Note.from_db_row, "stream_notes", first_chunk, chunk_size)
+
+    # --- Snippets ---
+    async def get_snippet(self, snippet_id: int) -> Optional[Snippet]: return await self.run(self.repository.get_snippet, snippet_id)
+    async def list_snippets(self, filter_tag: Optional[str] = None) -> List[Snippet]: return await self.run(self.repository.list_snippets, filter_tag)
+    async def search_snippets(self, query: str, filter_tag: Optional[str] = None) -> List[Snippet]: return await self.run(self.repository.search_snippets, query, filter_tag)
+    async def add_snippet(self, snippet: Snippet) -> Optional[Snippet]: return await self.run(self.repository.add_snippet, snippet)
+    async def update_snippet(self, snippet: Snippet) -> Optional[Snippet]: return await self.run(self.repository.update_snippet, snippet)
+    async def delete_snippet(self, snippet_id: int) -> bool: return await self.run(self.repository.delete_snippet, snippet_id)
+
+    def stream_snippets(self, query: Optional[str] = None, filter_tag: Optional[str] = None, first_chunk: int = STREAM_FIRST_CHUNK, chunk_size: int = STREAM_CHUNK) -> RowStream:
+        return RowStream(self, lambda: self.repository.snippet_summaries(query, filter_tag), Snippet.from_db_row, "stream_snippets", first_chunk, chunk_size)
+
+    # --- Tags, recent items, bookkeeping, attachments ---
+    async def all_tags(self) -> List[str]: return await self.run(self.repository.all_tags)
+    async def recent_items(self, limit: int) -> List[RecentItem]: return await self.run(self.repository.recent_items, limit)
+    async def change_token(self) -> Optional[int]: return await self.run(self.repository.change_token)
+    async def last_run(self, task: str) -> Optional[datetime]: return await self.run(self.repository.last_run, task)
+    async def record_run(self, task: str, when: Optional[datetime] = None): await self.run(self.repository.record_run, task, when)
+    async def get_attachment(self, digest: str) -> Optional[Tuple[str, bytes]]: return await self.run(self.repository.get_attachment, digest)
+    async def add_attachment(self, data: bytes, mime: str) -> str: return await self.run(self.repository.add_attachment, data, mime)
+
+class LoopThread:
+    """An asyncio event loop on a daemon thread, for callers with an event loop of their own (the Qt GUI)."""
+    def __init__(self, name: str = "db-loop"):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True); self._thread.start()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop); self.loop.run_forever()
+
+    def submit(self, coroutine) -> concurrent.futures.Future:
+        """Schedules `coroutine` on the loop. The returned future's done callbacks run on the loop thread; cancel() cancels the coroutine."""
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+
+    def stop(self, timeout: Optional[float] = 5.0):
+        """Stops the loop, then cancels the coroutines left on it (so threads blocked on their futures return) and closes it."""
+        if self.loop.is_closed(): return
+        if self._thread.is_alive(): self.loop.call_soon_threadsafe(self.loop.stop); self._thread.join(timeout)
+        if self._thread.is_alive(): logger.warning("LoopThread: Loop did not stop within %ss.", timeout); return
+        self.loop.run_until_complete(self._cancel_tasks()); self.loop.close()
+
+    @staticmethod
+    async def _cancel_tasks():
+        tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        for task in tasks: task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+# database/async_repository.py
+# --- END OF FILE async_repository.py ---
@@ -0,0 +1,97 @@
+# database/attachments.py
+"""
+Content-addressed storage for images in notes. Each image is stored once in
+the `attachments` table under the SHA-256 of its bytes, however many notes
+use it, and note HTML refers to it as <img src="attachment:<hash>">.
+Blob contents are written and read in BLOB_IO_CHUNK pieces through SQLite
+incremental blob I/O, so large images never pass through a single bound
+parameter or result value. `attachment_refs` lists the hashes each note
+uses; attachments nothing refers to are removed by idle-time maintenance.
+"""
+import base64
+import binascii
+import hashlib
+import logging
+import re
+import sqlite3
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+ATTACHMENT_SCHEME = "attachment"
+BLOB_IO_CHUNK = 64 * 1024
+# Unreferenced attachments younger than this are kept: an image pasted into a note that has not been saved yet is stored right away.
+ATTACHMENT_GC_GRACE = timedelta(days=1)
+
+_INLINE_IMAGE = re.compile(r"""(<img\b[^>]*?\bsrc\s*=\s*)(["'])data:(image/[\w.+-]+);base64,([^"']*)\2""", re.IGNORECASE)
+_ATTACHMENT_REF = re.compile(ATTACHMENT_SCHEME + r":([0-9a-f]{64})")
+
+def attachment_url(digest: str) -> str: return f"{ATTACHMENT_SCHEME}:{digest}"
+def attachment_digest(data: bytes) -> str: return hashlib.sha256(data).hexdigest()
+
+def referenced_attachments(html_content: str) -> Set[str]:
+    return set(_ATTACHMENT_REF.findall(html_content or ""))
+
+def extract_inline_images(html_content: str) -> Tuple[str, Dict[str, Tuple[str, bytes]]]:
+    """
+    Replaces base64 data: URIs in <img> tags with attachment references.
+    Returns the rewritten HTML and hash -> (mime type, bytes) for every image
+    taken out. Data that does not decode is left in place.
+    """
+    images: Dict[str, Tuple[str, bytes]] = {}
+    if "data:" not in (html_content or ""): return html_content, images
+    def replace(match: re.Match) -> str:
+        try: data = base64.b64decode(re.sub(r"\s+", "", match.group(4)), validate=True)
+        except (binascii.Error, ValueError): return match.group(0)
+        digest = attachment_digest(data); images[digest] = (match.group(3).lower(), data)
+        return f"{match.group(1)}{match.group(2)}{attachment_url(digest)}{match.group(2)}"
+    return _INLINE_IMAGE.sub(replace, html_content), images
+
+def write_attachment(conn: sqlite3.Connection, data: bytes, mime: str, digest: Optional[str] = None) -> str:
+    """Stores `data` unless an attachment with the same hash exists. Returns the hash. The caller commits."""
+    digest = digest or attachment_digest(data)
+    cursor = conn.execute("INSERT OR IGNORE INTO attachments (hash, mime, size, data, created_at) VALUES (?, ?, ?, zeroblob(?), ?)", (digest, mime, len(data), len(data), datetime.now().isoformat()))
+    if cursor.rowcount > 0 and data:
+        view = memoryview(data)
+        with conn.blobopen("attachments", "data", cursor.lastrowid) as blob:
+            for start in range(0, len(data), BLOB_IO_CHUNK): blob.write(view[start:start + BLOB_IO_CHUNK])
+        logger.debug("Stored attachment %s (%s, %d bytes).", digest, mime, len(data))
+    return digest
+
+def iter_attachment(conn: sqlite3.Connection, digest: str, chunk_size: int = BLOB_IO_CHUNK) -> Iterator[bytes]:
+    """Yields the attachment's bytes in pieces of `chunk_size`. Yields nothing if there is no such attachment."""
+    row = conn.execute("SELECT rowid FROM attachments WHERE hash = ?", (digest,)).fetchone()
+    if row is None: return
+    with conn.blobopen("attachments", "data", row[0], readonly=True) as blob:
+        while True:
+            chunk = blob.read(chunk_size)
+            if not chunk: return
+            yield chunk
+
+def read_attachment(conn: sqlite3.Connection, digest: str) -> Optional[Tuple[str, bytes]]:
+    """(mime type, bytes) of an attachment, or None if it does not exist."""
+    row = conn.execute("SELECT mime FROM attachments WHERE hash = ?", (digest,)).fetchone()
+    if row is None: return None
+    return row[0], b"".join(iter_attachment(conn, digest))
+
+def set_note_attachments(conn: sqlite3.Connection, note_id: int, html_content: str):
+    """Records which attachments a note's HTML refers to. The caller commits."""
+    conn.execute("DELETE FROM attachment_refs WHERE note_id = ?", (note_id,))
+    conn.executemany("INSERT OR IGNORE INTO attachment_refs (note_id, hash) VALUES (?, ?)", [(note_id, digest) for digest in referenced_attachments(html_content)])
+
+def store_note_content(conn: sqlite3.Connection, html_content: str) -> str:
+    """Moves inline images out of note HTML into attachments; returns the HTML to store. The caller commits."""
+    html_content, images = extract_inline_images(html_content)
+    for digest, (mime, data) in images.items(): write_attachment(conn, data, mime, digest)
+    if images: logger.debug("Moved %d inline images to attachments.", len(images))
+    return html_content
+
+def delete_unreferenced(conn: sqlite3.Connection, limit: int, grace: timedelta = ATTACHMENT_GC_GRACE) -> int:
+    """Deletes up to `limit` attachments no note refers to and older than `grace`. Returns how many were deleted. The caller commits."""
+    cutoff = (datetime.now() - grace).isoformat()
+    cursor = conn.execute("DELETE FROM attachments WHERE rowid IN (SELECT rowid FROM attachments WHERE created_at < ? AND hash NOT IN (SELECT hash FROM attachment_refs) LIMIT ?)", (cutoff, limit))
+    return cursor.rowcount
+
+# database/attachments.py
+# --- END OF FILE attachments.py ---
@@ -0,0 +1,78 @@
+# database/backup.py
+
+import logging
+import os
+import sqlite3
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+BACKUP_PREFIX = "notes-"
+BACKUP_SUFFIX = ".db"
+# Pages copied per backup step (256 pages is about 1 MB with the default 4 KB page size).
+PAGES_PER_STEP = 256
+# Pause between steps so concurrent saves and searches get the connection in between.
+STEP_SLEEP_SECONDS = 0.005
+
+ProgressCallback = Callable[[int, int], None] # (pages_done, pages_total)
+
+def backup_file_name(when: Optional[datetime] = None) -> str:
+    return f"{BACKUP_PREFIX}{(when or datetime.now()).strftime('%Y%m%d-%H%M%S')}{BACKUP_SUFFIX}"
+
+def list_backups(backup_dir: Path) -> List[Path]:
+    """Returns existing backups, newest first."""
+    if not backup_dir.is_dir(): return []
+    return sorted(backup_dir.glob(f"{BACKUP_PREFIX}*{BACKUP_SUFFIX}"), key=lambda p: p.name, reverse=True)
+
+def rotate_backups(backup_dir: Path, keep: int) -> List[Path]:
+    """Deletes all but the `keep` newest backups. Returns the removed paths."""
+    removed = []
+    for old in list_backups(backup_dir)[max(1, keep):]:
+        try: old.unlink(); removed.append(old)
+        except OSError as e: logger.warning("Backup: Could not remove old backup %s: %s", old, e)
+    return removed
+
+def run_online_backup(source: sqlite3.Connection, dest_path: Path, progress: Optional[ProgressCallback] = None, pages_per_step: int = PAGES_PER_STEP, step_sleep: float = STEP_SLEEP_SECONDS) -> Path:
+    """
+    Copies a live database with the SQLite online backup API.
+
+    `source` should be the connection the application writes through: SQLite
+    then applies concurrent writes to the backup in place instead of
+    restarting it. The copy is written to a temporary file and renamed when
+    complete, so a reader never sees a torn backup.
+    """
+    dest_path.parent.mkdir(parents=True, exist_ok=True)
+    partial_path = dest_path.with_name(dest_path.name + ".partial")
+    if partial_path.exists(): partial_path.unlink()
+
+    def _on_step(status: int, remaining: int, total: int):
+        if progress: progress(total - remaining, total)
+        if remaining and step_sleep > 0: time.sleep(step_sleep)
+
+    dest = sqlite3.connect(partial_path)
+    try:
+        source.backup(dest, pages=pages_per_step, progress=_on_step)
+    finally:
+        dest.close()
+    os.replace(partial_path, dest_path)
+    return dest_path
+
+def run_compact_backup(db_path: Path, dest_path: Path) -> Path:
+    """Writes a vacuumed (defragmented, minimal size) snapshot with VACUUM INTO."""
+    dest_path.parent.mkdir(parents=True, exist_ok=True)
+    partial_path = dest_path.with_name(dest_path.name + ".partial")
+    if partial_path.exists(): partial_path.unlink()
+    # A separate read connection: VACUUM INTO is one long statement and must not hold the shared connection.
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute("VACUUM INTO ?", (str(partial_path),))
+    finally:
+        conn.close()
+    os.replace(partial_path, dest_path)
+    return dest_path
+
+# database/backup.py
+# --- END OF FILE backup.py ---
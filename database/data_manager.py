@@ -1,26 +1,41 @@
 # --- START OF FILE database/data_manager.py ---
 
 # database/data_manager.py
-
-import sqlite3
+"""
+Threading rule: the shared connection (self._db_handler.connection) belongs
+to the core's single executor thread. Every query and write on it goes
+through self.core, either as a coroutine (the *_async methods) or, where a
+caller needs an answer right away, through _call_sync(), which blocks on
+the core's future. The only other user is the online backup, which reads it
+page by page through SQLite's backup API and never writes or commits.
+Maintenance opens a connection of its own.
+"""
+
+import concurrent.futures
+import itertools
+import logging
 from pathlib import Path
-from typing import List, Optional, Callable, Any, Set, Tuple
+from typing import Dict, Optional, Callable, Any, Tuple
 from datetime import datetime
+from .async_repository import AsyncRepository, LoopThread, RowStream
 from .db_handler import DBHandler
-from .models import Note, Snippet, RecentItem
+from .models import Note, Snippet
 from .db_worker import DBWorker
-from PyQt6.QtCore import QThreadPool, QObject, pyqtSignal
+from .maintenance import MaintenanceScheduler
+from .metrics import TASK_METRICS
+from .repository import Repository
+from .backup import backup_file_name, rotate_backups, run_online_backup, run_compact_backup
+from .paths import BACKUP_DIR, DB_PATH, ensure_app_data_dir
+from PyQt6.QtCore import QThreadPool, QObject, QTimer, pyqtSignal
 
-HOME_DIR = Path.home()
-APP_DATA_DIR = HOME_DIR / ".notes_manager"
-try:
-    APP_DATA_DIR.mkdir(parents=True, exist_ok=True)
-except OSError as e:
-    print(f"Warning: Could not create application data directory {APP_DATA_DIR}: {e}")
-DB_PATH = APP_DATA_DIR / "notes.db"
-print(f"Database Path: {DB_PATH}")
+logger = logging.getLogger(__name__)
 
 class DataManager(QObject):
+    """
+    Qt front end to the database core (AsyncRepository). Queries and writes run
+    as coroutines on a loop thread and report back through the signals below;
+    backups and maintenance keep their own Qt thread pools.
+    """
     note_added = pyqtSignal(Note)
     note_updated = pyqtSignal(Note)
     note_deleted = pyqtSignal(int)
@@ -35,272 +50,194 @@ class DataManager(QObject):
     all_tags_loaded = pyqtSignal(list)
     tags_updated = pyqtSignal()
     db_error = pyqtSignal(str, str)
+    backup_progress = pyqtSignal(int, int) # pages done, pages total
+    backup_completed = pyqtSignal(str) # backup file path
+    notes_chunk_loaded = pyqtSignal(int, list, bool) # stream id, notes, last chunk
+    snippets_chunk_loaded = pyqtSignal(int, list, bool) # stream id, snippets, last chunk
 
-    def __init__(self):
+    def __init__(self, db_path: Path = DB_PATH, storage_profile: Optional[str] = None):
         super().__init__()
-        print("DataManager: Initializing...")
-        self._db_handler = DBHandler(DB_PATH)
-        self._thread_pool = QThreadPool(self)
-        print(f"DataManager: Thread pool configured with max {self._thread_pool.maxThreadCount()} threads.")
-        self._active_tasks = {}
-
-    def _submit_task(self, task_id_prefix: str, method: Callable, args: tuple = (), result_signal: Optional[pyqtSignal] = None, error_signal: pyqtSignal = db_error, finished_callback: Optional[Callable] = None):
-        timestamp = datetime.now().timestamp(); task_id = f"{task_id_prefix}_{id(args)}_{timestamp}"
-        while task_id in self._active_tasks: timestamp += 0.000001; task_id = f"{task_id_prefix}_{id(args)}_{timestamp}"
-        print(f"DataManager: Submitting async task '{task_id}' for method '{method.__name__}'")
+        logger.info("Database Path: %s", db_path)
+        ensure_app_data_dir(Path(db_path).parent)
+        self.db_path = Path(db_path)
+        self._db_handler = DBHandler(db_path, storage_profile)
+        self.core = AsyncRepository(Repository(self._db_handler.connection)); self._loop = LoopThread()
+        self._thread_pool = QThreadPool(self) # Maintenance steps
+        self._active_tasks = {}; self._task_counter = itertools.count(1)
+        self._last_stream_id = 0; self._streams: Dict[int, concurrent.futures.Future] = {}; self._closed = False
+        self.maintenance = MaintenanceScheduler(db_path, self._thread_pool, self.has_pending_tasks, self)
+        self._backup_dir = BACKUP_DIR; self._backup_keep = 7; self._backup_interval_hours = 24.0
+        self._backup_running = False
+        # Long-running jobs get their own thread so they never occupy a slot needed by saves and searches.
+        self._background_pool = QThreadPool(self); self._background_pool.setMaxThreadCount(1)
+        self._backup_timer = QTimer(self); self._backup_timer.setInterval(15 * 60 * 1000); self._backup_timer.timeout.connect(self._check_backup_due)
+
+    def has_pending_tasks(self) -> bool: return bool(self._active_tasks)
+    def start_maintenance(self, idle_minutes: float): self.maintenance.start(idle_minutes)
+    def notify_user_activity(self): self.maintenance.notify_activity()
+
+    def _submit_task(self, task_id_prefix: str, method: Callable, args: tuple = (), result_signal: Optional[pyqtSignal] = None, finished_callback: Optional[Callable] = None, thread_pool: Optional[QThreadPool] = None):
+        """Runs a blocking `method` on a Qt thread pool (used for backups, which must not hold up the database executor)."""
+        task_id = f"{task_id_prefix}_{next(self._task_counter)}"
+        logger.debug("DataManager: Submitting worker task '%s' for method '%s'", task_id, method.__name__)
         worker = DBWorker(task_id, method, args=args)
         if result_signal: worker.signals.result.connect(lambda tid, res: result_signal.emit(res) if tid == task_id else None)
         worker.signals.error.connect(lambda tid, err: self.db_error.emit(tid, err) if tid == task_id else None)
         worker.signals.finished.connect(lambda tid: (self._active_tasks.pop(tid, None), finished_callback(tid) if finished_callback else None) if tid == task_id else None)
-        self._active_tasks[task_id] = worker; self._thread_pool.start(worker)
+        self._active_tasks[task_id] = worker; (thread_pool or self._thread_pool).start(worker)
+
+    def _submit(self, task_id_prefix: str, coroutine, on_result: Optional[Callable[[Any], None]] = None, finished_callback: Optional[Callable] = None) -> concurrent.futures.Future:
+        """
+        Runs a core coroutine on the loop thread. `on_result` (usually a signal's
+        emit) gets its result and failures are reported through db_error; both
+        are called on the loop thread, so connected GUI slots run queued.
+        """
+        task_id = f"{task_id_prefix}_{next(self._task_counter)}"
+        logger.debug("DataManager: Submitting task '%s'", task_id)
+        def done(future: concurrent.futures.Future):
+            self._active_tasks.pop(task_id, None)
+            if future.cancelled(): logger.debug("DataManager: Task '%s' cancelled.", task_id)
+            elif future.exception() is not None:
+                error = future.exception(); logger.error("Task '%s' failed: %s", task_id, error, exc_info=error); self.db_error.emit(task_id, str(error))
+            elif on_result: on_result(future.result())
+            if finished_callback: finished_callback(task_id)
+        future = self._loop.submit(coroutine); self._active_tasks[task_id] = future; future.add_done_callback(done)
+        return future
 
     # --- Async Methods ---
-    def load_all_notes_async(self, filter_tag: Optional[str] = None): args = (filter_tag,); self._submit_task("load_all_notes", self._execute_get_all_notes, args=args, result_signal=self.all_notes_loaded)
-    def search_notes_async(self, query: str, filter_tag: Optional[str] = None): args = (query, filter_tag); self._submit_task("search_notes", self._execute_search_notes, args=args, result_signal=self.note_searched)
-    def add_note_async(self, note: Note): callback = lambda tid: self.tags_updated.emit(); self._submit_task("add_note", self._execute_add_note, args=(note,), result_signal=self.note_added, finished_callback=callback)
-    def update_note_async(self, note: Note): callback = lambda tid: self.tags_updated.emit(); self._submit_task("update_note", self._execute_update_note, args=(note,), result_signal=self.note_updated, finished_callback=callback)
-    def delete_note_async(self, note_id: int):
-        task_id = f"delete_note_{note_id}_{datetime.now().timestamp()}"; worker = DBWorker(task_id, self._execute_delete_note, args=(note_id,))
-        worker.signals.result.connect(lambda tid, success: self.note_deleted.emit(note_id) if tid == task_id and success else None); worker.signals.error.connect(lambda tid, err: self.db_error.emit(tid, err) if tid == task_id else None)
-        worker.signals.finished.connect(lambda tid: (self._active_tasks.pop(tid, None), self.tags_updated.emit()) if tid == task_id else None); self._active_tasks[task_id] = worker; self._thread_pool.start(worker)
-    def load_all_snippets_async(self, filter_tag: Optional[str] = None): args = (filter_tag,); self._submit_task("load_all_snippets", self._execute_get_all_snippets, args=args, result_signal=self.all_snippets_loaded)
-    def search_snippets_async(self, query: str, filter_tag: Optional[str] = None): args = (query, filter_tag); self._submit_task("search_snippets", self._execute_search_snippets, args=args, result_signal=self.snippet_searched)
-    def add_snippet_async(self, snippet: Snippet): callback = lambda tid: self.tags_updated.emit(); self._submit_task("add_snippet", self._execute_add_snippet, args=(snippet,), result_signal=self.snippet_added, finished_callback=callback)
-    def update_snippet_async(self, snippet: Snippet): callback = lambda tid: self.tags_updated.emit(); self._submit_task("update_snippet", self._execute_update_snippet, args=(snippet,), result_signal=self.snippet_updated, finished_callback=callback)
-    def delete_snippet_async(self, snippet_id: int):
-        task_id = f"delete_snippet_{snippet_id}_{datetime.now().timestamp()}"; worker = DBWorker(task_id, self._execute_delete_snippet, args=(snippet_id,))
-        worker.signals.result.connect(lambda tid, success: self.snippet_deleted.emit(snippet_id) if tid == task_id and success else None); worker.signals.error.connect(lambda tid, err: self.db_error.emit(tid, err) if tid == task_id else None)
-        worker.signals.finished.connect(lambda tid: (self._active_tasks.pop(tid, None), self.tags_updated.emit()) if tid == task_id else None); self._active_tasks[task_id] = worker; self._thread_pool.start(worker)
-    def load_all_tags_async(self): self._submit_task("load_all_tags", self._execute_get_all_tags, result_signal=self.all_tags_loaded)
-
-    # --- Sync Methods (Corrected try/except/finally) ---
-    def get_note_sync(self, note_id: int) -> Optional[Note]:
-        print(f"DataManager: Executing synchronous get_note_sync for ID {note_id}")
-        cursor = None
-        try:
-            cursor = self._db_handler.connection.cursor()
-            cursor.execute("SELECT * FROM notes WHERE id=?", (note_id,))
-            row = cursor.fetchone()
-            if row:
-                return Note.from_db_row(row)
-            else:
-                return None
-        except Exception as e:
-            print(f"DataManager Sync Error (get_note_sync ID {note_id}): {e}")
-            return None
-        finally:
-            if cursor:
-                cursor.close()
-
-    def get_snippet_sync(self, snippet_id: int) -> Optional[Snippet]:
-        print(f"DataManager: Executing synchronous get_snippet_sync for ID {snippet_id}")
-        cursor = None
-        try:
-            cursor = self._db_handler.connection.cursor()
-            cursor.execute("SELECT * FROM snippets WHERE id=?", (snippet_id,))
-            row = cursor.fetchone()
-            if row:
-                return Snippet.from_db_row(row)
-            else:
-                return None
-        except Exception as e:
-            print(f"DataManager Sync Error (get_snippet_sync ID {snippet_id}): {e}")
-            return None
-        finally:
-            if cursor:
-                cursor.close()
+    def load_all_notes_async(self, filter_tag: Optional[str] = None): self._submit("load_all_notes", self.core.list_notes(filter_tag), self.all_notes_loaded.emit)
+    def search_notes_async(self, query: str, filter_tag: Optional[str] = None): self._submit("search_notes", self.core.search_notes(query, filter_tag), self.note_searched.emit)
+    def add_note_async(self, note: Note): self._submit("add_note", self.core.add_note(note), self.note_added.emit, lambda tid: self.tags_updated.emit())
+    def update_note_async(self, note: Note): self._submit("update_note", self.core.update_note(note), self.note_updated.emit, lambda tid: self.tags_updated.emit())
+    def delete_note_async(self, note_id: int): self._submit(f"delete_note_{note_id}", self.core.delete_note(note_id), lambda deleted: self.note_deleted.emit(note_id) if deleted else None, lambda tid: self.tags_updated.emit())
+    def load_all_snippets_async(self, filter_tag: Optional[str] = None): self._submit("load_all_snippets", self.core.list_snippets(filter_tag), self.all_snippets_loaded.emit)
+    def search_snippets_async(self, query: str, filter_tag: Optional[str] = None): self._submit("search_snippets", self.core.search_snippets(query, filter_tag), self.snippet_searched.emit)
+    def add_snippet_async(self, snippet: Snippet): self._submit("add_snippet", self.core.add_snippet(snippet), self.snippet_added.emit, lambda tid: self.tags_updated.emit())
+    def update_snippet_async(self, snippet: Snippet): self._submit("update_snippet", self.core.update_snippet(snippet), self.snippet_updated.emit, lambda tid: self.tags_updated.emit())
+    def delete_snippet_async(self, snippet_id: int): self._submit(f"delete_snippet_{snippet_id}", self.core.delete_snippet(snippet_id), lambda deleted: self.snippet_deleted.emit(snippet_id) if deleted else None, lambda tid: self.tags_updated.emit())
+    def load_all_tags_async(self): self._submit("load_all_tags", self.core.all_tags(), self.all_tags_loaded.emit)
+    def load_recent_items_async(self, limit: int = 20): self._submit("load_recent_items", self.core.recent_items(limit), self.recent_items_loaded.emit)
+
+    # --- Streamed list queries ---
+    def stream_notes_async(self, query: Optional[str] = None, filter_tag: Optional[str] = None) -> int:
+        """
+        Loads (or searches, if `query` is given) note summaries and delivers them
+        through notes_chunk_loaded in chunks: the first STREAM_FIRST_CHUNK rows
+        as soon as they are read, the rest STREAM_CHUNK at a time. Returns the
+        stream id carried by every chunk.
+        """
+        return self._start_stream("stream_notes", self.core.stream_notes(query, filter_tag), self.notes_chunk_loaded)
+
+    def stream_snippets_async(self, query: Optional[str] = None, filter_tag: Optional[str] = None) -> int:
+        return self._start_stream("stream_snippets", self.core.stream_snippets(query, filter_tag), self.snippets_chunk_loaded)
+
+    def cancel_stream(self, stream_id: int):
+        """Stops a stream after its current chunk; no further chunks (not even a last one) are sent."""
+        future = self._streams.pop(stream_id, None)
+        if future: future.cancel()
+
+    def _start_stream(self, task_id_prefix: str, stream: RowStream, chunk_signal: pyqtSignal) -> int:
+        self._last_stream_id += 1; stream_id = self._last_stream_id
+        self._streams[stream_id] = self._submit(task_id_prefix, self._emit_chunks(stream_id, stream, chunk_signal), finished_callback=lambda tid: self._streams.pop(stream_id, None))
+        return stream_id
+
+    async def _emit_chunks(self, stream_id: int, stream: RowStream, chunk_signal: pyqtSignal) -> int:
+        async with stream:
+            async for rows in stream: chunk_signal.emit(stream_id, rows, stream.exhausted)
+        logger.debug("DataManager: Stream %s sent %s rows.", stream_id, stream.rows_read)
+        return stream.rows_read
+
+    # --- Diagnostics ---
+    def metrics_snapshot(self) -> dict: return TASK_METRICS.to_dict()
+    def reset_metrics(self): TASK_METRICS.reset()
+    def dump_metrics_json(self, path) -> Path: return TASK_METRICS.dump_json(Path(path))
+
+    # --- Backups ---
+    def configure_backups(self, interval_hours: float, keep: int, backup_dir: Optional[Path] = None):
+        """Enables scheduled backups every `interval_hours` (0 disables them), keeping the `keep` newest."""
+        self._backup_interval_hours = max(0.0, float(interval_hours)); self._backup_keep = max(1, int(keep))
+        if backup_dir: self._backup_dir = Path(backup_dir)
+        if self._backup_interval_hours > 0: self._backup_timer.start(); QTimer.singleShot(60 * 1000, self._check_backup_due)
+        else: self._backup_timer.stop()
+        logger.debug("DataManager: Scheduled backups every %sh, keeping %s in %s", self._backup_interval_hours, self._backup_keep, self._backup_dir)
+
+    def backup_now_async(self, compact: bool = False) -> bool:
+        if self._backup_running: logger.debug("DataManager: Backup already running, request ignored."); return False
+        self._backup_running = True
+        self.maintenance.back_off() # Maintenance writes through another connection and would restart the backup
+        finished = lambda tid: setattr(self, '_backup_running', False)
+        self._submit_task("backup", self._execute_backup, args=(compact,), result_signal=self.backup_completed, finished_callback=finished, thread_pool=self._background_pool)
+        return True
+
+    def change_token(self) -> Optional[int]:
+        """Counter that changes whenever a note or snippet is added, updated or deleted (see DBHandler). None if it cannot be read."""
+        return self._call_sync(self.core.change_token(), "change_token")
+
+    def last_backup_time(self) -> Optional[datetime]: return self._call_sync(self.core.last_run("backup"), "last_backup_time")
+
+    def _check_backup_due(self):
+        if self._backup_interval_hours <= 0 or self._backup_running: return
+        last_backup = self.last_backup_time()
+        if last_backup is None or (datetime.now() - last_backup).total_seconds() >= self._backup_interval_hours * 3600:
+            logger.debug("DataManager: Scheduled backup is due.")
+            self.backup_now_async()
+
+    # --- Sync Methods ---
+    def _call_sync(self, coroutine, what: str) -> Any:
+        """
+        Runs a core coroutine and blocks the calling thread until it is done, so
+        it is queued behind (and sees) earlier writes. Returns None on errors
+        and after shutdown. Must not be called from the loop thread itself.
+        """
+        if self._closed: coroutine.close(); logger.debug("DataManager: %s called after shutdown.", what); return None
+        try: return self._loop.submit(coroutine).result()
+        except Exception as e: logger.error("DataManager Sync Error (%s): %s", what, e); return None
+
+    def get_note_sync(self, note_id: int) -> Optional[Note]: return self._call_sync(self.core.get_note(note_id), f"get_note_sync ID {note_id}")
+    def get_snippet_sync(self, snippet_id: int) -> Optional[Snippet]: return self._call_sync(self.core.get_snippet(snippet_id), f"get_snippet_sync ID {snippet_id}")
+
+    def get_attachment_sync(self, digest: str) -> Optional[Tuple[str, bytes]]:
+        """
+        (mime type, bytes) of an attachment, read through incremental blob I/O on
+        the core executor. It never sees an attachment another write has only half
+        stored. Called from the image decode threads. None if missing or unreadable.
+        """
+        return self._call_sync(self.core.get_attachment(digest), f"get_attachment_sync {digest}")
+
+    def add_attachment_sync(self, data: bytes, mime: str) -> Optional[str]:
+        """
+        Stores an image pasted into a note right away, so the unsaved note (and
+        its recovery journal entry) can refer to it by hash. The write runs on
+        the core executor, so it cannot commit or roll back a save in progress.
+        """
+        return self._call_sync(self.core.add_attachment(data, mime), "add_attachment_sync")
     # -----------------------------------------------------
 
     # ==============================================================
-    # Internal Execution Methods (Corrected try/except/finally)
+    # Internal Execution Methods (run on the background pool)
     # ==============================================================
 
-    def _build_tag_filter_sql(self, filter_tag: Optional[str]) -> Tuple[str, List[str]]:
-        if not filter_tag: return "", []
-        sql_condition = " (',' || tags || ',') LIKE ? "; params = [f"%,{filter_tag.strip()},%"]
-        return sql_condition, params
-
-    def _execute_get_all_notes(self, filter_tag: Optional[str] = None) -> List[Note]:
-        print(f"DataManager Worker: Executing _execute_get_all_notes (Filter Tag: {filter_tag or 'None'})"); notes = []; cursor = None
-        try:
-            cursor = self._db_handler.connection.cursor(); query = "SELECT * FROM notes"; tag_sql, tag_params = self._build_tag_filter_sql(filter_tag); params = []
-            if tag_sql: query += " WHERE" + tag_sql; params.extend(tag_params)
-            query += " ORDER BY updated_at DESC"; cursor.execute(query, params); rows = cursor.fetchall(); notes = [Note.from_db_row(row) for row in rows]; print(f"DataManager Worker: _execute_get_all_notes found {len(notes)} notes.")
-        except Exception as e: print(f"DataManager Worker Error (_execute_get_all_notes): {e}"); raise e
-        finally:
-            if cursor: cursor.close()
-        return notes
-
-    def _execute_search_notes(self, query: str, filter_tag: Optional[str] = None) -> List[Note]:
-        print(f"DataManager Worker: Executing _execute_search_notes (Query: '{query}', Filter Tag: {filter_tag or 'None'})"); notes = []; cursor = None
-        try:
-            cursor = self._db_handler.connection.cursor(); search_term = f"%{query}%"; base_query = "SELECT * FROM notes WHERE (title LIKE ? OR content LIKE ? OR tags LIKE ?)"; params = [search_term, search_term, search_term]; tag_sql, tag_params = self._build_tag_filter_sql(filter_tag)
-            if tag_sql: base_query += " AND" + tag_sql; params.extend(tag_params)
-            base_query += " ORDER BY updated_at DESC"; cursor.execute(base_query, params); rows = cursor.fetchall(); notes = [Note.from_db_row(row) for row in rows]; print(f"DataManager Worker: _execute_search_notes found {len(notes)} notes.")
-        except Exception as e: print(f"DataManager Worker Error (_execute_search_notes): {e}"); raise e
-        finally:
-            if cursor: cursor.close()
-        return notes
-
-    def _execute_get_all_snippets(self, filter_tag: Optional[str] = None) -> List[Snippet]:
-        print(f"DataManager Worker: Executing _execute_get_all_snippets (Filter Tag: {filter_tag or 'None'})"); snippets = []; cursor = None
-        try:
-            cursor = self._db_handler.connection.cursor(); query = "SELECT * FROM snippets"; tag_sql, tag_params = self._build_tag_filter_sql(filter_tag); params = []
-            if tag_sql: query += " WHERE" + tag_sql; params.extend(tag_params)
-            query += " ORDER BY created_at DESC"; cursor.execute(query, params); rows = cursor.fetchall(); snippets = [Snippet.from_db_row(row) for row in rows]; print(f"DataManager Worker: _execute_get_all_snippets found {len(snippets)} snippets.")
-        except Exception as e: print(f"DataManager Worker Error (_execute_get_all_snippets): {e}"); raise e
-        finally:
-            if cursor: cursor.close()
-        return snippets
-
-    def _execute_search_snippets(self, query: str, filter_tag: Optional[str] = None) -> List[Snippet]:
-        print(f"DataManager Worker: Executing _execute_search_snippets (Query: '{query}', Filter Tag: {filter_tag or 'None'})"); snippets = []; cursor = None
-        try:
-            cursor = self._db_handler.connection.cursor(); search_term = f"%{query}%"; base_query = "SELECT * FROM snippets WHERE (title LIKE ? OR code LIKE ? OR tags LIKE ? OR language LIKE ?)"; params = [search_term, search_term, search_term, search_term]; tag_sql, tag_params = self._build_tag_filter_sql(filter_tag)
-            if tag_sql: base_query += " AND" + tag_sql; params.extend(tag_params)
-            base_query += " ORDER BY created_at DESC"; cursor.execute(base_query, params); rows = cursor.fetchall(); snippets = [Snippet.from_db_row(row) for row in rows]; print(f"DataManager Worker: _execute_search_snippets found {len(snippets)} snippets.")
-        except Exception as e: print(f"DataManager Worker Error (_execute_search_snippets): {e}"); raise e
-        finally:
-            if cursor: cursor.close()
-        return snippets
-
-    def _execute_get_all_tags(self) -> List[str]:
-        print("DataManager Worker: Executing _execute_get_all_tags"); all_tags: Set[str] = set(); cursor = None
-        try:
-            cursor = self._db_handler.connection.cursor(); cursor.execute("SELECT tags FROM notes WHERE tags IS NOT NULL AND tags != ''"); note_tag_rows = cursor.fetchall(); cursor.execute("SELECT tags FROM snippets WHERE tags IS NOT NULL AND tags != ''"); snippet_tag_rows = cursor.fetchall()
-            for row in note_tag_rows: tags = [tag.strip() for tag in row['tags'].split(',') if tag.strip()]; all_tags.update(tags)
-            for row in snippet_tag_rows: tags = [tag.strip() for tag in row['tags'].split(',') if tag.strip()]; all_tags.update(tags)
-            sorted_tags = sorted(list(all_tags)); print(f"DataManager Worker: _execute_get_all_tags found {len(sorted_tags)} unique tags."); return sorted_tags
-        except Exception as e: print(f"DataManager Worker Error (_execute_get_all_tags): {e}"); raise e
-        finally:
-             if cursor: cursor.close()
-
-    def _execute_add_note(self, note: Note) -> Optional[Note]:
-        print(f"DataManager Worker: Executing _execute_add_note for Note Title '{note.title}'")
-        now = datetime.now().isoformat()
-        new_note = None
-        conn = self._db_handler.connection
-        cursor = None
-        try:
-            cursor = conn.cursor()
-            cursor.execute("INSERT INTO notes (title, content, tags, created_at, updated_at) VALUES (?, ?, ?, ?, ?)",(note.title, note.content or "", note.tags or "", now, now))
-            new_id = cursor.lastrowid
-            conn.commit()
-            cursor.close() # Close insert cursor
-            cursor = conn.cursor() # Open select cursor
-            cursor.execute("SELECT * FROM notes WHERE id = ?", (new_id,))
-            row = cursor.fetchone()
-            if row:
-                new_note = Note.from_db_row(row)
-                print(f"DataManager Worker: _execute_add_note successful. New ID: {new_note.id}")
-        except Exception as e:
-            print(f"DataManager Worker Error (_execute_add_note): {e}")
-            try:
-                conn.rollback() # Rollback on error
-            except Exception as rb_e:
-                print(f"Rollback failed after error: {rb_e}")
-            raise e # Re-raise for worker signal
-        finally:
-            if cursor:
-                cursor.close()
-        return new_note
-
-    def _execute_update_note(self, note: Note) -> Optional[Note]:
-        print(f"DataManager Worker: Executing _execute_update_note for Note ID {note.id}")
-        if note.id is None: raise ValueError("Cannot update note with None ID")
-        now = datetime.now().isoformat(); updated_note = None
-        conn = self._db_handler.connection; cursor = None
-        try:
-            cursor = conn.cursor()
-            cursor.execute("UPDATE notes SET title=?, content=?, tags=?, updated_at=? WHERE id=?", (note.title, note.content or "", note.tags or "", now, note.id))
-            conn.commit()
-            cursor.close(); cursor = conn.cursor()
-            cursor.execute("SELECT * FROM notes WHERE id = ?", (note.id,))
-            row = cursor.fetchone(); updated_note = Note.from_db_row(row) if row else None
-            if updated_note: print(f"DataManager Worker: _execute_update_note successful for ID {note.id}")
-        except Exception as e: print(f"DataManager Worker Error (_execute_update_note ID {note.id}): {e}"); conn.rollback(); raise e
-        finally:
-            if cursor: cursor.close()
-        return updated_note
-
-    def _execute_delete_note(self, note_id: int) -> bool:
-        print(f"DataManager Worker: Executing _execute_delete_note for Note ID {note_id}")
-        success = False; conn = self._db_handler.connection; cursor = None
-        try:
-            cursor = conn.cursor()
-            cursor.execute("DELETE FROM notes WHERE id=?", (note_id,))
-            conn.commit(); success = cursor.rowcount > 0
-            print(f"DataManager Worker: _execute_delete_note successful for ID {note_id}: {success}")
-        except Exception as e: print(f"DataManager Worker Error (_execute_delete_note ID {note_id}): {e}"); conn.rollback(); raise e
-        finally:
-            if cursor: cursor.close()
-        return success
-
-    def _execute_add_snippet(self, snippet: Snippet) -> Optional[Snippet]:
-        print(f"DataManager Worker: Executing _execute_add_snippet for Snippet Title '{snippet.title}'")
-        now = datetime.now().isoformat(); new_snippet = None
-        conn = self._db_handler.connection; cursor = None
-        try:
-            cursor = conn.cursor()
-            cursor.execute("INSERT INTO snippets (title, code, language, tags, created_at) VALUES (?, ?, ?, ?, ?)", (snippet.title, snippet.code or "", snippet.language or "Text", snippet.tags or "", now))
-            new_id = cursor.lastrowid; conn.commit(); cursor.close(); cursor = conn.cursor()
-            cursor.execute("SELECT * FROM snippets WHERE id = ?", (new_id,))
-            row = cursor.fetchone(); new_snippet = Snippet.from_db_row(row) if row else None
-            if new_snippet: print(f"DataManager Worker: _execute_add_snippet successful. New ID: {new_snippet.id}")
-        except Exception as e: print(f"DataManager Worker Error (_execute_add_snippet): {e}"); conn.rollback(); raise e
-        finally:
-             if cursor: cursor.close()
-        return new_snippet
-
-    def _execute_update_snippet(self, snippet: Snippet) -> Optional[Snippet]:
-        print(f"DataManager Worker: Executing _execute_update_snippet for Snippet ID {snippet.id}")
-        if snippet.id is None: raise ValueError("Cannot update snippet with None ID")
-        updated_snippet = None; conn = self._db_handler.connection; cursor = None
-        try:
-            cursor = conn.cursor()
-            cursor.execute("UPDATE snippets SET title=?, code=?, language=?, tags=? WHERE id=?", (snippet.title, snippet.code or "", snippet.language or "Text", snippet.tags or "", snippet.id))
-            conn.commit(); cursor.close(); cursor = conn.cursor()
-            cursor.execute("SELECT * FROM snippets WHERE id = ?", (snippet.id,))
-            row = cursor.fetchone(); updated_snippet = Snippet.from_db_row(row) if row else None
-            if updated_snippet: print(f"DataManager Worker: _execute_update_snippet successful for ID {snippet.id}")
-        except Exception as e: print(f"DataManager Worker Error (_execute_update_snippet ID {snippet.id}): {e}"); conn.rollback(); raise e
-        finally:
-             if cursor: cursor.close()
-        return updated_snippet
-
-    def _execute_delete_snippet(self, snippet_id: int) -> bool:
-        print(f"DataManager Worker: Executing _execute_delete_snippet for Snippet ID {snippet_id}")
-        success = False; conn = self._db_handler.connection; cursor = None
-        try:
-            cursor = conn.cursor(); cursor.execute("DELETE FROM snippets WHERE id=?", (snippet_id,))
-            conn.commit(); success = cursor.rowcount > 0
-            print(f"DataManager Worker: _execute_delete_snippet successful for ID {snippet_id}: {success}")
-        except Exception as e: print(f"DataManager Worker Error (_execute_delete_snippet ID {snippet_id}): {e}"); conn.rollback(); raise e
-        finally:
-             if cursor: cursor.close()
-        return success
-
-    def _execute_get_recent_items(self, limit: int) -> List[RecentItem]:
-        print(f"DataManager Worker: Executing _execute_get_recent_items limit {limit}")
-        recent_items = []; cursor = None
-        try:
-            cursor = self._db_handler.connection.cursor()
-            query = """ SELECT type, id, title, created_at, updated_at, last_activity_at FROM (SELECT 'note' as type, id, title, created_at, updated_at, updated_at as last_activity_at FROM notes UNION ALL SELECT 'snippet' as type, id, title, created_at, NULL as updated_at, created_at as last_activity_at FROM snippets ) ORDER BY last_activity_at DESC LIMIT ? """
-            cursor.execute(query, (limit,)); rows = cursor.fetchall()
-            recent_items = [RecentItem.from_db_row(row) for row in rows]
-            print(f"DataManager Worker: _execute_get_recent_items found {len(recent_items)} items.")
-        except Exception as e: print(f"DataManager Worker Error (_execute_get_recent_items): {e}"); raise e
-        finally:
-             if cursor: cursor.close()
-        return recent_items
+    def _execute_backup(self, compact: bool = False) -> str:
+        logger.debug("DataManager Worker: Executing _execute_backup (compact: %s)", compact)
+        dest = self._backup_dir / backup_file_name()
+        if compact: run_compact_backup(self._db_handler.db_path, dest)
+        else: run_online_backup(self._db_handler.connection, dest, progress=lambda done, total: self.backup_progress.emit(done, total))
+        self._call_sync(self.core.record_run("backup"), "record backup time") # Committed by the core, never inside one of its transactions
+        removed = rotate_backups(self._backup_dir, self._backup_keep)
+        logger.info("DataManager Worker: _execute_backup wrote %s (%s bytes), removed %s old backups.", dest, dest.stat().st_size, len(removed))
+        return str(dest)
 
     def shutdown(self):
-        print("DataManager: Shutting down..."); active_threads = self._thread_pool.activeThreadCount()
-        if active_threads > 0: print(f"DataManager: Waiting for {active_threads} active threads in pool..."); self._thread_pool.waitForDone(); print("DataManager: Thread pool finished.")
-        else: print("DataManager: Thread pool already idle."); self.close_db(); print("DataManager: Shutdown complete.")
+        """Stops streams and scheduled work, waits for queued saves and running jobs, then closes the database."""
+        logger.debug("DataManager: Shutting down..."); self.maintenance.stop(); self._backup_timer.stop()
+        for stream_id in list(self._streams): self.cancel_stream(stream_id)
+        pending = [task for task in list(self._active_tasks.values()) if isinstance(task, concurrent.futures.Future)]
+        if pending: logger.debug("DataManager: Waiting for %s queued database tasks...", len(pending)); concurrent.futures.wait(pending)
+        self._background_pool.waitForDone(); self._thread_pool.waitForDone()
+        self._closed = True; self.core.close(); self._loop.stop(); self.close_db(); logger.info("DataManager: Shutdown complete.")
 
     def close_db(self):
-        print("DataManager: Closing DB connection.")
+        logger.debug("DataManager: Closing DB connection.")
         if self._db_handler:
             self._db_handler.close()
 
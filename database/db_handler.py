@@ -1,16 +1,22 @@
 # database/db_handler.py
 
+import logging
 import sqlite3
 from pathlib import Path
 from typing import Optional
+from .storage_profiles import apply_storage_profile, get_storage_profile
+
+logger = logging.getLogger(__name__)
 
 class DBHandler:
     """
     Manages the SQLite database connection and initialization.
     Ensures the connection is usable by multiple threads if configured.
+    The connection is tuned with a named storage profile (see storage_profiles.py).
     """
-    def __init__(self, db_path: Path):
+    def __init__(self, db_path: Path, storage_profile: Optional[str] = None):
         self.db_path = db_path
+        self.storage_profile = get_storage_profile(storage_profile)
         self.connection: Optional[sqlite3.Connection] = None
         self._connect()
 
@@ -24,19 +30,28 @@ class DBHandler:
             # Enable row factory for accessing columns by name
             self.connection.row_factory = sqlite3.Row
             self._init_db()
-            print(f"DBHandler: Database connected successfully: {self.db_path}")
+            try: apply_storage_profile(self.connection, self.storage_profile, Path(self.db_path))
+            except sqlite3.Error as e: logger.error("DBHandler: Could not apply storage profile '%s': %s", self.storage_profile.name, e) # SQLite defaults still work
+            logger.info("DBHandler: Database connected successfully: %s", self.db_path)
         except sqlite3.Error as e:
-            print(f"DBHandler: Database connection error to {self.db_path}: {e}")
+            logger.error("DBHandler: Database connection error to %s: %s", self.db_path, e)
             self.connection = None # Ensure connection is None if failed
 
     def _init_db(self):
         """Initializes database tables if they don't exist."""
         if not self.connection:
-             print("DBHandler: Cannot initialize DB - no connection.")
+             logger.warning("DBHandler: Cannot initialize DB - no connection.")
              return
         try:
             cursor = self.connection.cursor()
-            print("DBHandler: Checking/Creating database tables...")
+            logger.debug("DBHandler: Checking/Creating database tables...")
+
+            # auto_vacuum and the page size can only be chosen cheaply before the first table is created.
+            # INCREMENTAL lets idle-time maintenance release free pages in small steps.
+            cursor.execute("SELECT COUNT(*) FROM sqlite_master")
+            if cursor.fetchone()[0] == 0:
+                cursor.execute(f"PRAGMA page_size = {self.storage_profile.page_size}") # Must come first: setting auto_vacuum fixes the page size
+                cursor.execute("PRAGMA auto_vacuum = INCREMENTAL")
 
             # Notes table
             cursor.execute("""
@@ -65,27 +80,68 @@ class DBHandler:
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_notes_tags ON notes(tags)")
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_snippets_tags ON snippets(tags)")
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_snippets_language ON snippets(language)")
+            # List order; lets streamed list queries return their first rows without sorting the whole table
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_notes_updated_at ON notes(updated_at)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_snippets_created_at ON snippets(created_at)")
+
+            # Change counter bumped by every insert, update and delete of a note or snippet.
+            # Reading it is cheap, so callers can tell whether anything changed since they last looked
+            # (PRAGMA data_version only covers other connections within one session).
+            cursor.execute("CREATE TABLE IF NOT EXISTS data_changes (id INTEGER PRIMARY KEY CHECK (id = 1), version INTEGER NOT NULL)")
+            cursor.execute("INSERT OR IGNORE INTO data_changes (id, version) VALUES (1, 0)")
+            for table in ("notes", "snippets"):
+                for event in ("INSERT", "UPDATE", "DELETE"):
+                    cursor.execute(f"CREATE TRIGGER IF NOT EXISTS trg_{table}_{event.lower()}_changes AFTER {event} ON {table} BEGIN UPDATE data_changes SET version = version + 1 WHERE id = 1; END")
+
+            # Images used in notes, stored once per content hash (see database/attachments.py),
+            # and which note refers to which. Deleting a note drops its references; the
+            # attachments themselves are removed by maintenance once nothing refers to them.
+            cursor.execute("""
+            CREATE TABLE IF NOT EXISTS attachments (
+                hash TEXT PRIMARY KEY,
+                mime TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                data BLOB NOT NULL,
+                created_at TEXT NOT NULL
+            )
+            """)
+            cursor.execute("""
+            CREATE TABLE IF NOT EXISTS attachment_refs (
+                note_id INTEGER NOT NULL,
+                hash TEXT NOT NULL,
+                PRIMARY KEY (note_id, hash)
+            )
+            """)
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_attachment_refs_hash ON attachment_refs(hash)")
+            cursor.execute("CREATE TRIGGER IF NOT EXISTS trg_notes_delete_attachment_refs AFTER DELETE ON notes BEGIN DELETE FROM attachment_refs WHERE note_id = OLD.id; END")
 
+            # Last successful run of each idle-time maintenance task
+            cursor.execute("""
+            CREATE TABLE IF NOT EXISTS maintenance_log (
+                task TEXT PRIMARY KEY,
+                last_run_at TEXT NOT NULL
+            )
+            """)
 
             self.connection.commit()
             cursor.close()
-            print("DBHandler: Database tables checked/initialized.")
+            logger.debug("DBHandler: Database tables checked/initialized.")
         except sqlite3.Error as e:
-             print(f"DBHandler: Error initializing database tables: {e}")
+             logger.error("DBHandler: Error initializing database tables: %s", e)
              # Attempt rollback if initialization fails partially
              try:
                  self.connection.rollback()
              except sqlite3.Error as rb_err:
-                 print(f"DBHandler: Rollback failed after init error: {rb_err}")
+                 logger.error("DBHandler: Rollback failed after init error: %s", rb_err)
 
 
     def close(self):
         """Closes the database connection."""
         if self.connection:
-             print(f"DBHandler: Closing database connection to {self.db_path}...")
+             logger.debug("DBHandler: Closing database connection to %s...", self.db_path)
              self.connection.close()
              self.connection = None
-             print("DBHandler: Database connection closed.")
+             logger.debug("DBHandler: Database connection closed.")
 
     # Destructor to ensure connection is closed if handler object is deleted
     def __del__(self):
@@ -1,9 +1,12 @@
 # database/db_worker.py
 
 from PyQt6.QtCore import QRunnable, pyqtSignal, QObject
-from typing import Callable, Any
-import traceback
+from typing import Callable, Any, Optional
+import logging
 import time
+from .metrics import TASK_METRICS, count_rows
+
+logger = logging.getLogger(__name__)
 
 # Helper class to emit signals from the QRunnable
 class WorkerSignals(QObject):
@@ -28,14 +31,19 @@ class DBWorker(QRunnable):
         method: The function/method to execute in the background.
         args: Positional arguments to pass to the method.
         kwargs: Keyword arguments to pass to the method.
+        task_type: Key under which latency metrics are recorded
+            (defaults to the method name without the `_execute_` prefix).
     """
-    def __init__(self, task_id: str, method: Callable, args: tuple = (), kwargs: dict = {}):
+    def __init__(self, task_id: str, method: Callable, args: tuple = (), kwargs: dict = {}, task_type: Optional[str] = None):
         super().__init__()
         self.task_id = task_id
         self.method = method
         self.args = args
         self.kwargs = kwargs
+        self.task_type = task_type or method.__name__.lstrip("_").removeprefix("execute_")
         self.signals = WorkerSignals()
+        # Workers are started right after construction, so this marks the time spent queued in the pool.
+        self._created_at = time.perf_counter()
 
         # Enable auto-deletion of the QRunnable after run() finishes
         self.setAutoDelete(True)
@@ -44,26 +52,28 @@ class DBWorker(QRunnable):
         """
         Executes the assigned database method and emits signals based on the outcome.
         """
-        print(f"DBWorker ({self.task_id}): Starting execution of '{self.method.__name__}'...")
-        start_time = time.time()
+        start_time = time.perf_counter()
+        queue_wait = start_time - self._created_at
+        logger.debug("DBWorker (%s): Starting execution of '%s' after %.4fs in queue...", self.task_id, self.method.__name__, queue_wait)
+        rows = 0; error = None
         try:
             # Execute the target method with provided arguments
             result = self.method(*self.args, **self.kwargs)
+            rows = count_rows(result)
             # Emit result signal on success
             self.signals.result.emit(self.task_id, result)
-            status = "Success"
         except Exception as e:
             # Catch any exception during execution
-            error_string = f"Task '{self.task_id}' failed: {e}\n{traceback.format_exc()}"
-            print(error_string) # Log error to console
+            error = str(e)
+            logger.error("Task '%s' failed: %s", self.task_id, e, exc_info=True)
             # Emit error signal
-            self.signals.error.emit(self.task_id, str(e)) # Emit only the exception message for UI
-            status = "Error"
+            self.signals.error.emit(self.task_id, error) # Emit only the exception message for UI
         finally:
+            execution = time.perf_counter() - start_time
+            TASK_METRICS.record(self.task_type, queue_wait, execution, rows, error)
             # Always emit finished signal
             self.signals.finished.emit(self.task_id)
-            end_time = time.time()
-            print(f"DBWorker ({self.task_id}): Finished execution in {end_time - start_time:.4f}s. Status: {status}")
+            logger.debug("DBWorker (%s): Finished execution in %.4fs. Status: %s", self.task_id, execution, "Error" if error is not None else "Success")
 
 # database/db_worker.py
 # --- END OF FILE db_worker.py ---
@@ -0,0 +1,276 @@
+# database/maintenance.py
+
+import logging
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, Generator, List, Optional, Tuple
+from PyQt6.QtCore import QObject, QThreadPool, QTimer, pyqtSignal
+from .attachments import delete_unreferenced, set_note_attachments, store_note_content
+from .db_worker import DBWorker
+
+logger = logging.getLogger(__name__)
+
+# Tables that maintenance slices operate on one at a time.
+MAINTAINED_TABLES = ("notes", "snippets", "attachments", "attachment_refs")
+# Pages released per incremental_vacuum slice.
+VACUUM_PAGES_PER_SLICE = 256
+# Unreferenced attachments deleted per slice.
+ATTACHMENT_GC_PER_SLICE = 200
+# Longer note bodies are converted to the compact format at their next save instead
+# (parsing one holds the GIL long enough to stall the UI).
+COMPACT_NOTE_MAX_CHARS = 200_000
+
+class MaintenanceScheduler(QObject):
+    """
+    Runs SQLite housekeeping (ANALYZE, PRAGMA optimize, incremental_vacuum,
+    integrity checks, moving inline images into attachments and deleting
+    unreferenced ones, converting old note bodies to the compact HTML format)
+    while the application is idle.
+
+    Every task is a generator that performs one small unit of work per step.
+    Each step runs as its own DBWorker on the shared thread pool, so a run can
+    be abandoned between any two steps. Maintenance uses a dedicated
+    connection, which lets `back_off()` interrupt an in-flight statement
+    without touching queries issued by the UI.
+    """
+    maintenance_started = pyqtSignal()
+    maintenance_stopped = pyqtSignal(bool) # True if all due tasks completed
+    task_completed = pyqtSignal(str)
+    problem_detected = pyqtSignal(str, str) # task name, details
+
+    CHECK_INTERVAL_MS = 30 * 1000
+
+    def __init__(self, db_path: Path, thread_pool: QThreadPool, has_pending_tasks: Callable[[], bool], parent: QObject = None):
+        super().__init__(parent)
+        self._db_path = db_path
+        self._thread_pool = thread_pool
+        self._has_pending_tasks = has_pending_tasks
+        self._connection: Optional[sqlite3.Connection] = None
+        self._idle_seconds = 5 * 60
+        self._last_activity = time.monotonic()
+        self._last_runs: Optional[Dict[str, datetime]] = None
+        self._queue: List[str] = []
+        self._current_task: Optional[str] = None
+        self._current_steps: Optional[Generator] = None
+        self._running = False
+        self._cancel_event = threading.Event()
+        self._generation = 0
+        # name -> (minimum interval between runs, step generator factory)
+        self._tasks: Dict[str, Tuple[timedelta, Callable[[sqlite3.Connection], Generator]]] = {
+            "extract_inline_images": (timedelta(days=1), self._steps_extract_inline_images),
+            "attachment_gc": (timedelta(days=1), self._steps_attachment_gc),
+            "compact_note_html": (timedelta(days=7), self._steps_compact_note_html),
+            "analyze": (timedelta(days=7), self._steps_analyze),
+            "optimize": (timedelta(days=1), self._steps_optimize),
+            "incremental_vacuum": (timedelta(days=1), self._steps_incremental_vacuum),
+            "integrity_check": (timedelta(days=7), self._steps_integrity_check),
+        }
+        self._check_timer = QTimer(self)
+        self._check_timer.setInterval(self.CHECK_INTERVAL_MS)
+        self._check_timer.timeout.connect(self._check_idle)
+
+    # --- Public API ---
+    def start(self, idle_minutes: Optional[float] = None):
+        if idle_minutes is not None: self.set_idle_minutes(idle_minutes)
+        self._last_activity = time.monotonic()
+        self._check_timer.start()
+
+    def stop(self):
+        self._check_timer.stop()
+        self.back_off()
+        if self._connection:
+            try: self._connection.close()
+            except sqlite3.Error as e: logger.error("MaintenanceScheduler: Error closing maintenance connection: %s", e)
+            self._connection = None
+
+    def set_idle_minutes(self, minutes: float):
+        self._idle_seconds = max(0.0, float(minutes)) * 60
+
+    def notify_activity(self):
+        """Called on user input. Must stay cheap: it runs for every key press and click."""
+        self._last_activity = time.monotonic()
+        if self._running: self.back_off()
+
+    def back_off(self):
+        if not self._running: return
+        logger.debug("MaintenanceScheduler: Backing off (task '%s' interrupted).", self._current_task)
+        self._cancel_event.set()
+        if self._connection:
+            try: self._connection.interrupt()
+            except sqlite3.Error: pass
+        self._finish_run(completed=False)
+
+    def is_running(self) -> bool: return self._running
+
+    def last_runs(self) -> Dict[str, datetime]:
+        return dict(self._load_last_runs())
+
+    def run_now(self):
+        """Starts a maintenance run regardless of idle state (due tasks only)."""
+        if not self._running: self._start_run()
+
+    # --- Scheduling ---
+    def _is_idle(self) -> bool:
+        return (time.monotonic() - self._last_activity) >= self._idle_seconds and not self._has_pending_tasks()
+
+    def _check_idle(self):
+        if not self._running and self._is_idle():
+            self._start_run()
+
+    def _due_tasks(self) -> List[str]:
+        now = datetime.now(); last_runs = self._load_last_runs()
+        return [name for name, (interval, _) in self._tasks.items() if name not in last_runs or now - last_runs[name] >= interval]
+
+    def _start_run(self):
+        self._queue = self._due_tasks()
+        if not self._queue: return
+        if not self._ensure_connection(): self._queue = []; return
+        logger.info("MaintenanceScheduler: Application idle, starting maintenance: %s", self._queue)
+        self._running = True; self._cancel_event.clear(); self._generation += 1
+        self.maintenance_started.emit()
+        self._advance_task()
+
+    def _advance_task(self):
+        if not self._queue: self._finish_run(completed=True); return
+        self._current_task = self._queue.pop(0)
+        _, factory = self._tasks[self._current_task]
+        self._current_steps = factory(self._connection)
+        self._submit_step()
+
+    def _submit_step(self):
+        generation = self._generation; task_name = self._current_task; steps = self._current_steps
+        task_id = f"maintenance_{task_name}_{generation}_{time.monotonic()}"
+        worker = DBWorker(task_id, self._execute_step, args=(task_name, steps, generation), task_type=f"maintenance_{task_name}")
+        worker.signals.result.connect(lambda tid, more: self._on_step_done(generation, task_name, more))
+        worker.signals.error.connect(lambda tid, err: self._on_step_error(generation, task_name, err))
+        self._thread_pool.start(worker)
+
+    def _on_step_done(self, generation: int, task_name: str, more: bool):
+        if generation != self._generation or not self._running: return # Stale step from an abandoned run
+        if more:
+            # Re-check between steps so returning input or a queued UI query wins immediately.
+            if self._has_pending_tasks(): self.back_off(); return
+            self._submit_step(); return
+        self._load_last_runs()[task_name] = datetime.now()
+        self.task_completed.emit(task_name)
+        self._advance_task()
+
+    def _on_step_error(self, generation: int, task_name: str, error_message: str):
+        if generation != self._generation or not self._running: return
+        if "interrupt" in error_message.lower(): return # Cancelled by back_off()
+        logger.error("MaintenanceScheduler: Task '%s' failed: %s", task_name, error_message)
+        self.problem_detected.emit(task_name, error_message)
+        self._advance_task()
+
+    def _finish_run(self, completed: bool):
+        if not self._running: return
+        self._running = False; self._generation += 1
+        self._current_task = None; self._current_steps = None; self._queue = []
+        logger.info("MaintenanceScheduler: Maintenance run ended. Completed: %s", completed)
+        self.maintenance_stopped.emit(completed)
+
+    # --- Worker side ---
+    def _execute_step(self, task_name: str, steps: Generator, generation: int) -> bool:
+        """Runs one step of a task generator. Returns True if more steps remain."""
+        if self._cancel_event.is_set() or generation != self._generation: return False
+        try:
+            next(steps)
+            return True
+        except StopIteration:
+            self._record_run(task_name)
+            return False
+
+    def _steps_extract_inline_images(self, conn: sqlite3.Connection) -> Generator:
+        # Notes saved before attachments existed (or never re-saved since) still carry base64 images; one note per step.
+        note_ids = [row[0] for row in conn.execute("SELECT id FROM notes WHERE instr(content, ';base64,') > 0")]
+        yield
+        for note_id in note_ids:
+            row = conn.execute("SELECT content FROM notes WHERE id = ?", (note_id,)).fetchone()
+            if row is not None:
+                content = store_note_content(conn, row[0] or "")
+                if content != row[0]: conn.execute("UPDATE notes SET content = ? WHERE id = ?", (content, note_id)); set_note_attachments(conn, note_id, content)
+                conn.commit()
+            yield
+
+    def _steps_attachment_gc(self, conn: sqlite3.Connection) -> Generator:
+        while True:
+            deleted = delete_unreferenced(conn, ATTACHMENT_GC_PER_SLICE); conn.commit()
+            if deleted: logger.debug("MaintenanceScheduler: Deleted %s unreferenced attachments.", deleted)
+            if deleted < ATTACHMENT_GC_PER_SLICE: return
+            yield
+
+    def _steps_compact_note_html(self, conn: sqlite3.Connection) -> Generator:
+        # Rewrites toHtml() note bodies in the compact format, one note per step; updated_at is left alone.
+        from utils.note_format import compact_stored_html # Qt GUI classes; only needed here
+        from utils.note_text import LEGACY_PREFIX
+        note_ids = [row[0] for row in conn.execute("SELECT id FROM notes WHERE substr(content, 1, ?) = ? AND length(content) <= ?", (len(LEGACY_PREFIX), LEGACY_PREFIX, COMPACT_NOTE_MAX_CHARS))]
+        converted = before = after = 0
+        yield
+        for note_id in note_ids:
+            row = conn.execute("SELECT content FROM notes WHERE id = ?", (note_id,)).fetchone()
+            compact = compact_stored_html(row[0]) if row is not None else None
+            if compact is not None:
+                conn.execute("UPDATE notes SET content = ? WHERE id = ? AND content = ?", (compact, note_id, row[0])); conn.commit()
+                converted += 1; before += len(row[0]); after += len(compact)
+            yield
+        if converted: logger.info("MaintenanceScheduler: Converted %d of %d note bodies to the compact format: %d -> %d characters.", converted, len(note_ids), before, after)
+
+    def _steps_analyze(self, conn: sqlite3.Connection) -> Generator:
+        for table in MAINTAINED_TABLES:
+            conn.execute(f"ANALYZE {table}"); conn.commit()
+            yield
+
+    def _steps_optimize(self, conn: sqlite3.Connection) -> Generator:
+        conn.execute("PRAGMA optimize"); conn.commit()
+        yield
+
+    def _steps_incremental_vacuum(self, conn: sqlite3.Connection) -> Generator:
+        # Only databases created with auto_vacuum=INCREMENTAL can release pages this way.
+        if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2: return
+        while conn.execute("PRAGMA freelist_count").fetchone()[0] > 0:
+            conn.execute(f"PRAGMA incremental_vacuum({VACUUM_PAGES_PER_SLICE})").fetchall(); conn.commit()
+            yield
+
+    def _steps_integrity_check(self, conn: sqlite3.Connection) -> Generator:
+        for table in MAINTAINED_TABLES:
+            rows = conn.execute(f"PRAGMA integrity_check({table})").fetchall()
+            messages = [row[0] for row in rows]
+            if messages != ["ok"]:
+                details = "; ".join(messages[:10])
+                logger.debug("MaintenanceScheduler: Integrity problem in '%s': %s", table, details)
+                self.problem_detected.emit("integrity_check", f"{table}: {details}")
+            yield
+
+    # --- State ---
+    def _ensure_connection(self) -> bool:
+        if self._connection: return True
+        try:
+            self._connection = sqlite3.connect(self._db_path, timeout=1.0, check_same_thread=False)
+            return True
+        except sqlite3.Error as e:
+            logger.warning("MaintenanceScheduler: Could not open maintenance connection: %s", e)
+            return False
+
+    def _load_last_runs(self) -> Dict[str, datetime]:
+        if self._last_runs is not None: return self._last_runs
+        self._last_runs = {}
+        if not self._ensure_connection(): return self._last_runs
+        try:
+            for task, last_run_at in self._connection.execute("SELECT task, last_run_at FROM maintenance_log"):
+                try: self._last_runs[task] = datetime.fromisoformat(last_run_at)
+                except (TypeError, ValueError): pass
+        except sqlite3.Error as e: logger.warning("MaintenanceScheduler: Could not read maintenance log: %s", e)
+        return self._last_runs
+
+    def _record_run(self, task_name: str):
+        try:
+            self._connection.execute("INSERT OR REPLACE INTO maintenance_log (task, last_run_at) VALUES (?, ?)", (task_name, datetime.now().isoformat()))
+            self._connection.commit()
+            logger.debug("MaintenanceScheduler: Task '%s' completed.", task_name)
+        except sqlite3.Error as e: logger.warning("MaintenanceScheduler: Could not record run of '%s': %s", task_name, e)
+
+# database/maintenance.py
+# --- END OF FILE maintenance.py ---
@@ -0,0 +1,116 @@
+# database/metrics.py
+
+import json
+import math
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Log-scale latency buckets from 10 µs to ~10 min; each bucket is 25% wider than the previous one.
+_BUCKET_BASE = 1e-5
+_BUCKET_GROWTH = 1.25
+_BUCKET_COUNT = int(math.log(600 / _BUCKET_BASE, _BUCKET_GROWTH)) + 2
+
+class LatencyHistogram:
+    """Fixed-size log-bucket histogram. Memory does not grow with the number of samples."""
+    __slots__ = ("counts", "total", "sum", "min", "max")
+
+    def __init__(self):
+        self.counts = [0] * _BUCKET_COUNT
+        self.total = 0; self.sum = 0.0; self.min = math.inf; self.max = 0.0
+
+    def add(self, seconds: float):
+        seconds = max(seconds, 0.0)
+        index = 0 if seconds <= _BUCKET_BASE else min(_BUCKET_COUNT - 1, int(math.log(seconds / _BUCKET_BASE, _BUCKET_GROWTH)) + 1)
+        self.counts[index] += 1
+        self.total += 1; self.sum += seconds
+        if seconds < self.min: self.min = seconds
+        if seconds > self.max: self.max = seconds
+
+    def percentile(self, fraction: float) -> float:
+        """Returns the upper bound of the bucket containing the given fraction of samples (clamped to the observed max)."""
+        if not self.total: return 0.0
+        rank = fraction * self.total; seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank: return min(_BUCKET_BASE * (_BUCKET_GROWTH ** index), self.max)
+        return self.max
+
+    def to_dict(self) -> Dict[str, float]:
+        return {
+            "count": self.total,
+            "mean_ms": (self.sum / self.total * 1000) if self.total else 0.0,
+            "min_ms": (self.min * 1000) if self.total else 0.0,
+            "p50_ms": self.percentile(0.50) * 1000,
+            "p95_ms": self.percentile(0.95) * 1000,
+            "p99_ms": self.percentile(0.99) * 1000,
+            "max_ms": self.max * 1000,
+        }
+
+class _TaskStats:
+    __slots__ = ("queue_wait", "execution", "total", "errors", "rows", "last_error")
+
+    def __init__(self):
+        self.queue_wait = LatencyHistogram(); self.execution = LatencyHistogram(); self.total = LatencyHistogram()
+        self.errors = 0; self.rows = 0; self.last_error: Optional[str] = None
+
+class TaskMetrics:
+    """
+    Thread-safe per-task-type statistics for background DB work.
+
+    Workers report queue wait (submit -> start in the thread pool), execution
+    time, row counts and errors. Reads take a snapshot under the lock.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: Dict[str, _TaskStats] = {}
+        self._started_at = time.time()
+
+    def record(self, task_type: str, queue_wait: float, execution: float, rows: int = 0, error: Optional[str] = None):
+        with self._lock:
+            stats = self._stats.get(task_type)
+            if stats is None: stats = self._stats[task_type] = _TaskStats()
+            stats.queue_wait.add(queue_wait); stats.execution.add(execution); stats.total.add(queue_wait + execution)
+            stats.rows += rows
+            if error is not None: stats.errors += 1; stats.last_error = error
+
+    def reset(self):
+        with self._lock: self._stats.clear(); self._started_at = time.time()
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            tasks = {}
+            for task_type, stats in sorted(self._stats.items()):
+                count = stats.execution.total
+                tasks[task_type] = {
+                    "count": count,
+                    "errors": stats.errors,
+                    "last_error": stats.last_error,
+                    "rows_total": stats.rows,
+                    "rows_mean": (stats.rows / count) if count else 0.0,
+                    "queue_wait": stats.queue_wait.to_dict(),
+                    "execution": stats.execution.to_dict(),
+                    "total": stats.total.to_dict(),
+                }
+            return {"collected_since": self._started_at, "generated_at": time.time(), "tasks": tasks}
+
+    def task_types(self) -> List[str]:
+        with self._lock: return sorted(self._stats)
+
+    def dump_json(self, path: Path) -> Path:
+        path = Path(path); path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f: json.dump(self.to_dict(), f, indent=2)
+        return path
+
+def count_rows(result: Any) -> int:
+    """Row count reported for a task result: list length, an int as is (streamed queries return their row count), 1 for a single object, 0 for nothing."""
+    if isinstance(result, (list, tuple)): return len(result)
+    if isinstance(result, int) and not isinstance(result, bool): return result
+    return 0 if result is None or result is False else 1
+
+# Process-wide registry shared by all workers.
+TASK_METRICS = TaskMetrics()
+
+# database/metrics.py
+# --- END OF FILE metrics.py ---
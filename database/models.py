@@ -4,8 +4,11 @@
 from dataclasses import dataclass, fields
 from datetime import datetime
 from typing import Optional
+import logging
 import sqlite3
 
+logger = logging.getLogger(__name__)
+
 def _parse_datetime(dt_str: Optional[str]) -> Optional[datetime]:
     """Safely parse ISO format datetime strings (potentially with Z or offset)."""
     if not dt_str:
@@ -22,10 +25,10 @@ def _parse_datetime(dt_str: Optional[str]) -> Optional[datetime]:
             # Example: YYYY-MM-DD HH:MM:SS
             return datetime.strptime(dt_str, "%Y-%m-%d %H:%M:%S")
         except (ValueError, TypeError):
-            print(f"Warning: Could not parse datetime string: '{dt_str}'")
+            logger.warning("Could not parse datetime string: '%s'", dt_str)
             return None
     except Exception as e: # Catch any other unexpected error during parsing
-        print(f"Warning: Unexpected error parsing datetime string '{dt_str}': {e}")
+        logger.warning("Unexpected error parsing datetime string '%s': %s", dt_str, e)
         return None
 
 
@@ -0,0 +1,21 @@
+# database/paths.py
+"""Application data locations. Importing this module touches no files; call ensure_app_data_dir() before writing."""
+import logging
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+HOME_DIR = Path.home()
+APP_DATA_DIR = HOME_DIR / ".notes_manager"
+DB_PATH = APP_DATA_DIR / "notes.db"
+BACKUP_DIR = APP_DATA_DIR / "backups"
+
+def ensure_app_data_dir(path: Path = APP_DATA_DIR) -> Path:
+    try:
+        path.mkdir(parents=True, exist_ok=True)
+    except OSError as e:
+        logger.error("Could not create application data directory %s: %s", path, e)
+    return path
+
+# database/paths.py
+# --- END OF FILE paths.py ---
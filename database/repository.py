@@ -0,0 +1,171 @@
+# database/repository.py
+"""
+The note and snippet queries, on a plain sqlite3 connection and without Qt.
+DataManager runs them on its worker threads; notes_cli.py calls them directly.
+Every write commits on its own unless it runs inside `batch()`.
+"""
+import logging
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Iterator, List, Optional, Set, Tuple
+from .attachments import read_attachment, set_note_attachments, store_note_content, write_attachment
+from .models import Note, Snippet, RecentItem
+
+logger = logging.getLogger(__name__)
+
+# Summary queries carry what the sidebar lists show; editors load the full row by id.
+NOTE_SUMMARY_COLUMNS = "id, title, '' AS content, tags, created_at, updated_at"
+SNIPPET_SUMMARY_COLUMNS = "id, title, '' AS code, language, tags, created_at"
+
+def tag_filter_sql(filter_tag: Optional[str]) -> Tuple[str, List[str]]:
+    if not filter_tag: return "", []
+    return " (',' || tags || ',') LIKE ? ", [f"%,{filter_tag.strip()},%"]
+
+def _where(conditions: List[str]) -> str: return " WHERE " + " AND ".join(conditions) if conditions else ""
+
+class Repository:
+    def __init__(self, connection: sqlite3.Connection):
+        self.connection = connection
+        self._batch_depth = 0
+
+    @contextmanager
+    def batch(self):
+        """Runs the writes inside the block as one transaction: committed at the end, rolled back if it raises."""
+        self._batch_depth += 1
+        try: yield self
+        except BaseException:
+            self._batch_depth -= 1
+            if not self._batch_depth: self.connection.rollback()
+            raise
+        self._batch_depth -= 1
+        if not self._batch_depth: self.connection.commit()
+
+    @contextmanager
+    def _write(self) -> Iterator[sqlite3.Cursor]:
+        cursor = self.connection.cursor()
+        try:
+            yield cursor
+            if not self._batch_depth: self.connection.commit()
+        except Exception:
+            if not self._batch_depth: self.connection.rollback()
+            raise
+        finally: cursor.close()
+
+    def _fetch_all(self, sql: str, params: list, from_row) -> list:
+        cursor = self.connection.cursor()
+        try: cursor.execute(sql, params); return [from_row(row) for row in cursor.fetchall()]
+        finally: cursor.close()
+
+    # --- Notes ---
+    def get_note(self, note_id: int) -> Optional[Note]:
+        row = self.connection.execute("SELECT * FROM notes WHERE id = ?", (note_id,)).fetchone()
+        return Note.from_db_row(row) if row else None
+
+    def list_notes(self, filter_tag: Optional[str] = None) -> List[Note]:
+        tag_sql, params = tag_filter_sql(filter_tag)
+        return self._fetch_all("SELECT * FROM notes" + _where([tag_sql] if tag_sql else []) + " ORDER BY updated_at DESC", params, Note.from_db_row)
+
+    def search_notes(self, query: str, filter_tag: Optional[str] = None) -> List[Note]:
+        search_term = f"%{query}%"; tag_sql, tag_params = tag_filter_sql(filter_tag)
+        conditions = ["(title LIKE ? OR content LIKE ? OR tags LIKE ?)"] + ([tag_sql] if tag_sql else [])
+        return self._fetch_all("SELECT * FROM notes" + _where(conditions) + " ORDER BY updated_at DESC", [search_term] * 3 + tag_params, Note.from_db_row)
+
+    def note_summaries(self, query: Optional[str] = None, filter_tag: Optional[str] = None) -> sqlite3.Cursor:
+        """Executed cursor over note summaries (content left empty), newest first. The caller fetches and closes it."""
+        conditions = []; params = []
+        if query: conditions.append("(title LIKE ? OR content LIKE ? OR tags LIKE ?)"); params += [f"%{query}%"] * 3
+        tag_sql, tag_params = tag_filter_sql(filter_tag)
+        if tag_sql: conditions.append(tag_sql); params += tag_params
+        cursor = self.connection.cursor(); cursor.execute(f"SELECT {NOTE_SUMMARY_COLUMNS} FROM notes" + _where(conditions) + " ORDER BY updated_at DESC", params)
+        return cursor
+
+    def add_note(self, note: Note, keep_dates: bool = False) -> Optional[Note]:
+        """Inserts `note` (inline images move to attachments). `keep_dates` keeps its created_at/updated_at instead of now."""
+        now = datetime.now().isoformat()
+        created_at = note.created_at.isoformat() if keep_dates and note.created_at else now
+        updated_at = note.updated_at.isoformat() if keep_dates and note.updated_at else created_at
+        with self._write() as cursor:
+            content = store_note_content(self.connection, note.content or "")
+            cursor.execute("INSERT INTO notes (title, content, tags, created_at, updated_at) VALUES (?, ?, ?, ?, ?)", (note.title, content, note.tags or "", created_at, updated_at))
+            new_id = cursor.lastrowid; set_note_attachments(self.connection, new_id, content)
+        return self.get_note(new_id)
+
+    def update_note(self, note: Note) -> Optional[Note]:
+        if note.id is None: raise ValueError("Cannot update note with None ID")
+        with self._write() as cursor:
+            content = store_note_content(self.connection, note.content or "")
+            cursor.execute("UPDATE notes SET title=?, content=?, tags=?, updated_at=? WHERE id=?", (note.title, content, note.tags or "", datetime.now().isoformat(), note.id))
+            set_note_attachments(self.connection, note.id, content)
+        return self.get_note(note.id)
+
+    def delete_note(self, note_id: int) -> bool:
+        with self._write() as cursor: cursor.execute("DELETE FROM notes WHERE id=?", (note_id,)); return cursor.rowcount > 0
+
+    # --- Snippets ---
+    def get_snippet(self, snippet_id: int) -> Optional[Snippet]:
+        row = self.connection.execute("SELECT * FROM snippets WHERE id = ?", (snippet_id,)).fetchone()
+        return Snippet.from_db_row(row) if row else None
+
+    def list_snippets(self, filter_tag: Optional[str] = None) -> List[Snippet]:
+        tag_sql, params = tag_filter_sql(filter_tag)
+        return self._fetch_all("SELECT * FROM snippets" + _where([tag_sql] if tag_sql else []) + " ORDER BY created_at DESC", params, Snippet.from_db_row)
+
+    def search_snippets(self, query: str, filter_tag: Optional[str] = None) -> List[Snippet]:
+        search_term = f"%{query}%"; tag_sql, tag_params = tag_filter_sql(filter_tag)
+        conditions = ["(title LIKE ? OR code LIKE ? OR tags LIKE ? OR language LIKE ?)"] + ([tag_sql] if tag_sql else [])
+        return self._fetch_all("SELECT * FROM snippets" + _where(conditions) + " ORDER BY created_at DESC", [search_term] * 4 + tag_params, Snippet.from_db_row)
+
+    def snippet_summaries(self, query: Optional[str] = None, filter_tag: Optional[str] = None) -> sqlite3.Cursor:
+        conditions = []; params = []
+        if query: conditions.append("(title LIKE ? OR code LIKE ? OR tags LIKE ? OR language LIKE ?)"); params += [f"%{query}%"] * 4
+        tag_sql, tag_params = tag_filter_sql(filter_tag)
+        if tag_sql: conditions.append(tag_sql); params += tag_params
+        cursor = self.connection.cursor(); cursor.execute(f"SELECT {SNIPPET_SUMMARY_COLUMNS} FROM snippets" + _where(conditions) + " ORDER BY created_at DESC", params)
+        return cursor
+
+    def add_snippet(self, snippet: Snippet, keep_dates: bool = False) -> Optional[Snippet]:
+        created_at = snippet.created_at.isoformat() if keep_dates and snippet.created_at else datetime.now().isoformat()
+        with self._write() as cursor:
+            cursor.execute("INSERT INTO snippets (title, code, language, tags, created_at) VALUES (?, ?, ?, ?, ?)", (snippet.title, snippet.code or "", snippet.language or "Text", snippet.tags or "", created_at))
+            new_id = cursor.lastrowid
+        return self.get_snippet(new_id)
+
+    def update_snippet(self, snippet: Snippet) -> Optional[Snippet]:
+        if snippet.id is None: raise ValueError("Cannot update snippet with None ID")
+        with self._write() as cursor: cursor.execute("UPDATE snippets SET title=?, code=?, language=?, tags=? WHERE id=?", (snippet.title, snippet.code or "", snippet.language or "Text", snippet.tags or "", snippet.id))
+        return self.get_snippet(snippet.id)
+
+    def delete_snippet(self, snippet_id: int) -> bool:
+        with self._write() as cursor: cursor.execute("DELETE FROM snippets WHERE id=?", (snippet_id,)); return cursor.rowcount > 0
+
+    # --- Tags, recent items, bookkeeping, attachments ---
+    def all_tags(self) -> List[str]:
+        tags: Set[str] = set()
+        for (value,) in self.connection.execute("SELECT tags FROM notes WHERE tags IS NOT NULL AND tags != '' UNION ALL SELECT tags FROM snippets WHERE tags IS NOT NULL AND tags != ''"):
+            tags.update(tag.strip() for tag in value.split(",") if tag.strip())
+        return sorted(tags)
+
+    def recent_items(self, limit: int) -> List[RecentItem]:
+        query = """ SELECT type, id, title, created_at, updated_at, last_activity_at FROM (SELECT 'note' as type, id, title, created_at, updated_at, updated_at as last_activity_at FROM notes UNION ALL SELECT 'snippet' as type, id, title, created_at, NULL as updated_at, created_at as last_activity_at FROM snippets ) ORDER BY last_activity_at DESC LIMIT ? """
+        return self._fetch_all(query, [limit], RecentItem.from_db_row)
+
+    def change_token(self) -> Optional[int]:
+        row = self.connection.execute("SELECT version FROM data_changes WHERE id = 1").fetchone()
+        return row[0] if row else None
+
+    def last_run(self, task: str) -> Optional[datetime]:
+        """When a maintenance task (or 'backup') last completed, from maintenance_log."""
+        row = self.connection.execute("SELECT last_run_at FROM maintenance_log WHERE task = ?", (task,)).fetchone()
+        return datetime.fromisoformat(row[0]) if row else None
+
+    def record_run(self, task: str, when: Optional[datetime] = None):
+        with self._write() as cursor: cursor.execute("INSERT OR REPLACE INTO maintenance_log (task, last_run_at) VALUES (?, ?)", (task, (when or datetime.now()).isoformat()))
+
+    def get_attachment(self, digest: str) -> Optional[Tuple[str, bytes]]: return read_attachment(self.connection, digest)
+
+    def add_attachment(self, data: bytes, mime: str) -> str:
+        with self._write(): return write_attachment(self.connection, data, mime)
+
+# database/repository.py
+# --- END OF FILE repository.py ---
@@ -0,0 +1,182 @@
+# database/storage_profiles.py
+"""
+Named SQLite tuning profiles (page size, page cache, memory-mapped I/O,
+journal mode, synchronous level, temp storage), chosen with the
+"storage_profile" setting and applied by DBHandler when the database opens.
+
+A profile is "safe" if a crash or power cut cannot corrupt the database
+(WAL with synchronous=NORMAL may lose the last few commits, never the file).
+
+Benchmark every profile against a copy of your database and get a recommendation:
+    python -m database.storage_profiles [path/to/notes.db] [--operations N] [--rounds N]
+"""
+import logging
+import sqlite3
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+# random, shutil and tempfile are imported by the benchmark functions, so opening the database (notes_cli.py) stays cheap.
+if TYPE_CHECKING: import random
+
+@dataclass(frozen=True)
+class StorageProfile:
+    name: str
+    description: str
+    page_size: int
+    cache_size: int # PRAGMA cache_size: negative values are KiB, positive ones pages
+    mmap_size: int # Bytes; 0 turns memory-mapped I/O off
+    journal_mode: str
+    synchronous: str
+    temp_store: str
+
+    @property
+    def safe(self) -> bool: return self.synchronous in ("NORMAL", "FULL", "EXTRA") and self.journal_mode in ("DELETE", "TRUNCATE", "PERSIST", "WAL")
+
+STORAGE_PROFILES: Dict[str, StorageProfile] = {profile.name: profile for profile in (
+    StorageProfile("compatible", "SQLite defaults (rollback journal). Also works on network drives.", 4096, -2000, 0, "DELETE", "FULL", "DEFAULT"),
+    StorageProfile("balanced", "Write-ahead log, 16 MB cache, 64 MB memory-mapped. Suits most local databases.", 4096, -16384, 64 * 1024 * 1024, "WAL", "NORMAL", "MEMORY"),
+    StorageProfile("low_memory", "Write-ahead log with a 1 MB cache and no memory mapping, for small machines.", 4096, -1024, 0, "WAL", "NORMAL", "FILE"),
+    StorageProfile("large_archive", "16 KB pages, 128 MB cache, 1 GB memory-mapped. For multi-gigabyte databases with many images.", 16384, -131072, 1024 * 1024 * 1024, "WAL", "NORMAL", "MEMORY"),
+    StorageProfile("bulk_import", "No journal syncing at all. Only for one-off imports of data you also have elsewhere: a crash can corrupt the database.", 4096, -65536, 256 * 1024 * 1024, "MEMORY", "OFF", "MEMORY"),
+)}
+DEFAULT_STORAGE_PROFILE = "compatible"
+# Databases up to this size are rebuilt (VACUUM) at startup when the profile asks for another page size; larger ones keep theirs until rebuilt with --apply.
+PAGE_SIZE_REBUILD_MAX_BYTES = 64 * 1024 * 1024
+
+def get_storage_profile(name: Optional[str]) -> StorageProfile:
+    profile = STORAGE_PROFILES.get(name or DEFAULT_STORAGE_PROFILE)
+    if profile is None: logger.warning("Unknown storage profile '%s', using '%s'.", name, DEFAULT_STORAGE_PROFILE); profile = STORAGE_PROFILES[DEFAULT_STORAGE_PROFILE]
+    return profile
+
+def rebuild_page_size(conn: sqlite3.Connection, page_size: int):
+    """Rewrites the whole database with a new page size. Needs exclusive access; a WAL database is switched to a rollback journal first."""
+    if conn.execute("PRAGMA journal_mode").fetchone()[0].upper() == "WAL": conn.execute("PRAGMA journal_mode = DELETE").fetchone()
+    conn.execute(f"PRAGMA page_size = {int(page_size)}"); conn.execute("VACUUM")
+
+def apply_storage_profile(conn: sqlite3.Connection, profile: StorageProfile, db_path: Optional[Path] = None, rebuild_max_bytes: Optional[int] = PAGE_SIZE_REBUILD_MAX_BYTES):
+    """
+    Applies `profile` to an open connection. The page size only changes when
+    the database is rebuilt, which happens here if the file is at most
+    `rebuild_max_bytes` (None: always).
+    """
+    if conn.execute("PRAGMA page_size").fetchone()[0] != profile.page_size:
+        size = db_path.stat().st_size if db_path and db_path.exists() else 0
+        if rebuild_max_bytes is None or size <= rebuild_max_bytes:
+            started = time.perf_counter(); rebuild_page_size(conn, profile.page_size)
+            logger.info("Rebuilt database with %d-byte pages for storage profile '%s' in %.2f s.", profile.page_size, profile.name, time.perf_counter() - started)
+        else: logger.info("Database is %d MB; keeping its page size. Run 'python -m database.storage_profiles --apply %s' with the application closed to change it.", size // (1024 * 1024), profile.name)
+    journal_mode = conn.execute(f"PRAGMA journal_mode = {profile.journal_mode}").fetchone()[0]
+    if journal_mode.upper() != profile.journal_mode: logger.warning("Storage profile '%s': journal_mode %s not available here, using %s.", profile.name, profile.journal_mode, journal_mode)
+    conn.execute(f"PRAGMA synchronous = {profile.synchronous}")
+    conn.execute(f"PRAGMA cache_size = {int(profile.cache_size)}")
+    conn.execute(f"PRAGMA mmap_size = {int(profile.mmap_size)}").fetchall()
+    conn.execute(f"PRAGMA temp_store = {profile.temp_store}")
+    logger.debug("Applied storage profile '%s'.", profile.name)
+
+# --- Self-benchmark ---
+BENCH_OPERATIONS = 400
+BENCH_ROUNDS = 3
+BENCH_MIN_NOTES = 50
+BENCH_TIE_PERCENT = 5 # Profiles this close to the fastest count as equally fast
+_BENCH_MIX = (("open", 0.40), ("list", 0.20), ("search", 0.05), ("update", 0.25), ("add", 0.10)) # Roughly what a session of reading and editing notes does
+
+def _bench_note(rng: "random.Random", size: int) -> str:
+    words = ("note", "meeting", "draft", "idea", "python", "query", "release", "archive", "todo", "review")
+    return "<p>" + " ".join(rng.choice(words) for _ in range(max(1, size // 7))) + "</p>"
+
+def run_workload(db_path: Path, profile: StorageProfile, operations: int = BENCH_OPERATIONS, seed: int = 1) -> Dict[str, float]:
+    """
+    Applies `profile` to the database at `db_path` (a scratch copy: it is
+    modified) and runs a fixed mix of opening, listing, searching, updating and
+    adding notes, each write committed on its own as the application does.
+    """
+    import random
+    rng = random.Random(seed); latencies: Dict[str, List[float]] = {kind: [] for kind, _ in _BENCH_MIX}
+    conn = sqlite3.connect(db_path)
+    try:
+        apply_storage_profile(conn, profile, db_path, rebuild_max_bytes=None)
+        now = time.strftime("%Y-%m-%dT%H:%M:%S")
+        for _ in range(max(0, BENCH_MIN_NOTES - conn.execute("SELECT COUNT(*) FROM notes").fetchone()[0])):
+            conn.execute("INSERT INTO notes (title, content, tags, created_at, updated_at) VALUES (?, ?, ?, ?, ?)", ("Benchmark", _bench_note(rng, 2000), "bench", now, now))
+        conn.commit()
+        note_ids = [row[0] for row in conn.execute("SELECT id FROM notes")]
+        kinds = [kind for kind, _ in _BENCH_MIX]; weights = [weight for _, weight in _BENCH_MIX]
+        started = time.perf_counter()
+        for kind in rng.choices(kinds, weights, k=operations):
+            op_started = time.perf_counter()
+            if kind == "open": conn.execute("SELECT * FROM notes WHERE id = ?", (rng.choice(note_ids),)).fetchone()
+            elif kind == "list": conn.execute("SELECT id, title, tags, updated_at FROM notes ORDER BY updated_at DESC LIMIT 200").fetchall()
+            elif kind == "search": conn.execute("SELECT id, title FROM notes WHERE title LIKE ? OR content LIKE ? OR tags LIKE ?", ("%review%",) * 3).fetchall()
+            elif kind == "update":
+                note_id = rng.choice(note_ids); row = conn.execute("SELECT content FROM notes WHERE id = ?", (note_id,)).fetchone()
+                conn.execute("UPDATE notes SET content = ?, updated_at = ? WHERE id = ?", ((row[0] or "") + _bench_note(rng, 200), now, note_id)); conn.commit()
+            else:
+                cursor = conn.execute("INSERT INTO notes (title, content, tags, created_at, updated_at) VALUES (?, ?, ?, ?, ?)", ("Benchmark", _bench_note(rng, 3000), "bench", now, now)); conn.commit()
+                note_ids.append(cursor.lastrowid)
+            latencies[kind].append(time.perf_counter() - op_started)
+        total = time.perf_counter() - started
+    finally: conn.close()
+    writes = sorted(latencies["update"] + latencies["add"])
+    return {"seconds": total, "ops_per_second": operations / total if total else 0.0, "write_p95_ms": writes[int(0.95 * (len(writes) - 1))] * 1000 if writes else 0.0}
+
+def benchmark_profiles(db_path: Path, profiles: Optional[List[StorageProfile]] = None, operations: int = BENCH_OPERATIONS, rounds: int = BENCH_ROUNDS) -> Dict[str, Dict[str, float]]:
+    """
+    Runs the workload once per profile and round, each time on a fresh copy of
+    `db_path` made next to it (so it is timed on the same disk). Profiles run in
+    a different order each round; the median run of each is returned.
+    """
+    import shutil, tempfile
+    profiles = profiles or list(STORAGE_PROFILES.values())
+    needed = db_path.stat().st_size * 3
+    if shutil.disk_usage(db_path.parent).free < needed: raise OSError(f"Benchmarking needs about {needed // (1024 * 1024)} MB free next to {db_path}")
+    runs: Dict[str, List[Dict[str, float]]] = {profile.name: [] for profile in profiles}
+    with tempfile.TemporaryDirectory(prefix=".storage_bench_", dir=db_path.parent) as work_dir:
+        base = Path(work_dir) / "base.db"
+        source = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True); dest = sqlite3.connect(base)
+        try: source.backup(dest) # Consistent copy even if the application is running
+        finally: dest.close(); source.close()
+        for round_index in range(rounds):
+            for profile in profiles[round_index % len(profiles):] + profiles[:round_index % len(profiles)]:
+                work = Path(work_dir) / f"{profile.name}.db"
+                shutil.copyfile(base, work)
+                runs[profile.name].append(run_workload(work, profile, operations, seed=round_index + 1))
+                for path in (work, work.with_name(work.name + "-wal"), work.with_name(work.name + "-shm")): path.unlink(missing_ok=True)
+                logger.info("Round %d, %s: %.3f s", round_index + 1, profile.name, runs[profile.name][-1]["seconds"])
+    return {name: sorted(results, key=lambda result: result["seconds"])[len(results) // 2] for name, results in runs.items()}
+
+def recommend_profile(results: Dict[str, Dict[str, float]]) -> str:
+    """Fastest safe profile among the benchmark results. Near ties go to the profile listed first in STORAGE_PROFILES."""
+    safe = [name for name in STORAGE_PROFILES if name in results and STORAGE_PROFILES[name].safe]
+    fastest = min(results[name]["seconds"] for name in safe)
+    return next(name for name in safe if results[name]["seconds"] <= fastest * (1 + BENCH_TIE_PERCENT / 100))
+
+if __name__ == "__main__":
+    import argparse, sys
+    from database.paths import DB_PATH
+    parser = argparse.ArgumentParser(prog="python -m database.storage_profiles", description="Benchmark the storage profiles on a copy of the notes database and recommend the fastest safe one.")
+    parser.add_argument("db", nargs="?", type=Path, default=DB_PATH, help=f"Database to copy (default: {DB_PATH})")
+    parser.add_argument("--operations", type=int, default=BENCH_OPERATIONS, help="Operations per run (default: %(default)s)")
+    parser.add_argument("--rounds", type=int, default=BENCH_ROUNDS, help="Runs per profile; the median is reported (default: %(default)s)")
+    parser.add_argument("--apply", metavar="PROFILE", choices=sorted(STORAGE_PROFILES), help="Instead of benchmarking, rebuild the database itself with PROFILE's page size and journal mode (close the application first)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    if not args.db.exists(): sys.exit(f"No database at {args.db}")
+    if args.apply:
+        connection = sqlite3.connect(args.db, timeout=1.0)
+        try: apply_storage_profile(connection, STORAGE_PROFILES[args.apply], args.db, rebuild_max_bytes=None)
+        except sqlite3.OperationalError as e: sys.exit(f"Could not rebuild {args.db} ({e}). Is the application still running?")
+        finally: connection.close()
+        print(f"{args.db} now uses the page size and journal mode of '{args.apply}'. Select the same profile in Settings.")
+        sys.exit(0)
+    results = benchmark_profiles(args.db, operations=args.operations, rounds=args.rounds)
+    print(f"\n{'profile':<15}{'safe':<6}{'seconds':>9}{'ops/s':>9}{'write p95 ms':>14}")
+    for name, result in sorted(results.items(), key=lambda item: item[1]["seconds"]):
+        print(f"{name:<15}{'yes' if STORAGE_PROFILES[name].safe else 'NO':<6}{result['seconds']:>9.3f}{result['ops_per_second']:>9.0f}{result['write_p95_ms']:>14.2f}")
+    best = recommend_profile(results)
+    print(f"\nRecommended: '{best}' ({STORAGE_PROFILES[best].description})\nSelect it under Settings → Storage Profile and restart.")
+
+# database/storage_profiles.py
+# --- END OF FILE storage_profiles.py ---
@@ -1,15 +1,23 @@
 # --- START OF FILE main.py ---
 
 # main.py
+import time
+_STARTED_AT = time.perf_counter() # Origin of the --profile-startup timeline
+import logging
+import os
 import sys
 import json
 from pathlib import Path
-from PyQt6.QtWidgets import QApplication
-from ui.main_window import MainWindow
-from database.data_manager import DataManager, DB_PATH
+from database.paths import DB_PATH
+from utils.startup_profile import StartupProfile
+# Qt, the database layer and the UI are imported inside main(), so importing this module stays cheap.
+
+logger = logging.getLogger(__name__)
 
 SETTINGS_FILE = DB_PATH.parent / "settings.json"
-print(f"[main.py] Settings File Path: {SETTINGS_FILE}")
+LIST_SNAPSHOT_FILE = DB_PATH.parent / "list_snapshot.json"
+RECOVERY_JOURNAL_FILE = DB_PATH.parent / "recovery.journal"
+logger.debug("[main.py] Settings File Path: %s", SETTINGS_FILE)
 
 DEFAULT_SETTINGS = {
     "save_window_geometry": True,
@@ -19,38 +27,50 @@ DEFAULT_SETTINGS = {
     "sidebar_splitter_sizes": None,
     "theme": "dark",
     "default_note_font_family": None,
-    "default_note_font_size": 10
+    "default_note_font_size": 10,
+    "snippet_highlight_max_chars": 2000000,
+    "note_preview_min_chars": 2000000,
+    "image_cache_mb": 128,
+    "tab_hibernate_minutes": 10,
+    "autosave_journal_seconds": 2,
+    "autosave_commit_seconds": 60,
+    "open_tabs": None,
+    "maintenance_idle_minutes": 5,
+    "backup_interval_hours": 24,
+    "backup_keep": 7,
+    "backup_dir": None,
+    "storage_profile": "compatible"
 }
 
 def load_settings() -> dict:
-    print("[main.py] Loading settings...") # DEBUG
+    logger.debug("[main.py] Loading settings...")
     if SETTINGS_FILE.exists():
         try:
             with open(SETTINGS_FILE, 'r', encoding='utf-8') as f:
                 settings = json.load(f)
-                print(f"[main.py] Settings loaded from file: {settings}") # DEBUG
+                logger.debug("[main.py] Settings loaded from file: %s", settings)
                 loaded_settings = DEFAULT_SETTINGS.copy()
                 loaded_settings.update(settings)
                 if not isinstance(loaded_settings.get("window_geometry"), dict):
                     loaded_settings["window_geometry"] = DEFAULT_SETTINGS["window_geometry"].copy()
-                print(f"[main.py] Final settings after merge: {loaded_settings}") # DEBUG
+                logger.debug("[main.py] Final settings after merge: %s", loaded_settings)
                 return loaded_settings
         except (json.JSONDecodeError, IOError, TypeError) as e:
-            print(f"[main.py] Error loading settings file ({SETTINGS_FILE}): {e}. Using defaults.")
+            logger.error("[main.py] Error loading settings file (%s): %s. Using defaults.", SETTINGS_FILE, e)
             return DEFAULT_SETTINGS.copy()
     else:
-        print(f"[main.py] Settings file not found. Creating default settings at: {SETTINGS_FILE}")
+        logger.debug("[main.py] Settings file not found. Creating default settings at: %s", SETTINGS_FILE)
         try:
              SETTINGS_FILE.parent.mkdir(parents=True, exist_ok=True)
              with open(SETTINGS_FILE, 'w', encoding='utf-8') as f:
                  json.dump(DEFAULT_SETTINGS, f, indent=2)
              return DEFAULT_SETTINGS.copy()
         except IOError as e:
-            print(f"[main.py] Error creating default settings file ({SETTINGS_FILE}): {e}")
+            logger.error("[main.py] Error creating default settings file (%s): %s", SETTINGS_FILE, e)
             return DEFAULT_SETTINGS.copy()
 
 def save_settings(settings: dict):
-    print("[main.py] Saving settings...") # DEBUG
+    logger.debug("[main.py] Saving settings...")
     geom = settings.get("window_geometry", {})
     for key in ["x", "y", "width", "height"]:
         if geom.get(key) is not None:
@@ -60,46 +80,64 @@ def save_settings(settings: dict):
         SETTINGS_FILE.parent.mkdir(parents=True, exist_ok=True)
         with open(SETTINGS_FILE, 'w', encoding='utf-8') as f:
             json.dump(settings, f, indent=2, ensure_ascii=False)
-        print(f"[main.py] Settings saved to {SETTINGS_FILE}") # DEBUG
-    except IOError as e: print(f"[main.py] Error saving settings file ({SETTINGS_FILE}): {e}")
-    except TypeError as e: print(f"[main.py] Error serializing settings to JSON: {e}")
+        logger.debug("[main.py] Settings saved to %s", SETTINGS_FILE)
+    except IOError as e: logger.error("[main.py] Error saving settings file (%s): %s", SETTINGS_FILE, e)
+    except TypeError as e: logger.error("[main.py] Error serializing settings to JSON: %s", e)
+
+def configure_logging(argv: list):
+    """Level from --debug or NOTES_MANAGER_LOG_LEVEL (default INFO). Debug records are skipped before formatting otherwise."""
+    level_name = "DEBUG" if "--debug" in argv else os.environ.get("NOTES_MANAGER_LOG_LEVEL", "INFO").upper()
+    logging.basicConfig(level=getattr(logging, level_name, logging.INFO), format="%(asctime)s %(levelname)s %(name)s: %(message)s")
 
 def main():
+    profile = StartupProfile("--profile-startup" in sys.argv, origin=_STARTED_AT)
+    profile.mark("python imports")
+    configure_logging(sys.argv)
+    from PyQt6.QtWidgets import QApplication
     app = QApplication(sys.argv)
+    profile.mark("qt application")
 
     settings = load_settings()
+    profile.mark("settings load")
 
     # --- Read theme and DEBUG ---
     current_theme = settings.get("theme", "dark").lower()
-    print(f"[main.py] Theme read from settings: '{current_theme}'")
+    logger.debug("[main.py] Theme read from settings: '%s'", current_theme)
     # -----------------------------
     try:
         from utils.style import load_styles
-        print(f"[main.py] Calling load_styles with theme_name='{current_theme}'") # DEBUG
+        logger.debug("[main.py] Calling load_styles with theme_name='%s'", current_theme)
         load_styles(app, theme_name=current_theme)
     except ImportError:
-        print("[main.py] Note: Styles module not found. Using default styling.")
+        logger.debug("[main.py] Note: Styles module not found. Using default styling.")
     except TypeError:
-         print("[main.py] Note: Styles module found, but doesn't support theme selection yet. Applying default styles.")
+         logger.debug("[main.py] Note: Styles module found, but doesn't support theme selection yet. Applying default styles.")
          try:
             from utils.style import load_styles
-            print("[main.py] Calling load_styles without theme_name (fallback)") # DEBUG
+            logger.debug("[main.py] Calling load_styles without theme_name (fallback)")
             load_styles(app)
          except Exception as e:
-             print(f"[main.py] Failed to load styles: {e}")
+             logger.error("[main.py] Failed to load styles: %s", e)
+    profile.mark("theme load")
 
-    data_manager = DataManager()
-    window = MainWindow(data_manager, settings)
-    print("[main.py] Restoring geometry and showing window...") # DEBUG
+    from database.data_manager import DataManager
+    data_manager = DataManager(storage_profile=settings.get("storage_profile"))
+    profile.mark("database open")
+    from ui.main_window import MainWindow
+    window = MainWindow(data_manager, settings, snapshot_path=LIST_SNAPSHOT_FILE, journal_path=RECOVERY_JOURNAL_FILE)
+    profile.mark("main window built")
+    logger.debug("[main.py] Restoring geometry and showing window...")
     window._restore_geometry_and_state()
     window.show()
-    print("[main.py] Entering event loop...") # DEBUG
+    profile.mark("window shown")
+    profile.finish_on_first_paint(window, app.quit) # --profile-startup exits once the first frame is drawn
+    logger.debug("[main.py] Entering event loop...")
 
     exit_code = app.exec()
 
     # --- Save settings on exit ---
     current_save_pref = window.settings.get("save_window_geometry", True)
-    print(f"[main.py] Exiting. Save window geometry preference: {current_save_pref}")
+    logger.debug("[main.py] Exiting. Save window geometry preference: %s", current_save_pref)
     if current_save_pref:
         is_maximized = window.isMaximized()
         settings["window_maximized"] = is_maximized
@@ -109,20 +147,24 @@ def main():
             settings["window_geometry"]["y"] = geo.y()
             settings["window_geometry"]["width"] = geo.width()
             settings["window_geometry"]["height"] = geo.height()
-            print(f"[main.py] Saving window geometry: {settings['window_geometry']}")
-        else: print("[main.py] Window is maximized, not saving specific geometry.")
-        if hasattr(window, 'main_splitter'): settings["main_splitter_sizes"] = window.main_splitter.sizes(); print(f"[main.py] Saving main splitter sizes: {settings['main_splitter_sizes']}")
-        if hasattr(window, 'list_tag_splitter'): settings["sidebar_splitter_sizes"] = window.list_tag_splitter.sizes(); print(f"[main.py] Saving sidebar splitter sizes: {settings['sidebar_splitter_sizes']}")
+            logger.debug("[main.py] Saving window geometry: %s", settings['window_geometry'])
+        else: logger.debug("[main.py] Window is maximized, not saving specific geometry.")
+        if hasattr(window, 'main_splitter'): settings["main_splitter_sizes"] = window.main_splitter.sizes(); logger.debug("[main.py] Saving main splitter sizes: %s", settings['main_splitter_sizes'])
+        if hasattr(window, 'list_tag_splitter'): settings["sidebar_splitter_sizes"] = window.list_tag_splitter.sizes(); logger.debug("[main.py] Saving sidebar splitter sizes: %s", settings['sidebar_splitter_sizes'])
     else:
         settings["window_geometry"]["x"] = None; settings["window_geometry"]["y"] = None
         settings["window_maximized"] = False; settings["main_splitter_sizes"] = None; settings["sidebar_splitter_sizes"] = None
-        print("[main.py] Saving disabled, clearing geometry settings.")
+        logger.debug("[main.py] Saving disabled, clearing geometry settings.")
     save_settings(settings)
     # -----------------------------
 
-    print("Application event loop finished. Shutting down DataManager.")
+    if "--metrics-json" in sys.argv[:-1]:
+        metrics_path = sys.argv[sys.argv.index("--metrics-json") + 1]
+        try: logger.info("Task metrics written to %s", data_manager.dump_metrics_json(metrics_path))
+        except OSError as e: logger.error("Could not write task metrics to %s: %s", metrics_path, e)
+    logger.debug("Application event loop finished. Shutting down DataManager.")
     data_manager.shutdown()
-    print("DataManager shutdown complete. Exiting.")
+    logger.debug("DataManager shutdown complete. Exiting.")
     sys.exit(exit_code)
 
 if __name__ == "__main__":
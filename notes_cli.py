@@ -0,0 +1,212 @@
+# notes_cli.py
+"""
+Command-line access to the notes database without the GUI: search, get, add,
+list-tags, import and export, with JSON on stdout. Only the Qt-free database
+modules are imported, so a command starts in a few tens of milliseconds.
+
+    ./notes-cli search "meeting" --tag work --limit 20
+    ./notes-cli get 42 --text
+    echo "Buy milk" | ./notes-cli add "Shopping" --tags todo
+    ./notes-cli export -o backup.json && ./notes-cli import backup.json
+"""
+import argparse
+import base64
+import json
+import os
+import sqlite3
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+from database.attachments import attachment_digest, referenced_attachments, write_attachment
+from database.db_handler import DBHandler
+from database.models import Note, Snippet, _parse_datetime
+from database.paths import DB_PATH, ensure_app_data_dir
+from database.repository import Repository
+from utils.note_text import note_html_from_text, note_text_from_html
+
+EXPORT_FORMAT = "notes-manager"
+EXPORT_VERSION = 1
+FETCH_CHUNK = 500
+
+class CliError(Exception):
+    """Reported as {"error": ...} on stderr with exit status 1."""
+
+# --- JSON conversion ---
+def _tags_list(tags: str) -> List[str]: return [tag.strip() for tag in (tags or "").split(",") if tag.strip()]
+def _tags_text(tags: Any) -> str: return ",".join(_tags_list(tags if isinstance(tags, str) else ",".join(tags or [])))
+def _iso(value: Optional[datetime]) -> Optional[str]: return value.isoformat() if value else None
+
+def note_json(note: Note, content: bool = True, text: bool = False) -> Dict[str, Any]:
+    item = {"type": "note", "id": note.id, "title": note.title, "tags": _tags_list(note.tags), "created_at": _iso(note.created_at), "updated_at": _iso(note.updated_at)}
+    if content: item["content"] = note.content
+    if text: item["text"] = note_text_from_html(note.content)
+    return item
+
+def snippet_json(snippet: Snippet, content: bool = True) -> Dict[str, Any]:
+    item = {"type": "snippet", "id": snippet.id, "title": snippet.title, "tags": _tags_list(snippet.tags), "language": snippet.language, "created_at": _iso(snippet.created_at)}
+    if content: item["code"] = snippet.code
+    return item
+
+def _dump(value: Any, pretty: bool) -> str: return json.dumps(value, ensure_ascii=False, indent=2 if pretty else None)
+
+# --- Commands ---
+def cmd_search(repo: Repository, args) -> Any:
+    results = []
+    for kind in (("note", "snippet") if args.type == "all" else (args.type,)):
+        cursor = repo.note_summaries(args.query, args.tag) if kind == "note" else repo.snippet_summaries(args.query, args.tag)
+        try: rows = cursor.fetchmany(args.limit) if args.limit else cursor.fetchall()
+        finally: cursor.close()
+        if kind == "note": results += [note_json(repo.get_note(row["id"]), text=True) if args.content else note_json(Note.from_db_row(row), content=False) for row in rows]
+        else: results += [snippet_json(repo.get_snippet(row["id"])) if args.content else snippet_json(Snippet.from_db_row(row), content=False) for row in rows]
+    return results[:args.limit] if args.limit else results
+
+def cmd_get(repo: Repository, args) -> Any:
+    if args.snippet:
+        snippet = repo.get_snippet(args.id)
+        if snippet is None: raise CliError(f"No snippet with id {args.id}")
+        return snippet_json(snippet)
+    note = repo.get_note(args.id)
+    if note is None: raise CliError(f"No note with id {args.id}")
+    return note_json(note, text=args.text)
+
+def cmd_add(repo: Repository, args) -> Any:
+    if args.content is not None: body = args.content
+    elif not sys.stdin.isatty(): body = sys.stdin.read()
+    else: body = ""
+    if args.snippet: return snippet_json(repo.add_snippet(Snippet(title=args.title, code=body, language=args.language, tags=_tags_text(args.tags))))
+    return note_json(repo.add_note(Note(title=args.title, content=body if args.html else note_html_from_text(body.rstrip("\n")), tags=_tags_text(args.tags))))
+
+def cmd_list_tags(repo: Repository, args) -> Any: return repo.all_tags()
+
+def cmd_export(repo: Repository, args) -> None:
+    """Writes the export document item by item, so large databases are never held in memory at once."""
+    out = open(args.output, "w", encoding="utf-8") if args.output and args.output != "-" else sys.stdout
+    try:
+        out.write('{"format": %s, "version": %d, "exported_at": %s' % (json.dumps(EXPORT_FORMAT), EXPORT_VERSION, json.dumps(datetime.now().isoformat())))
+        digests = set()
+        for kind in ("note", "snippet"):
+            out.write(f', "{kind}s": [')
+            if args.type in ("all", kind):
+                cursor = repo.connection.execute(f"SELECT * FROM {kind}s ORDER BY id"); first = True
+                try:
+                    while True:
+                        rows = cursor.fetchmany(FETCH_CHUNK)
+                        if not rows: break
+                        for row in rows:
+                            if kind == "note": note = Note.from_db_row(row); digests |= referenced_attachments(note.content); item = note_json(note)
+                            else: item = snippet_json(Snippet.from_db_row(row))
+                            out.write(("" if first else ",") + "\n" + json.dumps(item, ensure_ascii=False)); first = False
+                finally: cursor.close()
+            out.write("]")
+        out.write(', "attachments": {')
+        if not args.no_attachments:
+            first = True
+            for digest in sorted(digests):
+                attachment = repo.get_attachment(digest)
+                if attachment is None: continue
+                out.write(("" if first else ",") + "\n" + json.dumps(digest) + ": " + json.dumps({"mime": attachment[0], "data": base64.b64encode(attachment[1]).decode("ascii")})); first = False
+        out.write("}}\n")
+    finally:
+        if out is not sys.stdout: out.close()
+
+def _import_items(repo: Repository, items: Iterable[Dict[str, Any]], result: Dict[str, list]):
+    for item in items:
+        if not isinstance(item, dict): raise CliError("Import items must be JSON objects")
+        kind = item.get("type", "snippet" if "code" in item else "note")
+        if kind == "snippet": snippet = repo.add_snippet(Snippet(title=item.get("title", ""), code=item.get("code", ""), language=item.get("language") or "Text", tags=_tags_text(item.get("tags")), created_at=_parse_datetime(item.get("created_at"))), keep_dates=True); result["snippets"].append(snippet.id)
+        else:
+            content = item["content"] if "content" in item else note_html_from_text(item.get("text", ""))
+            note = repo.add_note(Note(title=item.get("title", ""), content=content, tags=_tags_text(item.get("tags")), created_at=_parse_datetime(item.get("created_at")), updated_at=_parse_datetime(item.get("updated_at"))), keep_dates=True)
+            result["notes"].append(note.id)
+
+def cmd_import(repo: Repository, args) -> Any:
+    """Imports export documents, JSON items or lists of items (e.g. `get` output), and plain text, Markdown or HTML files as notes. All files go in one transaction."""
+    result = {"notes": [], "snippets": [], "attachments": 0}
+    with repo.batch():
+        for name in args.files:
+            raw = sys.stdin.read() if name == "-" else Path(name).read_text(encoding="utf-8")
+            data = None
+            if raw.lstrip().startswith(("{", "[")):
+                try: data = json.loads(raw)
+                except json.JSONDecodeError as e: raise CliError(f"{name}: invalid JSON ({e})")
+            if data is None:
+                title = Path(name).stem if name != "-" else "Imported note"
+                is_html = Path(name).suffix.lower() in (".html", ".htm")
+                _import_items(repo, [{"type": "note", "title": title, "content": raw} if is_html else {"type": "note", "title": title, "text": raw.rstrip("\n")}], result)
+            elif isinstance(data, dict) and data.get("format") == EXPORT_FORMAT:
+                for digest, attachment in (data.get("attachments") or {}).items():
+                    payload = base64.b64decode(attachment["data"])
+                    if attachment_digest(payload) != digest: raise CliError(f"{name}: attachment {digest[:12]}... does not match its hash")
+                    write_attachment(repo.connection, payload, attachment["mime"], digest); result["attachments"] += 1
+                _import_items(repo, data.get("notes") or [], result); _import_items(repo, data.get("snippets") or [], result)
+            else: _import_items(repo, data if isinstance(data, list) else [data], result)
+    return result
+
+# --- Entry point ---
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="notes-cli", description="Search, read, add, import and export notes and snippets without starting the GUI. Output is JSON.")
+    parser.add_argument("--db", type=Path, default=DB_PATH, help=f"Database file (default: {DB_PATH})")
+    output = argparse.ArgumentParser(add_help=False)
+    output.add_argument("--pretty", action="store_true", help="Indent the JSON output")
+    commands = parser.add_subparsers(dest="command", required=True)
+    add_parser = lambda name, summary: commands.add_parser(name, help=summary, parents=[output])
+    search = add_parser("search", "Search titles, content and tags (an empty query lists everything)")
+    search.add_argument("query", nargs="?", default="")
+    search.add_argument("--tag", help="Only items with this tag")
+    search.add_argument("--type", choices=("note", "snippet", "all"), default="all")
+    search.add_argument("--limit", type=int, default=0, help="Return at most this many items (newest first)")
+    search.add_argument("--content", action="store_true", help="Include note HTML and text, and snippet code")
+    search.set_defaults(handler=cmd_search)
+    get = add_parser("get", "Print one note (or snippet) with its content")
+    get.add_argument("id", type=int)
+    get.add_argument("--snippet", action="store_true", help="ID is a snippet id")
+    get.add_argument("--text", action="store_true", help="Add the note's plain text")
+    get.set_defaults(handler=cmd_get)
+    add = add_parser("add", "Add a note (or snippet); the body is --content or standard input")
+    add.add_argument("title")
+    add.add_argument("--content", help="Body text (default: read standard input if it is not a terminal)")
+    add.add_argument("--tags", default="", help="Comma-separated tags")
+    add.add_argument("--html", action="store_true", help="The body is HTML, not plain text")
+    add.add_argument("--snippet", action="store_true", help="Add a code snippet")
+    add.add_argument("--language", default="Text", help="Snippet language (default: Text)")
+    add.set_defaults(handler=cmd_add)
+    add_parser("list-tags", "All tags in use").set_defaults(handler=cmd_list_tags)
+    export = add_parser("export", "Write notes, snippets and their images as one JSON document")
+    export.add_argument("-o", "--output", help="Output file (default: standard output)")
+    export.add_argument("--type", choices=("note", "snippet", "all"), default="all")
+    export.add_argument("--no-attachments", action="store_true", help="Leave out images")
+    export.set_defaults(handler=cmd_export)
+    imp = add_parser("import", "Import export documents, JSON items, or text/Markdown/HTML files as notes ('-' reads standard input)")
+    imp.add_argument("files", nargs="+")
+    imp.set_defaults(handler=cmd_import)
+    return parser
+
+def _storage_profile(db_path: Path) -> Optional[str]:
+    """The GUI's "storage_profile" setting, so both open the database with the same journal mode."""
+    try: return json.loads((db_path.parent / "settings.json").read_text(encoding="utf-8")).get("storage_profile")
+    except (OSError, ValueError, AttributeError): return None
+
+def main(argv: List[str] = None) -> int:
+    args = build_parser().parse_args(argv)
+    if not args.db.exists():
+        if args.command not in ("add", "import"): print(_dump({"error": f"No database at {args.db}"}, False), file=sys.stderr); return 1
+        ensure_app_data_dir(args.db.parent)
+    handler = DBHandler(args.db, _storage_profile(args.db))
+    if handler.connection is None: print(_dump({"error": f"Could not open {args.db}"}, False), file=sys.stderr); return 1
+    try:
+        result = args.handler(Repository(handler.connection), args)
+        if result is not None: print(_dump(result, args.pretty))
+        return 0
+    except BrokenPipeError: raise
+    except (CliError, OSError, sqlite3.Error, KeyError, ValueError) as e:
+        print(_dump({"error": str(e)}, False), file=sys.stderr); return 1
+    finally: handler.close()
+
+if __name__ == "__main__":
+    try: sys.exit(main())
+    except BrokenPipeError: # Output piped into e.g. `head`
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno()); sys.exit(0)
+
+# notes_cli.py
+# --- END OF FILE notes_cli.py ---
@@ -0,0 +1,76 @@
+# tests/test_item_list.py
+"""
+ItemListModel edits made while a chunked result is streaming in. Each model
+is watched by QAbstractItemModelTester, so an invalid insert/move/remove is
+reported as a failure instead of crashing the process.
+
+    python -m pytest -q tests
+"""
+import os
+import random
+import sys
+import unittest
+from pathlib import Path
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from PyQt6.QtCore import qInstallMessageHandler
+from PyQt6.QtTest import QAbstractItemModelTester
+from PyQt6.QtWidgets import QApplication
+from database.models import Note
+from widgets.item_list import ItemListModel
+
+app = QApplication.instance() or QApplication([])
+
+def note(note_id: int, title: str = "") -> Note: return Note(id=note_id, title=title or f"Note {note_id}")
+
+class StreamEditsTest(unittest.TestCase):
+    def setUp(self):
+        self.messages = []
+        qInstallMessageHandler(lambda mode, context, message: self.messages.append(message))
+        self.model = ItemListModel("note")
+        self.tester = QAbstractItemModelTester(self.model, QAbstractItemModelTester.FailureReportingMode.Warning)
+
+    def tearDown(self):
+        qInstallMessageHandler(None)
+
+    def assertRows(self, ids):
+        self.assertEqual([item.id for item in self.model.items()], ids)
+        self.assertEqual([self.model.row_of(item_id) for item_id in ids], list(range(len(ids))))
+        self.assertEqual(self.messages, [])
+
+    def test_remove_during_stream(self):
+        # The deleted row leaves the next shown item just above the cursor, already in place.
+        self.model.set_items([note(0), note(2), note(1)])
+        self.model.begin_stream(); self.model.add_stream_chunk([note(1)])
+        self.assertTrue(self.model.remove_id(1))
+        self.model.add_stream_chunk([note(2)]); self.model.end_stream()
+        self.assertRows([2])
+
+    def test_put_first_during_stream(self):
+        self.model.set_items([note(0), note(1), note(2), note(3)])
+        self.model.begin_stream(); self.model.add_stream_chunk([note(2)])
+        self.model.put_first(note(3, "Saved")); self.model.put_first(note(9, "New"))
+        self.model.add_stream_chunk([note(0), note(1)]); self.model.end_stream()
+        self.assertRows([9, 3, 2, 0, 1])
+        self.assertEqual(self.model.item_by_id(3).title, "Saved")
+
+    def test_random_edits_during_stream(self):
+        rng = random.Random(34)
+        for _ in range(200):
+            self.model.set_items([note(i) for i in rng.sample(range(30), rng.randrange(1, 15))])
+            result = rng.sample(range(30), rng.randrange(0, 15)); kept = set()
+            self.model.begin_stream()
+            for start in range(0, len(result), 3):
+                self.model.add_stream_chunk([note(i) for i in result[start:start + 3]]); kept.update(result[start:start + 3])
+                action = rng.random(); item_id = rng.randrange(30)
+                if action < 0.3: self.model.remove_id(item_id); kept.discard(item_id)
+                elif action < 0.6: self.model.put_first(note(item_id)); kept.add(item_id)
+            self.model.end_stream()
+            self.assertEqual({item.id for item in self.model.items()}, kept)
+            self.assertRows([item.id for item in self.model.items()])
+
+if __name__ == "__main__":
+    unittest.main()
+
+# tests/test_item_list.py
+# --- END OF FILE test_item_list.py ---
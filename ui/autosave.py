@@ -0,0 +1,83 @@
+# ui/autosave.py
+"""
+Background autosave for the open editors. Keystrokes only mark an editor as
+edited; its contents are serialized once typing pauses (or at the latest
+every JOURNAL_MAX_WAIT_SECONDS) and appended to the recovery journal. Editors
+that are still dirty are saved to the database every `commit_seconds`, and
+never on the keystroke path.
+"""
+import logging
+import time
+import uuid
+from typing import Callable, Dict, List, Optional
+from PyQt6.QtCore import QObject, QTimer
+from ui.base_editor import BaseEditor
+from utils.recovery_journal import RecoveryJournal
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_MAX_WAIT_SECONDS = 10 # Continuous typing is still journaled this often
+
+class Autosave(QObject):
+    def __init__(self, journal: Optional[RecoveryJournal], journal_seconds: float = 2, commit_seconds: float = 60, can_commit: Callable[[BaseEditor], bool] = lambda editor: True, parent: QObject = None):
+        super().__init__(parent)
+        self.journal = journal
+        self._can_commit = can_commit # False while a save or delete of the editor is already in flight
+        self._editors: List[BaseEditor] = []
+        self._edited: Dict[BaseEditor, None] = {} # Edited since last journaled, in order
+        self._new_keys: Dict[BaseEditor, str] = {} # Journal keys of editors not saved yet
+        self._first_edit_at: Optional[float] = None
+        self._journal_timer = QTimer(self); self._journal_timer.setSingleShot(True); self._journal_timer.setInterval(int(journal_seconds * 1000)); self._journal_timer.timeout.connect(self.journal_now)
+        self._commit_timer = QTimer(self); self._commit_timer.setInterval(int(commit_seconds * 1000)); self._commit_timer.timeout.connect(self.commit_now)
+        if commit_seconds > 0: self._commit_timer.start()
+
+    def key_for(self, editor: BaseEditor) -> str:
+        if editor.get_object_id() is not None: return f"{editor.editor_type}:{editor.get_object_id()}"
+        return self._new_keys.setdefault(editor, f"new-{editor.editor_type}:{uuid.uuid4().hex[:12]}")
+
+    def track(self, editor: BaseEditor):
+        self._editors.append(editor)
+        editor.contentEdited.connect(lambda editor=editor: self._on_edited(editor))
+        editor.saveCompleted.connect(self._on_save_completed)
+
+    def forget(self, editor: BaseEditor):
+        """The editor is closing; whatever it held was saved or discarded by the user."""
+        if editor not in self._editors: return
+        self._editors.remove(editor); self._edited.pop(editor, None)
+        if self.journal: self.journal.resolve(self.key_for(editor))
+        self._new_keys.pop(editor, None)
+
+    def _on_edited(self, editor: BaseEditor):
+        if self.journal is None: return
+        now = time.monotonic(); self._edited[editor] = None
+        if self._first_edit_at is None: self._first_edit_at = now
+        if now - self._first_edit_at < JOURNAL_MAX_WAIT_SECONDS or not self._journal_timer.isActive(): self._journal_timer.start()
+
+    def journal_now(self):
+        """Journals the current contents of every editor edited since the last call."""
+        self._journal_timer.stop(); self._first_edit_at = None
+        edited = list(self._edited); self._edited.clear()
+        for editor in edited:
+            if editor.is_dirty(): self.journal.record(self.key_for(editor), editor.recovery_entry())
+            else: self.journal.resolve(self.key_for(editor))
+        if edited: logger.debug("Journaled %d edited editors.", len(edited))
+
+    def commit_now(self):
+        """Saves every dirty editor that already exists in the database; new ones stay journal-only until saved by hand."""
+        for editor in list(self._editors):
+            if editor.is_new or not self._can_commit(editor) or not editor.is_dirty(): continue
+            if editor.autosave(): logger.debug("Autosaving %s %s.", editor.editor_type, editor.get_object_id())
+
+    def _on_save_completed(self, editor: QObject, success: bool):
+        if not success or not self.journal or editor not in self._editors: return
+        new_key = self._new_keys.pop(editor, None)
+        if new_key: self.journal.resolve(new_key)
+        if not editor.is_dirty(): self.journal.resolve(self.key_for(editor))
+
+    def shutdown(self):
+        """Clean exit: every tab was saved or discarded, so nothing needs recovery."""
+        self._journal_timer.stop(); self._commit_timer.stop()
+        if self.journal: self.journal.clear(); self.journal.flush()
+
+# ui/autosave.py
+# --- END OF FILE autosave.py ---
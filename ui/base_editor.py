@@ -2,34 +2,26 @@
 
 # ui/base_editor.py
 
+import logging
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLineEdit, QPushButton, QMessageBox,
-    QToolBar, QApplication, QStyle
+    QToolBar, QStyle, QAbstractScrollArea
 )
-from PyQt6.QtCore import Qt, pyqtSignal, QObject, QUrl
+from PyQt6.QtCore import Qt, pyqtSignal, QObject, QUrl, QTimer
 # --- Import QDesktopServices ---
-from PyQt6.QtGui import QAction, QIcon, QTextCharFormat, QFont, QKeySequence, QDesktopServices, QPalette
+from PyQt6.QtGui import QAction, QTextCharFormat, QFont, QKeySequence, QDesktopServices, QPalette, QTextDocument, QTextCursor
 # -------------------------------
 from database.data_manager import DataManager
 from typing import Optional, Any, Dict
-from pathlib import Path
+from utils.icons import get_icon # Intentional re-export: the editors and main window import get_icon from here
 
-ICONS_DIR = Path(__file__).parent.parent / "icons"
-
-def get_icon(icon_name: str, fallback_pixmap: Optional[QStyle.StandardPixmap] = None) -> QIcon:
-    icon_path = ICONS_DIR / icon_name
-    if icon_path.exists():
-        custom_icon = QIcon(str(icon_path))
-        if not custom_icon.isNull(): return custom_icon
-    if fallback_pixmap is not None:
-        style = QApplication.style()
-        if style: return style.standardIcon(fallback_pixmap)
-    return QIcon()
+logger = logging.getLogger(__name__)
 
 class BaseEditor(QWidget):
     saveRequested = pyqtSignal(QObject, object)
     deleteRequested = pyqtSignal(QObject, int)
     dirtyChanged = pyqtSignal(bool)
+    contentEdited = pyqtSignal() # Any edit to the title, tags or body; drives autosave
     saveCompleted = pyqtSignal(QObject, bool)
 
     def __init__(self, editor_type: str, object_data: Optional[QObject] = None, data_manager: DataManager = None, parent: QWidget = None, **kwargs):
@@ -50,7 +42,12 @@ class BaseEditor(QWidget):
         self._controls_layout = QHBoxLayout()
         self._initial_title = ""
         self._initial_tags = ""
-        self._initial_specific_data = None
+        self._initial_extra_state = None
+        self._saved_length = 0
+        self._saved_fingerprint = None
+        self._save_in_flight: Optional[tuple] = None # (state, specific data) sent with the last save request
+        self._body_loading = False # The body is still being loaded in the background; it cannot be saved yet
+        self._pending_view_state: Optional[Dict[str, int]] = None # View state to restore once the body has loaded
 
         self._setup_common_ui()
         self._setup_specific_editor_ui()
@@ -63,10 +60,8 @@ class BaseEditor(QWidget):
              self._is_dirty = False
              self.delete_btn.setVisible(False)
 
-        self._initial_title = self.title_input.text()
-        self._initial_tags = self.tags_input.text()
-        self._initial_specific_data = self._get_specific_initial_state_data()
-        print(f"Editor {self.object_id or 'New'} ({self.editor_type}): Initial state captured. Dirty: {self._is_dirty}")
+        self._mark_clean(self._get_specific_initial_state_data())
+        logger.debug("Editor %s (%s): Initial state captured. Dirty: %s", self.object_id or 'New', self.editor_type, self._is_dirty)
 
 
     def _setup_common_ui(self):
@@ -100,7 +95,7 @@ class BaseEditor(QWidget):
     def _open_donate_link(self):
         # Re-use the same function as in MainWindow for consistency
         url = QUrl("https://www.paypal.com/paypalme/kh1512")
-        print(f"Opening donate link from editor: {url.toString()}")
+        logger.debug("Opening donate link from editor: %s", url.toString())
         if not QDesktopServices.openUrl(url):
              QMessageBox.warning(self, "Error", "Could not open donation link in browser.")
     # ----------------------------
@@ -124,43 +119,83 @@ class BaseEditor(QWidget):
     def _load_specific_fields(self): raise NotImplementedError
     def _get_specific_fields_data(self) -> Any: raise NotImplementedError
     def _get_specific_initial_state_data(self) -> Any: raise NotImplementedError
+    def _set_specific_fields_data(self, specific_data: Any): raise NotImplementedError
+    def _content_view(self) -> QAbstractScrollArea: raise NotImplementedError # The text edit holding the body
+    def _content_document(self) -> QTextDocument: return self._content_view().document()
+    def _get_specific_extra_state(self) -> Any: return None # Cheap-to-read fields besides the document (e.g. snippet language)
 
     def _save_requested(self):
-        title = self.title_input.text().strip()
-        tags = self.tags_input.text().strip()
-        specific_data = self._get_specific_fields_data()
-        specific_data_is_empty = self._is_specific_data_empty(specific_data)
-        if not title and specific_data_is_empty:
+        if self._body_loading: logger.debug("Editor %s (%s): save ignored while the body is loading.", self.object_id, self.editor_type); self.saveCompleted.emit(self, False); return
+        save_data = self._build_save_data()
+        if save_data is None:
             QMessageBox.warning(self, "Cannot Save", "Please enter a title or content/code before saving.")
             self.saveCompleted.emit(self, False)
             return
-        save_data = {'id': self.object_id, 'title': title, 'tags': tags, 'specific_data': specific_data, 'is_new': self.is_new, 'editor_type': self.editor_type}
         self.saveRequested.emit(self, save_data)
 
+    def autosave(self) -> bool:
+        """Requests a save without any prompt. Returns False, saving nothing, if title and body are empty."""
+        save_data = None if self._body_loading else self._build_save_data()
+        if save_data is None: return False
+        self.saveRequested.emit(self, save_data); return True
+
+    def _build_save_data(self) -> Optional[dict]:
+        title = self.title_input.text().strip()
+        tags = self.tags_input.text().strip()
+        specific_data = self._get_specific_fields_data()
+        if not title and self._is_specific_data_empty(specific_data): return None
+        self._save_in_flight = (self._capture_state(), specific_data)
+        return {'id': self.object_id, 'title': title, 'tags': tags, 'specific_data': specific_data, 'is_new': self.is_new, 'editor_type': self.editor_type}
+
     def _delete_requested(self):
         if self.is_new or self.object_id is None: return
         reply = QMessageBox.question( self, "Confirm Delete", f"Are you sure you want to delete '{self.title_input.text().strip()}'?", QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No )
         if reply == QMessageBox.StandardButton.Yes: self.deleteRequested.emit(self, self.object_id)
 
-    def _on_editor_text_changed(self): self._update_dirty_state()
-
-    def _update_dirty_state(self):
-        current_title = self.title_input.text()
-        current_tags = self.tags_input.text()
-        current_specific_data = self._get_specific_fields_data()
-        is_currently_dirty = (current_title != self._initial_title or current_tags != self._initial_tags or current_specific_data != self._initial_specific_data)
+    def _on_editor_text_changed(self): self._update_dirty_state(); self.contentEdited.emit()
+
+    def _capture_state(self) -> tuple: return (self.title_input.text(), self.tags_input.text(), self._get_specific_extra_state(), self._content_document().revision())
+
+    def _mark_clean(self, saved_data: Any, state: Optional[tuple] = None):
+        """
+        Takes `state` (from _capture_state(), default now) as the saved one.
+        `saved_data` is the specific data that was loaded or saved; only its
+        fingerprint is kept. If the body was edited after `state` was taken,
+        it stays dirty.
+        """
+        self._initial_title, self._initial_tags, self._initial_extra_state, revision = state or self._capture_state()
+        self._saved_fingerprint = hash(saved_data); document = self._content_document()
+        if revision == document.revision(): document.setModified(False); self._saved_length = document.characterCount()
+        else: self._saved_length = -1 # Unknown; only a full comparison can clear it
+
+    def _update_dirty_state(self, verify: bool = False):
+        """
+        Cheap enough to run on every keystroke: the document is only serialized
+        when it has been modified but is as long as the saved text and `verify`
+        is set. Undoing back to the saved text clears the modified flag without
+        any serialization.
+        """
+        document = self._content_document()
+        if self.title_input.text() != self._initial_title or self.tags_input.text() != self._initial_tags or self._get_specific_extra_state() != self._initial_extra_state: is_currently_dirty = True
+        elif not document.isModified() and self._saved_length >= 0: is_currently_dirty = False
+        elif (self._saved_length >= 0 and document.characterCount() != self._saved_length) or not verify: is_currently_dirty = True
+        else:
+            is_currently_dirty = hash(self._get_specific_fields_data()) != self._saved_fingerprint
+            if not is_currently_dirty: document.setModified(False); self._saved_length = document.characterCount() # Edited back to the saved text by hand
         if is_currently_dirty != self._is_dirty:
             self._is_dirty = is_currently_dirty
-            print(f"Editor {self.object_id or 'New'} ({self.editor_type}): Dirty state changed -> {self._is_dirty}")
+            logger.debug("Editor %s (%s): Dirty state changed -> %s", self.object_id or 'New', self.editor_type, self._is_dirty)
             self.dirtyChanged.emit(self._is_dirty)
 
     def _is_specific_data_empty(self, specific_data) -> bool:
         return (specific_data is None or (isinstance(specific_data, str) and not specific_data.strip()) or (isinstance(specific_data, tuple) and all(not item.strip() for item in specific_data if isinstance(item, str))))
 
     def handle_save_success(self, saved_object):
-        print(f"Editor {self.object_id or 'New'} ({self.editor_type}) received save success for ID: {getattr(saved_object, 'id', 'N/A')}.")
+        logger.debug("Editor %s (%s) received save success for ID: %s.", self.object_id or 'New', self.editor_type, getattr(saved_object, 'id', 'N/A'))
         self.object_data = saved_object; self.is_new = False; self.object_id = getattr(saved_object, 'id', None); self.delete_btn.setVisible(True)
-        self._initial_title = self.title_input.text(); self._initial_tags = self.tags_input.text(); self._initial_specific_data = self._get_specific_fields_data()
+        # Edits typed while the save was in flight were not part of it and stay unsaved.
+        if self._save_in_flight: state, saved_data = self._save_in_flight; self._save_in_flight = None; self._mark_clean(saved_data, state)
+        else: self._mark_clean(self._get_specific_fields_data())
         self._update_dirty_state()
         if self.editor_type == 'note':
             if hasattr(self, 'note_saved'): self.note_saved.emit(saved_object)
@@ -169,20 +204,47 @@ class BaseEditor(QWidget):
         self.saveCompleted.emit(self, True)
 
     def handle_delete_success(self):
-        print(f"Editor {self.object_id or 'New'} ({self.editor_type}) received delete success.")
+        logger.debug("Editor %s (%s) received delete success.", self.object_id or 'New', self.editor_type)
         if self.editor_type == 'note':
             if hasattr(self, 'note_deleted'): self.note_deleted.emit(self.object_id)
         elif self.editor_type == 'snippet':
             if hasattr(self, 'snippet_deleted'): self.snippet_deleted.emit(self.object_id)
 
     def handle_db_error(self, error_message: str):
-        print(f"Editor {self.object_id or 'New'} ({self.editor_type}) received DB error: {error_message}")
+        self._save_in_flight = None
+        logger.error("Editor %s (%s) received DB error: %s", self.object_id or 'New', self.editor_type, error_message)
         QMessageBox.critical(self, f"{self.editor_type.capitalize()} Database Error", f"An error occurred:\n{error_message}")
         self.saveCompleted.emit(self, False)
 
-    def is_dirty(self) -> bool: self._update_dirty_state(); return self._is_dirty
-    def save_changes(self): print(f"Editor {self.object_id or 'New'} ({self.editor_type}) requesting save via save_changes."); self._save_requested()
+    def is_dirty(self) -> bool: self._update_dirty_state(verify=True); return self._is_dirty
+    def save_changes(self): logger.debug("Editor %s (%s) requesting save via save_changes.", self.object_id or 'New', self.editor_type); self._save_requested()
     def get_object_id(self) -> Optional[int]: return self.object_id
 
+    def recovery_entry(self) -> Dict[str, Any]:
+        """The unsaved contents as a recovery journal entry. While the body is loading it cannot have been edited, so it is left out."""
+        entry = {"type": self.editor_type, "id": self.object_id, "title": self.title_input.text(), "tags": self.tags_input.text()}
+        if not self._body_loading: entry["data"] = self._get_specific_fields_data()
+        return entry
+
+    def apply_recovered(self, entry: Dict[str, Any]):
+        """Puts journaled contents back into the editor as unsaved changes. An entry without "data" keeps the stored body."""
+        self.title_input.setText(entry.get("title") or ""); self.tags_input.setText(entry.get("tags") or "")
+        if "data" in entry: self._set_specific_fields_data(entry["data"]); self._content_document().setModified(True)
+        self._update_dirty_state(verify=True)
+
+    def view_state(self) -> Dict[str, int]:
+        """Cursor and scroll position of the body; all that is kept of a hibernated tab besides its id."""
+        if self._body_loading: return dict(self._pending_view_state or {})
+        view = self._content_view(); cursor = view.textCursor()
+        return {"cursor": cursor.position(), "anchor": cursor.anchor(), "scroll": view.verticalScrollBar().value()}
+
+    def restore_view_state(self, state: Dict[str, int]):
+        if self._body_loading: self._pending_view_state = state; return
+        view = self._content_view(); cursor = view.textCursor(); last = self._content_document().characterCount() - 1
+        cursor.setPosition(min(max(state.get("anchor", 0), 0), last)); cursor.setPosition(min(max(state.get("cursor", 0), 0), last), QTextCursor.MoveMode.KeepAnchor)
+        view.setTextCursor(cursor)
+        # The scroll range is only known once the document has been laid out in the shown view.
+        scroll = state.get("scroll", 0); QTimer.singleShot(0, lambda: view.verticalScrollBar().setValue(scroll))
+
 # ui/base_editor.py
 # --- END OF FILE ui/base_editor.py ---
\ No newline at end of file
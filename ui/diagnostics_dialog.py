@@ -0,0 +1,87 @@
+# ui/diagnostics_dialog.py
+
+import json
+import logging
+from PyQt6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QTableWidget, QTableWidgetItem, QPushButton,
+    QHeaderView, QFileDialog, QLabel, QApplication, QMessageBox
+)
+from PyQt6.QtCore import Qt, QTimer
+from database.data_manager import DataManager
+
+logger = logging.getLogger(__name__)
+
+class DiagnosticsDialog(QDialog):
+    """Shows per-task-type DB latency statistics collected by the worker pool."""
+    COLUMNS = [
+        ("Task", None), ("Count", "count"), ("Errors", "errors"), ("Avg Rows", "rows_mean"),
+        ("Wait p50 (ms)", ("queue_wait", "p50_ms")), ("Wait p95 (ms)", ("queue_wait", "p95_ms")),
+        ("Exec p50 (ms)", ("execution", "p50_ms")), ("Exec p95 (ms)", ("execution", "p95_ms")),
+        ("Exec p99 (ms)", ("execution", "p99_ms")), ("Exec max (ms)", ("execution", "max_ms")),
+    ]
+
+    def __init__(self, data_manager: DataManager, parent=None):
+        super().__init__(parent)
+        self.data_manager = data_manager
+        self.setWindowTitle("Diagnostics - Database Task Latency")
+        self.resize(900, 400)
+        layout = QVBoxLayout(self)
+        self.summary_label = QLabel("")
+        layout.addWidget(self.summary_label)
+        self.table = QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels([title for title, _ in self.COLUMNS])
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.table.setSortingEnabled(True)
+        layout.addWidget(self.table, 1)
+
+        buttons = QHBoxLayout()
+        refresh_btn = QPushButton("Refresh"); refresh_btn.clicked.connect(self.refresh)
+        reset_btn = QPushButton("Reset"); reset_btn.setToolTip("Clear all collected statistics"); reset_btn.clicked.connect(self._reset)
+        copy_btn = QPushButton("Copy JSON"); copy_btn.clicked.connect(self._copy_json)
+        save_btn = QPushButton("Save JSON..."); save_btn.clicked.connect(self._save_json)
+        close_btn = QPushButton("Close"); close_btn.clicked.connect(self.accept)
+        for button in (refresh_btn, reset_btn, copy_btn, save_btn): buttons.addWidget(button)
+        buttons.addStretch(1); buttons.addWidget(close_btn)
+        layout.addLayout(buttons)
+
+        self._refresh_timer = QTimer(self); self._refresh_timer.setInterval(2000); self._refresh_timer.timeout.connect(self.refresh); self._refresh_timer.start()
+        self.refresh()
+
+    def refresh(self):
+        snapshot = self.data_manager.metrics_snapshot()
+        tasks = snapshot.get("tasks", {})
+        self.table.setSortingEnabled(False)
+        self.table.setRowCount(len(tasks))
+        for row, (task_type, stats) in enumerate(tasks.items()):
+            for column, (_, key) in enumerate(self.COLUMNS):
+                if key is None: item = QTableWidgetItem(task_type)
+                else:
+                    value = stats[key[0]][key[1]] if isinstance(key, tuple) else stats[key]
+                    item = QTableWidgetItem()
+                    item.setData(Qt.ItemDataRole.DisplayRole, round(value, 2) if isinstance(value, float) else value)
+                    item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+                if key == "errors" and stats.get("last_error"): item.setToolTip(f"Last error: {stats['last_error']}")
+                self.table.setItem(row, column, item)
+        self.table.setSortingEnabled(True)
+        total = sum(stats["count"] for stats in tasks.values()); errors = sum(stats["errors"] for stats in tasks.values())
+        self.summary_label.setText(f"{total} tasks in {len(tasks)} categories, {errors} errors.")
+
+    def _reset(self):
+        self.data_manager.reset_metrics(); self.refresh()
+
+    def _copy_json(self):
+        clipboard = QApplication.clipboard()
+        if clipboard: clipboard.setText(json.dumps(self.data_manager.metrics_snapshot(), indent=2))
+
+    def _save_json(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Save Diagnostics", "notes_manager_metrics.json", "JSON Files (*.json)")
+        if not path: return
+        try:
+            self.data_manager.dump_metrics_json(path)
+            logger.info("Diagnostics written to %s", path)
+        except OSError as e:
+            QMessageBox.warning(self, "Error", f"Could not write diagnostics file:\n{e}")
+
+# ui/diagnostics_dialog.py
+# --- END OF FILE diagnostics_dialog.py ---
@@ -0,0 +1,22 @@
+# ui/hibernated_tab.py
+"""
+Stand-in for an editor tab whose editor has been released: a clean tab left
+idle past `tab_hibernate_minutes`, or a tab restored from the last session
+that has not been looked at yet. It keeps only what is needed to rebuild the
+editor when the tab is focused again.
+"""
+from typing import Dict, Optional
+from PyQt6.QtWidgets import QWidget
+
+class HibernatedTab(QWidget):
+    def __init__(self, editor_type: str, object_id: int, view_state: Optional[Dict[str, int]] = None, parent: QWidget = None):
+        super().__init__(parent)
+        self.editor_type = editor_type
+        self.object_id = object_id
+        self.view_state = view_state or {} # Cursor, anchor and scroll position, see BaseEditor.view_state()
+
+    def get_object_id(self) -> int: return self.object_id
+    def session_entry(self) -> dict: return {"type": self.editor_type, "id": self.object_id, **self.view_state}
+
+# ui/hibernated_tab.py
+# --- END OF FILE hibernated_tab.py ---
@@ -1,37 +1,76 @@
 # --- START OF FILE ui/main_window.py ---
 
 # ui/main_window.py
+import logging
+import time
 from PyQt6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QTabWidget,
     QListWidget, QLineEdit, QPushButton, QSplitter, QMessageBox, QLabel,
     QStyle, QListWidgetItem,
     QGroupBox, QSpacerItem, QSizePolicy,
-    QCheckBox, QFormLayout, QTabBar, QComboBox
+    QCheckBox, QFormLayout, QTabBar, QComboBox, QApplication
 )
-from PyQt6.QtCore import Qt, pyqtSignal, QObject, QTimer, QByteArray, QUrl
+from PyQt6.QtCore import Qt, pyqtSignal, QObject, QTimer, QByteArray, QUrl, QEvent, QModelIndex, QPoint
 from PyQt6.QtGui import QAction, QIcon, QKeySequence, QDesktopServices
-from typing import Optional, Any, List, Dict
+from pathlib import Path
+from typing import Optional, Any, List, Dict, Tuple
 from database.data_manager import DataManager
-from widgets.note_item import NoteItem
-from widgets.snippet_item import SnippetItem
-from ui.note_editor import NoteEditor
-from ui.snippet_editor import SnippetEditor
+from database.storage_profiles import DEFAULT_STORAGE_PROFILE, STORAGE_PROFILES
+from widgets.item_list import ItemListModel, ItemListView, ITEM_ROLE
 from database.models import Note, Snippet
-from ui.base_editor import get_icon
+from ui.base_editor import BaseEditor, get_icon
+from ui.autosave import Autosave
+from ui.hibernated_tab import HibernatedTab
+from utils.list_snapshot import SNAPSHOT_ROWS, load_list_snapshot, note_summary, save_list_snapshot, snippet_summary
+from utils.recovery_journal import RecoveryJournal
+
+logger = logging.getLogger(__name__)
+
+def _editor_class(editor_type: str):
+    """Editor modules (and the syntax highlighter) are imported when the first tab opens, not at startup."""
+    if editor_type == 'note':
+        from ui.note_editor import NoteEditor
+        return NoteEditor
+    from ui.snippet_editor import SnippetEditor
+    return SnippetEditor
 
 class MainWindow(QMainWindow):
-    def __init__(self, data_manager: DataManager, settings: Dict):
+    def __init__(self, data_manager: DataManager, settings: Dict, snapshot_path: Optional[Path] = None, journal_path: Optional[Path] = None):
         super().__init__()
         self.data_manager = data_manager
         self.settings = settings
+        self._snapshot_path = snapshot_path # Sidebar state shown at startup before the database answers; None disables it
         self.setWindowTitle("Notes & Snippets Manager")
         self._is_closing = False
         self._current_tag_filter: Optional[str] = None # Back to Optional[str]
+        self._editors: Dict[Tuple[str, int], BaseEditor] = {} # (editor_type, object id) -> open editor tab
+        self._new_editors_saving: Dict[str, List[Optional[BaseEditor]]] = {'note': [], 'snippet': []} # New editors waiting for their first save, oldest first (None once closed)
+        self._editors_awaiting_result: set = set() # Editors with a save or delete in flight; DB errors are shown in these
+        self._notes_stream: Optional[int] = None; self._snippets_stream: Optional[int] = None # Ids of the list streams being merged
+        self._hibernated: Dict[Tuple[str, int], HibernatedTab] = {} # (editor_type, object id) -> tab whose editor was released
+        self._tab_left_at: Dict[QWidget, float] = {} # Editor tab -> when it last stopped being the current tab
+        self._current_tab: Optional[QWidget] = None
+        # Unsaved edits are journaled to `journal_path` (None disables the journal) and offered for recovery after a crash.
+        self.autosave = Autosave(RecoveryJournal(journal_path) if journal_path else None, self.settings.get("autosave_journal_seconds", 2), self.settings.get("autosave_commit_seconds", 60), lambda editor: editor not in self._editors_awaiting_result, self)
         self._connect_data_manager_signals()
         self._setup_ui()
         self._setup_shortcuts()
         self._restore_geometry_and_state()
-        self._reload_all_data(refresh_tags=True)
+        if not self._show_list_snapshot(): self._reload_all_data(refresh_tags=True)
+        self._restore_open_tabs()
+        if self.autosave.journal and self.autosave.journal.live_entries(): QTimer.singleShot(0, self._offer_recovery)
+        self._hibernate_timer = QTimer(self); self._hibernate_timer.setInterval(30000); self._hibernate_timer.timeout.connect(self._hibernate_idle_tabs)
+        if self.settings.get("tab_hibernate_minutes", 10) > 0: self._hibernate_timer.start()
+        # Any key press, click or wheel counts as activity and pauses idle-time DB maintenance.
+        QApplication.instance().installEventFilter(self)
+        self.data_manager.start_maintenance(self.settings.get("maintenance_idle_minutes", 5))
+        self.data_manager.configure_backups(self.settings.get("backup_interval_hours", 24), self.settings.get("backup_keep", 7), self.settings.get("backup_dir"))
+
+    _USER_INPUT_EVENTS = (QEvent.Type.KeyPress, QEvent.Type.MouseButtonPress, QEvent.Type.Wheel)
+
+    def eventFilter(self, watched: QObject, event: QEvent) -> bool:
+        if event.type() in self._USER_INPUT_EVENTS: self.data_manager.notify_user_activity()
+        return super().eventFilter(watched, event)
 
     def _connect_data_manager_signals(self):
         self.data_manager.note_added.connect(lambda note: self._handle_note_added(note) if not self._is_closing else None)
@@ -44,9 +83,14 @@ class MainWindow(QMainWindow):
         self.data_manager.snippet_deleted.connect(lambda snippet_id: self._handle_snippet_deleted(snippet_id) if not self._is_closing else None)
         self.data_manager.all_snippets_loaded.connect(lambda snippets: self._handle_all_snippets_loaded(snippets) if not self._is_closing else None)
         self.data_manager.snippet_searched.connect(lambda snippets: self._handle_snippet_searched(snippets) if not self._is_closing else None)
+        self.data_manager.notes_chunk_loaded.connect(lambda stream_id, notes, last: self._handle_notes_chunk(stream_id, notes, last) if not self._is_closing else None)
+        self.data_manager.snippets_chunk_loaded.connect(lambda stream_id, snippets, last: self._handle_snippets_chunk(stream_id, snippets, last) if not self._is_closing else None)
         self.data_manager.all_tags_loaded.connect(self._handle_all_tags_loaded)
         self.data_manager.tags_updated.connect(self._refresh_tag_list)
         self.data_manager.db_error.connect(self._handle_db_error)
+        self.data_manager.backup_progress.connect(self._handle_backup_progress)
+        self.data_manager.backup_completed.connect(self._handle_backup_completed)
+        self.data_manager.maintenance.problem_detected.connect(lambda task, details: self._handle_db_error(f"maintenance_{task}", details))
 
     def _setup_ui(self):
         central_widget = QWidget()
@@ -67,14 +111,16 @@ class MainWindow(QMainWindow):
         self.list_tag_splitter = QSplitter(Qt.Orientation.Vertical)
 
         self.item_tabs = QTabWidget() # Holds lists AND settings now
-        self.notes_list = QListWidget()
-        self.snippets_list = QListWidget()
+        self.notes_model = ItemListModel('note', self)
+        self.snippets_model = ItemListModel('snippet', self)
+        self.notes_list = ItemListView(self.notes_model)
+        self.snippets_list = ItemListView(self.snippets_model)
         self.item_tabs.addTab(self.notes_list, "Notes")
         self.item_tabs.addTab(self.snippets_list, "Snippets")
-        self.notes_list.itemClicked.connect(self._on_note_selected)
-        self.notes_list.itemDoubleClicked.connect(self._on_note_selected)
-        self.snippets_list.itemClicked.connect(self._on_snippet_selected)
-        self.snippets_list.itemDoubleClicked.connect(self._on_snippet_selected)
+        self.notes_list.clicked.connect(self._on_note_selected)
+        self.notes_list.activated.connect(self._on_note_selected)
+        self.snippets_list.clicked.connect(self._on_snippet_selected)
+        self.snippets_list.activated.connect(self._on_snippet_selected)
 
         self.settings_widget = QWidget()
         settings_tab_layout = QVBoxLayout(self.settings_widget)
@@ -98,6 +144,31 @@ class MainWindow(QMainWindow):
         self.theme_combo.setCurrentIndex(current_index)
         self.theme_combo.currentTextChanged.connect(self._on_theme_changed)
         settings_form_layout.addRow("Theme (Requires Restart):", self.theme_combo)
+        self.backup_interval_combo = QComboBox()
+        backup_intervals = {"Off": 0, "Every 6 hours": 6, "Daily": 24, "Weekly": 168}
+        current_interval = self.settings.get("backup_interval_hours", 24)
+        for display_name, hours in backup_intervals.items():
+            self.backup_interval_combo.addItem(display_name, hours)
+            if hours == current_interval: self.backup_interval_combo.setCurrentIndex(self.backup_interval_combo.count() - 1)
+        self.backup_interval_combo.currentIndexChanged.connect(self._on_backup_interval_changed)
+        settings_form_layout.addRow("Automatic Backups:", self.backup_interval_combo)
+        self.storage_profile_combo = QComboBox()
+        current_profile = self.settings.get("storage_profile", DEFAULT_STORAGE_PROFILE)
+        for profile in STORAGE_PROFILES.values():
+            self.storage_profile_combo.addItem(profile.name.replace("_", " ").title() + ("" if profile.safe else " (unsafe)"), profile.name)
+            self.storage_profile_combo.setItemData(self.storage_profile_combo.count() - 1, profile.description, Qt.ItemDataRole.ToolTipRole)
+            if profile.name == current_profile: self.storage_profile_combo.setCurrentIndex(self.storage_profile_combo.count() - 1)
+        self.storage_profile_combo.setToolTip("SQLite tuning. Run 'python -m database.storage_profiles' to benchmark them on your database.")
+        self.storage_profile_combo.currentIndexChanged.connect(self._on_storage_profile_changed)
+        settings_form_layout.addRow("Storage Profile (Requires Restart):", self.storage_profile_combo)
+        self.backup_now_btn = QPushButton("Back Up Now")
+        self.backup_now_btn.setToolTip("Write a backup copy of the database now (runs in the background)")
+        self.backup_now_btn.clicked.connect(self._backup_now)
+        settings_form_layout.addRow(self.backup_now_btn)
+        diagnostics_btn = QPushButton("Diagnostics...")
+        diagnostics_btn.setToolTip("Show database task latency statistics (Ctrl+Shift+D)")
+        diagnostics_btn.clicked.connect(self._show_diagnostics)
+        settings_form_layout.addRow(diagnostics_btn)
         donate_button = QPushButton(get_icon("donate.png", QStyle.StandardPixmap.SP_DialogApplyButton), "Donate")
         donate_button.setToolTip("If you found the program useful, please support us with a donation")
         donate_button.clicked.connect(self._open_donate_link)
@@ -149,11 +220,14 @@ class MainWindow(QMainWindow):
         self.content_area.setTabsClosable(True)
         self.content_area.tabCloseRequested.connect(self._close_tab_request)
         self.content_area.setMovable(True)
+        self.content_area.currentChanged.connect(self._on_current_tab_changed)
 
         self.status_bar = self.statusBar()
         self.db_error_label = QLabel("")
         self.db_error_label.setStyleSheet("color: red;")
         self.status_bar.addPermanentWidget(self.db_error_label)
+        self.backup_status_label = QLabel("")
+        self.status_bar.addPermanentWidget(self.backup_status_label)
 
         self.main_splitter.addWidget(sidebar)
         self.main_splitter.addWidget(self.content_area)
@@ -163,49 +237,82 @@ class MainWindow(QMainWindow):
 
     def _open_donate_link(self):
         url = QUrl("https://www.paypal.com/paypalme/kh1512")
-        print(f"Opening donate link: {url.toString()}")
+        logger.debug("Opening donate link: %s", url.toString())
         if not QDesktopServices.openUrl(url):
              QMessageBox.warning(self, "Error", "Could not open donation link in browser.")
 
     def _on_save_geometry_changed(self, state: int):
         should_save = state == Qt.CheckState.Checked.value
-        print(f"Setting 'save_window_geometry' to: {should_save}")
+        logger.debug("Setting 'save_window_geometry' to: %s", should_save)
         self.settings["save_window_geometry"] = should_save
 
     def _on_theme_changed(self, text: str):
         selected_theme_name = self.theme_combo.currentData()
         if selected_theme_name and selected_theme_name != self.settings.get("theme"):
-            print(f"Theme selection changed to: {selected_theme_name}")
+            logger.debug("Theme selection changed to: %s", selected_theme_name)
             self.settings["theme"] = selected_theme_name
             QMessageBox.information(self, "Theme Changed", "The theme will be applied the next time you start the application.")
 
+    def _on_backup_interval_changed(self, index: int):
+        hours = self.backup_interval_combo.currentData()
+        logger.debug("Setting 'backup_interval_hours' to: %s", hours)
+        self.settings["backup_interval_hours"] = hours
+        self.data_manager.configure_backups(hours, self.settings.get("backup_keep", 7), self.settings.get("backup_dir"))
+
+    def _on_storage_profile_changed(self, index: int):
+        profile_name = self.storage_profile_combo.currentData()
+        if profile_name and profile_name != self.settings.get("storage_profile"):
+            logger.debug("Setting 'storage_profile' to: %s", profile_name)
+            self.settings["storage_profile"] = profile_name
+            QMessageBox.information(self, "Storage Profile Changed", "The storage profile will be applied the next time you start the application.")
+
+    def _show_diagnostics(self):
+        from ui.diagnostics_dialog import DiagnosticsDialog
+        dialog = DiagnosticsDialog(self.data_manager, self)
+        dialog.exec()
+
+    def _backup_now(self):
+        if self.data_manager.backup_now_async():
+            self.backup_now_btn.setEnabled(False)
+            self.backup_status_label.setText("Backing up...")
+
+    def _handle_backup_progress(self, done: int, total: int):
+        if total > 0: self.backup_status_label.setText(f"Backing up... {100 * done // total}%")
+
+    def _handle_backup_completed(self, path: str):
+        logger.debug("Backup written to %s", path)
+        self.backup_now_btn.setEnabled(True)
+        self.backup_status_label.setText("Backup complete")
+        QTimer.singleShot(5000, lambda: self.backup_status_label.setText(""))
+
     def _restore_geometry_and_state(self):
-        print("Attempting to restore geometry and state...")
+        logger.debug("Attempting to restore geometry and state...")
         use_defaults = True
         if self.settings.get("save_window_geometry", True):
             geom = self.settings.get("window_geometry"); maximized = self.settings.get("window_maximized", False)
             main_split_sizes = self.settings.get("main_splitter_sizes"); side_split_sizes = self.settings.get("sidebar_splitter_sizes")
-            if maximized: print("Window was maximized, restoring maximized state."); QTimer.singleShot(0, self.showMaximized); use_defaults = False
+            if maximized: logger.debug("Window was maximized, restoring maximized state."); QTimer.singleShot(0, self.showMaximized); use_defaults = False
             elif isinstance(geom, dict):
                 x = geom.get("x"); y = geom.get("y"); w = geom.get("width"); h = geom.get("height")
-                if all(v is not None and isinstance(v, (int, float)) and v >= 0 for v in [x, y, w, h]): print(f"Restoring geometry: x={x}, y={y}, w={w}, h={h}"); self.setGeometry(int(x), int(y), int(w), int(h)); use_defaults = False
-                else: print("Saved geometry values invalid or incomplete.")
-            else: print("No saved geometry found or format incorrect.")
+                if all(v is not None and isinstance(v, (int, float)) and v >= 0 for v in [x, y, w, h]): logger.debug("Restoring geometry: x=%s, y=%s, w=%s, h=%s", x, y, w, h); self.setGeometry(int(x), int(y), int(w), int(h)); use_defaults = False
+                else: logger.debug("Saved geometry values invalid or incomplete.")
+            else: logger.debug("No saved geometry found or format incorrect.")
             if isinstance(main_split_sizes, list) and len(main_split_sizes) == 2 and hasattr(self, 'main_splitter'):
-                try: self.main_splitter.setSizes([int(s) for s in main_split_sizes]); print(f"Restored main splitter sizes: {main_split_sizes}")
-                except: print(f"Error restoring main splitter sizes. Using defaults."); self.main_splitter.setSizes([300, 900])
+                try: self.main_splitter.setSizes([int(s) for s in main_split_sizes]); logger.debug("Restored main splitter sizes: %s", main_split_sizes)
+                except: logger.error("Error restoring main splitter sizes. Using defaults."); self.main_splitter.setSizes([300, 900])
             elif hasattr(self, 'main_splitter'): self.main_splitter.setSizes([300, 900])
             if isinstance(side_split_sizes, list) and len(side_split_sizes) == 2 and hasattr(self, 'list_tag_splitter'):
-                try: self.list_tag_splitter.setSizes([int(s) for s in side_split_sizes]); print(f"Restored sidebar splitter sizes: {side_split_sizes}")
-                except: print(f"Error restoring sidebar splitter sizes. Using defaults."); self.list_tag_splitter.setSizes([400, 200])
+                try: self.list_tag_splitter.setSizes([int(s) for s in side_split_sizes]); logger.debug("Restored sidebar splitter sizes: %s", side_split_sizes)
+                except: logger.error("Error restoring sidebar splitter sizes. Using defaults."); self.list_tag_splitter.setSizes([400, 200])
             elif hasattr(self, 'list_tag_splitter'): self.list_tag_splitter.setSizes([400, 200])
         if use_defaults:
-             print("Using default window size and maximizing."); QTimer.singleShot(0, self.showMaximized)
+             logger.debug("Using default window size and maximizing."); QTimer.singleShot(0, self.showMaximized)
              if hasattr(self, 'main_splitter'): self.main_splitter.setSizes([300, 900])
              if hasattr(self, 'list_tag_splitter'): self.list_tag_splitter.setSizes([400, 200])
 
     def _setup_shortcuts(self):
         close_tab_action = QAction("Close Tab", self); close_tab_action.setShortcut(QKeySequence("Ctrl+W")); close_tab_action.triggered.connect(self._close_current_tab_slot); self.addAction(close_tab_action)
+        diagnostics_action = QAction("Diagnostics", self); diagnostics_action.setShortcut(QKeySequence("Ctrl+Shift+D")); diagnostics_action.triggered.connect(self._show_diagnostics); self.addAction(diagnostics_action)
         clear_filter_action = QAction("Clear Tag Filter", self); clear_filter_action.setShortcut(QKeySequence("Shift+Ctrl+C")); clear_filter_action.triggered.connect(self._clear_tag_filter); self.addAction(clear_filter_action)
 
     def _close_current_tab_slot(self):
@@ -213,41 +320,70 @@ class MainWindow(QMainWindow):
         if current_index != -1:
             self._close_tab_request(current_index)
 
-    def _close_tab_request(self, index):
-        widget = self.content_area.widget(index)
-        if not isinstance(widget, (NoteEditor, SnippetEditor)): print(f"Attempting to close non-editor tab at index {index}."); self.content_area.removeTab(index); return
-        if widget.is_dirty():
-            tab_text = self.content_area.tabText(index).rstrip("*")
-            reply = QMessageBox.question(self, "Save Changes?",f"'{tab_text}' has unsaved changes.\nDo you want to save them?", QMessageBox.StandardButton.Save | QMessageBox.StandardButton.Discard | QMessageBox.StandardButton.Cancel)
-            if reply == QMessageBox.StandardButton.Save: widget.save_changes(); self.content_area.removeTab(index)
-            elif reply == QMessageBox.StandardButton.Discard: self.content_area.removeTab(index)
-        else: self.content_area.removeTab(index)
-
     def _reload_all_data(self, refresh_tags=False):
         filter_list = self._current_tag_filter # Pass string or None
-        print(f"Reloading data. Current tag filter: {filter_list}")
-        search_query = self.search_input.text()
-        if search_query:
-            self.data_manager.search_notes_async(search_query, filter_list)
-            self.data_manager.search_snippets_async(search_query, filter_list)
-        else:
-            self.data_manager.load_all_notes_async(filter_list)
-            self.data_manager.load_all_snippets_async(filter_list)
+        logger.debug("Reloading data. Current tag filter: %s", filter_list)
+        search_query = self.search_input.text() or None
+        # Results arrive in chunks; a newer reload supersedes (and cancels) the streams still running.
+        for stream_id in (self._notes_stream, self._snippets_stream):
+            if stream_id is not None: self.data_manager.cancel_stream(stream_id)
+        self.notes_model.begin_stream(); self.snippets_model.begin_stream()
+        self._notes_stream = self.data_manager.stream_notes_async(search_query, filter_list)
+        self._snippets_stream = self.data_manager.stream_snippets_async(search_query, filter_list)
         if refresh_tags:
             self._refresh_tag_list()
 
+    # --- Startup snapshot ---
+    def _show_list_snapshot(self) -> bool:
+        """
+        Fills the sidebar from the snapshot saved at the last shutdown and starts
+        the reconcile. The reconcile is skipped when the database change token
+        still matches and both lists were saved in full. Returns False if there
+        was no usable snapshot.
+        """
+        snapshot = load_list_snapshot(self._snapshot_path) if self._snapshot_path else None
+        if not snapshot or snapshot.get("db_path") != str(self.data_manager.db_path): return False
+        self._current_tag_filter = snapshot.get("filter_tag") or None
+        self.search_input.blockSignals(True); self.search_input.setText(snapshot.get("search") or ""); self.search_input.blockSignals(False)
+        self._handle_all_tags_loaded(snapshot.get("tags") or []) # Also reselects the filter tag
+        self.notes_model.set_items(snapshot["notes"]); self.snippets_model.set_items(snapshot["snippets"])
+        top_rows = ((self.notes_list, snapshot.get("notes_top_row", 0)), (self.snippets_list, snapshot.get("snippets_top_row", 0)))
+        QTimer.singleShot(0, lambda: [view.scrollTo(view.model().index(row, 0), ItemListView.ScrollHint.PositionAtTop) for view, row in top_rows if 0 < row < view.model().rowCount()])
+        token = self.data_manager.change_token()
+        unchanged = token is not None and token == snapshot.get("change_token")
+        if unchanged and snapshot.get("notes_complete") and snapshot.get("snippets_complete"):
+            logger.debug("List snapshot is current (change token %s); startup reload skipped.", token)
+        else:
+            logger.debug("Reconciling list snapshot (token %s, saved %s).", token, snapshot.get("change_token"))
+            self._reload_all_data(refresh_tags=not unchanged)
+        return True
+
+    def _save_list_snapshot(self):
+        if not self._snapshot_path: return
+        # Only vouch for the lists when no load or write is still in flight; a None token makes the next start reconcile.
+        settled = self._notes_stream is None and self._snippets_stream is None and not self.data_manager.has_pending_tasks()
+        notes = self.notes_model.items(); snippets = self.snippets_model.items()
+        top_row = lambda view: max(0, view.indexAt(QPoint(1, 1)).row())
+        save_list_snapshot(self._snapshot_path, {
+            "db_path": str(self.data_manager.db_path), "change_token": self.data_manager.change_token() if settled else None,
+            "filter_tag": self._current_tag_filter, "search": self.search_input.text(),
+            "tags": [self.tag_list_widget.item(i).text() for i in range(self.tag_list_widget.count())],
+            "notes": [note_summary(note) for note in notes[:SNAPSHOT_ROWS]], "notes_complete": len(notes) <= SNAPSHOT_ROWS, "notes_top_row": top_row(self.notes_list),
+            "snippets": [snippet_summary(snippet) for snippet in snippets[:SNAPSHOT_ROWS]], "snippets_complete": len(snippets) <= SNAPSHOT_ROWS, "snippets_top_row": top_row(self.snippets_list),
+        })
+
     def _trigger_search(self):
         if self._is_closing: return
         self._reload_all_data(refresh_tags=False)
 
     def _refresh_tag_list(self):
         if not self._is_closing:
-             print("Requesting tag list refresh.")
+             logger.debug("Requesting tag list refresh.")
              self.data_manager.load_all_tags_async()
 
     def _handle_all_tags_loaded(self, tags: List[str]):
         if self._is_closing: return
-        print(f"Updating tag list widget with {len(tags)} tags.")
+        logger.debug("Updating tag list widget with %s tags.", len(tags))
         selected_tag_text = self._current_tag_filter
         self.tag_list_widget.blockSignals(True)
         self.tag_list_widget.clear()
@@ -281,7 +417,7 @@ class MainWindow(QMainWindow):
             new_filter = selected_tag
             if new_filter != self._current_tag_filter:
                 self._current_tag_filter = new_filter
-                print(f"Tag filter changed to: {self._current_tag_filter}")
+                logger.debug("Tag filter changed to: %s", self._current_tag_filter)
                 self.clear_tag_filter_btn.setEnabled(True)
                 self._reload_all_data(refresh_tags=False)
             self.tag_list_widget.setCurrentItem(item)
@@ -290,301 +426,385 @@ class MainWindow(QMainWindow):
     # --- REMOVED _on_tag_selection_changed ---
 
     def _clear_tag_filter(self):
-        if not self._current_tag_filter: print("Clear tag filter called, but no filter was active."); return
-        print("Clearing tag filter.")
+        if not self._current_tag_filter: logger.debug("Clear tag filter called, but no filter was active."); return
+        logger.debug("Clearing tag filter.")
         self._current_tag_filter = None
         self.tag_list_widget.blockSignals(True); self.tag_list_widget.clearSelection(); self.tag_list_widget.setCurrentItem(None); self.tag_list_widget.blockSignals(False)
         self.clear_tag_filter_btn.setEnabled(False)
         self._reload_all_data(refresh_tags=False)
 
     def _create_new_note(self):
-        editor = NoteEditor(data_manager=self.data_manager, settings=self.settings)
+        editor = _editor_class('note')(data_manager=self.data_manager, settings=self.settings)
         self._connect_editor_signals(editor)
         idx = self.content_area.addTab(editor, "New Note*")
         self.content_area.setCurrentIndex(idx)
+        return editor
 
     def _create_new_snippet(self):
-        editor = SnippetEditor(data_manager=self.data_manager)
+        editor = _editor_class('snippet')(data_manager=self.data_manager, settings=self.settings)
         self._connect_editor_signals(editor)
         idx = self.content_area.addTab(editor, "New Snippet*")
         self.content_area.setCurrentIndex(idx)
+        return editor
 
     def _open_editor_tab(self, editor_type: str, item_data: Any):
-        if not hasattr(item_data, 'id'): print(f"Error: Item data for {editor_type} lacks an 'id' attribute."); return
-        item_id=item_data.id; editor_class=NoteEditor if editor_type=='note' else SnippetEditor
-        for i in range(self.content_area.count()):
-            widget=self.content_area.widget(i)
-            if isinstance(widget, editor_class) and widget.get_object_id()==item_id:
-                self.content_area.setCurrentIndex(i)
-                return
+        if not hasattr(item_data, 'id'): logger.error("Item data for %s lacks an 'id' attribute.", editor_type); return
+        if self._show_editor_tab(editor_type, item_data.id) is None: QMessageBox.warning(self, "Error", f"Could not load {editor_type} with ID {item_data.id}.")
+
+    def _show_editor_tab(self, editor_type: str, item_id: int) -> Optional[BaseEditor]:
+        """Makes the tab of a stored item current, opening or waking it as needed. None if the item could not be loaded."""
+        open_editor = self._editors.get((editor_type, item_id)) or self._hibernated.get((editor_type, item_id))
+        if open_editor is not None: self.content_area.setCurrentWidget(open_editor); return self._editors.get((editor_type, item_id))
+        editor = self._build_editor(editor_type, item_id)
+        if editor is not None:
+            idx=self.content_area.addTab(editor, editor.object_data.title or f"Untitled {editor_type.capitalize()}")
+            self.content_area.setCurrentIndex(idx)
+        return editor
+
+    def _build_editor(self, editor_type: str, item_id: int) -> Optional[BaseEditor]:
+        """Creates and registers the editor for a stored item, read fresh from the database. None if the item is gone."""
         db_data = None
         if editor_type=='note': db_data = self.data_manager.get_note_sync(item_id)
         elif editor_type=='snippet': db_data = self.data_manager.get_snippet_sync(item_id)
-        if db_data:
-            editor_kwargs={'data_manager': self.data_manager}
-            if editor_type == 'note':
-                 editor_kwargs['note_data'] = db_data
-                 editor_kwargs['settings'] = self.settings
-            else:
-                 editor_kwargs['snippet_data'] = db_data
-            editor=editor_class(**editor_kwargs)
-            self._connect_editor_signals(editor)
-            idx=self.content_area.addTab(editor, db_data.title or f"Untitled {editor_type.capitalize()}")
-            self.content_area.setCurrentIndex(idx)
+        if not db_data: return None
+        editor_kwargs={'data_manager': self.data_manager, 'settings': self.settings}
+        if editor_type == 'note':
+             editor_kwargs['note_data'] = db_data
         else:
-            QMessageBox.warning(self, "Error", f"Could not load {editor_type} with ID {item_id}.")
-
-    def _on_note_selected(self, item: NoteItem):
-        if item and hasattr(item, 'data_object'): self._open_editor_tab('note', item.data_object)
-
-    def _on_snippet_selected(self, item: SnippetItem):
-        if item and hasattr(item, 'data_object'): self._open_editor_tab('snippet', item.data_object)
+             editor_kwargs['snippet_data'] = db_data
+        editor=_editor_class(editor_type)(**editor_kwargs)
+        self._connect_editor_signals(editor)
+        self._editors[(editor_type, item_id)] = editor
+        return editor
+
+    # --- Tab hibernation and session ---
+    def _replace_tab_widget(self, index: int, widget: QWidget):
+        """Swaps the widget shown in tab `index`, keeping its position and title, without a currentChanged round trip."""
+        was_current = self.content_area.currentIndex() == index; title = self.content_area.tabText(index)
+        self.content_area.blockSignals(True)
+        self.content_area.insertTab(index, widget, title); self.content_area.removeTab(index + 1)
+        if was_current: self.content_area.setCurrentIndex(index)
+        self.content_area.blockSignals(False)
+        if was_current: self._current_tab = widget
+
+    def _on_current_tab_changed(self, index: int):
+        if self._current_tab is not None: self._tab_left_at[self._current_tab] = time.monotonic()
+        widget = self.content_area.widget(index); self._current_tab = widget
+        if isinstance(widget, HibernatedTab): self._wake_tab(index)
+
+    def _wake_tab(self, index: int):
+        placeholder = self.content_area.widget(index)
+        editor = self._build_editor(placeholder.editor_type, placeholder.object_id)
+        if editor is None:
+            logger.warning("%s %s of a hibernated tab no longer exists; closing the tab.", placeholder.editor_type.capitalize(), placeholder.object_id)
+            self._remove_editor_tab(index); return
+        self._hibernated.pop((placeholder.editor_type, placeholder.object_id), None)
+        self._replace_tab_widget(index, editor); editor.restore_view_state(placeholder.view_state)
+        placeholder.deleteLater()
+        logger.debug("Woke %s tab %s.", placeholder.editor_type, placeholder.object_id)
+
+    def _hibernate_tab(self, index: int):
+        editor = self.content_area.widget(index)
+        placeholder = HibernatedTab(editor.editor_type, editor.get_object_id(), editor.view_state())
+        self._replace_tab_widget(index, placeholder); self._forget_editor(editor)
+        self._hibernated[(placeholder.editor_type, placeholder.object_id)] = placeholder
+        editor.deleteLater()
+        logger.debug("Hibernated %s tab %s.", placeholder.editor_type, placeholder.object_id)
+
+    def _hibernate_idle_tabs(self):
+        """Releases the editors of saved, unchanged tabs that have not been current for `tab_hibernate_minutes`."""
+        minutes = self.settings.get("tab_hibernate_minutes", 10)
+        if minutes <= 0 or self._is_closing: return
+        cutoff = time.monotonic() - minutes * 60
+        for index in range(self.content_area.count()):
+            editor = self.content_area.widget(index)
+            if not isinstance(editor, BaseEditor) or editor is self._current_tab or editor.is_new or editor in self._editors_awaiting_result: continue
+            if self._tab_left_at.get(editor, cutoff) < cutoff and not editor.is_dirty(): self._hibernate_tab(index)
+
+    def _open_tabs_session(self) -> dict:
+        tabs = []; current = 0
+        for index in range(self.content_area.count()):
+            widget = self.content_area.widget(index)
+            if isinstance(widget, HibernatedTab): entry = widget.session_entry()
+            elif isinstance(widget, BaseEditor) and widget.get_object_id() is not None: entry = {"type": widget.editor_type, "id": widget.get_object_id(), **widget.view_state()}
+            else: continue # New, never saved
+            if index == self.content_area.currentIndex(): current = len(tabs)
+            tabs.append(dict(entry, title=self.content_area.tabText(index).rstrip("*")))
+        return {"tabs": tabs, "current": current}
+
+    def _restore_open_tabs(self):
+        """Reopens the last session's tabs as hibernated tabs; only the current one builds its editor now."""
+        session = self.settings.get("open_tabs")
+        if not isinstance(session, dict) or not session.get("tabs"): return
+        self.content_area.blockSignals(True)
+        for entry in session["tabs"]:
+            try: editor_type = entry["type"]; object_id = int(entry["id"])
+            except (KeyError, TypeError, ValueError): logger.warning("Skipping malformed open tab entry: %s", entry); continue
+            if editor_type not in ('note', 'snippet') or (editor_type, object_id) in self._hibernated: continue
+            placeholder = HibernatedTab(editor_type, object_id, {key: entry[key] for key in ("cursor", "anchor", "scroll") if isinstance(entry.get(key), int)})
+            self._hibernated[(editor_type, object_id)] = placeholder
+            self.content_area.addTab(placeholder, entry.get("title") or f"Untitled {editor_type.capitalize()}")
+        current = session.get("current", 0)
+        self.content_area.setCurrentIndex(current if isinstance(current, int) and 0 <= current < self.content_area.count() else 0)
+        self.content_area.blockSignals(False)
+        logger.debug("Restored %s tabs from the last session.", self.content_area.count())
+        if self.content_area.count(): self._on_current_tab_changed(self.content_area.currentIndex())
+
+    def _on_note_selected(self, index: QModelIndex):
+        note = index.data(ITEM_ROLE) if index.isValid() else None
+        if note: self._open_editor_tab('note', note)
+
+    def _on_snippet_selected(self, index: QModelIndex):
+        snippet = index.data(ITEM_ROLE) if index.isValid() else None
+        if snippet: self._open_editor_tab('snippet', snippet)
 
     def _connect_editor_signals(self, editor):
         editor.saveRequested.connect(self._handle_save_requested)
         editor.deleteRequested.connect(self._handle_delete_requested)
         editor.dirtyChanged.connect(self._handle_dirty_changed)
-        if isinstance(editor, NoteEditor): editor.note_saved.connect(self._update_note_list_item); editor.note_deleted.connect(self._remove_note_list_item_and_tab)
-        elif isinstance(editor, SnippetEditor): editor.snippet_saved.connect(self._update_snippet_list_item); editor.snippet_deleted.connect(self._remove_snippet_list_item_and_tab)
-        connection_type=Qt.ConnectionType.QueuedConnection
-        if isinstance(editor, NoteEditor):
-             self.data_manager.note_added.connect(lambda note, ed=editor: ed.handle_save_success(note) if ed and not ed.isHidden() and not self._is_closing and ed.is_new and note.id is not None else None, connection_type)
-             self.data_manager.note_updated.connect(lambda note, ed=editor: ed.handle_save_success(note) if ed and not ed.isHidden() and not self._is_closing and note.id == ed.get_object_id() else None, connection_type)
-             self.data_manager.note_deleted.connect(lambda note_id, ed=editor: ed.handle_delete_success() if ed and not ed.isHidden() and not self._is_closing and note_id == ed.get_object_id() else None, connection_type)
-             self.data_manager.db_error.connect(lambda task_id, error_msg, ed=editor: ed.handle_db_error(error_msg) if ed and not ed.isHidden() else None, connection_type)
-        elif isinstance(editor, SnippetEditor):
-             self.data_manager.snippet_added.connect(lambda snippet, ed=editor: ed.handle_save_success(snippet) if ed and not ed.isHidden() and not self._is_closing and ed.is_new and snippet.id is not None else None, connection_type)
-             self.data_manager.snippet_updated.connect(lambda snippet, ed=editor: ed.handle_save_success(snippet) if ed and not ed.isHidden() and not self._is_closing and snippet.id == ed.get_object_id() else None, connection_type)
-             self.data_manager.snippet_deleted.connect(lambda snippet_id, ed=editor: ed.handle_delete_success() if ed and not ed.isHidden() and not self._is_closing and snippet_id == ed.get_object_id() else None, connection_type)
-             self.data_manager.db_error.connect(lambda task_id, error_msg, ed=editor: ed.handle_db_error(error_msg) if ed and not ed.isHidden() else None, connection_type)
+        self.autosave.track(editor)
+        if editor.editor_type == 'note': editor.note_saved.connect(self._update_note_list_item); editor.note_deleted.connect(self._remove_note_list_item_and_tab)
+        elif editor.editor_type == 'snippet': editor.snippet_saved.connect(self._update_snippet_list_item); editor.snippet_deleted.connect(self._remove_snippet_list_item_and_tab)
+        # DataManager results reach editors through _dispatch_saved/_dispatch_deleted, looked up by id.
+
+    def _offer_recovery(self):
+        """Offers the edits journaled before a crash; recovered ones reopen as unsaved changes in their tabs."""
+        journal = self.autosave.journal; entries = journal.live_entries()
+        if not entries or self._is_closing: return
+        reply = QMessageBox.question(self, "Recover Unsaved Changes?", f"{len(entries)} item(s) had unsaved changes when the application last closed unexpectedly.\nDo you want to recover them?", QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
+        if reply != QMessageBox.StandardButton.Yes:
+            logger.debug("Discarding %d journaled edits.", len(entries)); journal.clear(); return
+        for entry in entries:
+            editor_type = entry.get("type"); object_id = entry.get("id")
+            if editor_type not in ('note', 'snippet'): journal.resolve(entry["key"]); continue
+            editor = self._show_editor_tab(editor_type, object_id) if isinstance(object_id, int) else None
+            if editor is None: editor = self._create_new_note() if editor_type == 'note' else self._create_new_snippet() # New, or deleted since
+            editor.apply_recovered(entry)
+            if self.autosave.key_for(editor) != entry["key"]: journal.resolve(entry["key"])
+        self.autosave.journal_now()
+        logger.debug("Recovered %d journaled edits.", len(entries))
+
+    # --- Editor index ---
+    def _dispatch_saved(self, editor_type: str, saved_object: Any, is_new: bool):
+        """Hands an add/update result to the editor that asked for it: the oldest new editor for adds, the editor open on that id for updates."""
+        if is_new:
+            pending = self._new_editors_saving[editor_type]
+            editor = pending.pop(0) if pending else None
+        else: editor = self._editors.get((editor_type, saved_object.id))
+        if editor is None: return
+        self._editors_awaiting_result.discard(editor)
+        if saved_object.id is not None: self._editors[(editor_type, saved_object.id)] = editor
+        editor.handle_save_success(saved_object)
+
+    def _dispatch_deleted(self, editor_type: str, object_id: int) -> bool:
+        editor = self._editors.get((editor_type, object_id))
+        if editor is None: return False
+        self._editors_awaiting_result.discard(editor); editor.handle_delete_success()
+        return True
+
+    def _forget_editor(self, editor: QObject):
+        self._tab_left_at.pop(editor, None)
+        if isinstance(editor, BaseEditor): self.autosave.forget(editor)
+        if editor is self._current_tab: self._current_tab = None
+        if isinstance(editor, HibernatedTab):
+            key = (editor.editor_type, editor.object_id)
+            if self._hibernated.get(key) is editor: del self._hibernated[key]
+            return
+        if not isinstance(editor, BaseEditor): return
+        key = (editor.editor_type, editor.get_object_id())
+        if self._editors.get(key) is editor: del self._editors[key]
+        pending = self._new_editors_saving.get(editor.editor_type, [])
+        for i, waiting in enumerate(pending): # Keep the slot so later add results still match their editors
+            if waiting is editor: pending[i] = None
+        self._editors_awaiting_result.discard(editor)
+
+    def _remove_editor_tab(self, index: int):
+        widget = self.content_area.widget(index)
+        self._forget_editor(widget); self.content_area.removeTab(index)
+        if widget is not None: widget.deleteLater()
 
     # --- Handlers - Corrected Indentation ---
     def _handle_all_notes_loaded(self, notes: list[Note]):
         if self._is_closing: return
-        print(f"Notes loaded (Filter: {self._current_tag_filter}). Updating list.")
-        self.notes_list.clear()
-        for note in notes:
-            item = NoteItem(note)
-            self.notes_list.addItem(item)
-            # Corrected Indentation
-            if hasattr(item, 'widget') and item.widget:
-                self.notes_list.setItemWidget(item, item.widget)
+        logger.debug("Notes loaded (Filter: %s). Updating list.", self._current_tag_filter)
+        self._notes_stream = None; self.notes_model.apply_items(notes)
 
     def _handle_note_added(self, note: Note):
         if self._is_closing: return
-        print(f"Note added: ID={note.id}.")
+        logger.debug("Note added: ID=%s.", note.id)
         # Update list only if it matches current filter
         if self._current_tag_filter is None or self._current_tag_filter in (note.tags or "").split(','):
              self._update_note_list_item(note)
+        self._dispatch_saved('note', note, is_new=True)
         # Refresh tags via signal tags_updated handled in connect_signals
 
     def _handle_note_updated(self, note: Note):
         if self._is_closing: return
-        print(f"Note updated: ID={note.id}.")
+        logger.debug("Note updated: ID=%s.", note.id)
         # Check if the updated note *still* matches the filter
         matches_filter = self._current_tag_filter is None or self._current_tag_filter in (note.tags or "").split(',')
-        existing_item = self._find_list_item(self.notes_list, NoteItem, note.id)
         if matches_filter:
             self._update_note_list_item(note) # Update or add if it matches now
-        elif existing_item:
+        elif self.notes_model.remove_id(note.id):
             # If it existed but no longer matches, remove it
-            row = self.notes_list.row(existing_item)
-            self.notes_list.takeItem(row)
-            print(f"Removed note {note.id} from list because it no longer matches filter '{self._current_tag_filter}'.")
+            logger.debug("Removed note %s from list because it no longer matches filter '%s'.", note.id, self._current_tag_filter)
+        self._dispatch_saved('note', note, is_new=False)
         # Refresh tags via signal tags_updated handled in connect_signals
 
     def _handle_note_deleted(self, note_id: int):
         if self._is_closing: return
-        print(f"Note deleted: ID={note_id}.")
-        self._remove_note_list_item_and_tab(note_id)
+        logger.debug("Note deleted: ID=%s.", note_id)
+        if not self._dispatch_deleted('note', note_id): self._remove_note_list_item_and_tab(note_id) # The editor's note_deleted signal removes both otherwise
         # Refresh tags via signal tags_updated handled in connect_signals
 
     def _handle_all_snippets_loaded(self, snippets: list[Snippet]):
         if self._is_closing: return
-        print(f"Snippets loaded (Filter: {self._current_tag_filter}). Updating list.")
-        self.snippets_list.clear()
-        for snippet in snippets:
-            item = SnippetItem(snippet)
-            self.snippets_list.addItem(item)
-            # Corrected Indentation
-            if hasattr(item, 'widget') and item.widget:
-                self.snippets_list.setItemWidget(item, item.widget)
+        logger.debug("Snippets loaded (Filter: %s). Updating list.", self._current_tag_filter)
+        self._snippets_stream = None; self.snippets_model.apply_items(snippets)
 
     def _handle_snippet_added(self, snippet: Snippet):
         if self._is_closing: return
-        print(f"Snippet added: ID={snippet.id}.")
+        logger.debug("Snippet added: ID=%s.", snippet.id)
         if self._current_tag_filter is None or self._current_tag_filter in (snippet.tags or "").split(','):
             self._update_snippet_list_item(snippet)
+        self._dispatch_saved('snippet', snippet, is_new=True)
         # Refresh tags via signal tags_updated handled in connect_signals
 
     def _handle_snippet_updated(self, snippet: Snippet):
         if self._is_closing: return
-        print(f"Snippet updated: ID={snippet.id}.")
+        logger.debug("Snippet updated: ID=%s.", snippet.id)
         matches_filter = self._current_tag_filter is None or self._current_tag_filter in (snippet.tags or "").split(',')
-        existing_item = self._find_list_item(self.snippets_list, SnippetItem, snippet.id)
         if matches_filter:
             self._update_snippet_list_item(snippet)
-        elif existing_item:
-             row = self.snippets_list.row(existing_item)
-             self.snippets_list.takeItem(row)
-             print(f"Removed snippet {snippet.id} from list because it no longer matches filter '{self._current_tag_filter}'.")
+        elif self.snippets_model.remove_id(snippet.id):
+             logger.debug("Removed snippet %s from list because it no longer matches filter '%s'.", snippet.id, self._current_tag_filter)
+        self._dispatch_saved('snippet', snippet, is_new=False)
         # Refresh tags via signal tags_updated handled in connect_signals
 
     def _handle_snippet_deleted(self, snippet_id: int):
         if self._is_closing: return
-        print(f"Snippet deleted: ID={snippet_id}.")
-        self._remove_snippet_list_item_and_tab(snippet_id)
+        logger.debug("Snippet deleted: ID=%s.", snippet_id)
+        if not self._dispatch_deleted('snippet', snippet_id): self._remove_snippet_list_item_and_tab(snippet_id)
         # Refresh tags via signal tags_updated handled in connect_signals
 
     def _handle_note_searched(self, notes: list[Note]):
         if self._is_closing: return
-        print(f"Note search results (Filter: {self._current_tag_filter}).")
-        self.notes_list.clear()
-        for note in notes:
-            item = NoteItem(note)
-            self.notes_list.addItem(item)
-            # Corrected Indentation
-            if hasattr(item, 'widget') and item.widget:
-                self.notes_list.setItemWidget(item, item.widget)
+        logger.debug("Note search results (Filter: %s).", self._current_tag_filter)
+        self._notes_stream = None; self.notes_model.apply_items(notes)
 
     def _handle_snippet_searched(self, snippets: list[Snippet]):
         if self._is_closing: return
-        print(f"Snippet search results (Filter: {self._current_tag_filter}).")
-        self.snippets_list.clear()
-        for snippet in snippets:
-            item = SnippetItem(snippet)
-            self.snippets_list.addItem(item)
-            # Corrected Indentation
-            if hasattr(item, 'widget') and item.widget:
-                self.snippets_list.setItemWidget(item, item.widget)
+        logger.debug("Snippet search results (Filter: %s).", self._current_tag_filter)
+        self._snippets_stream = None; self.snippets_model.apply_items(snippets)
+
+    def _handle_notes_chunk(self, stream_id: int, notes: list[Note], is_last: bool):
+        if self._is_closing or stream_id != self._notes_stream: return # Chunk of a superseded stream
+        self.notes_model.add_stream_chunk(notes)
+        if is_last: self.notes_model.end_stream(); self._notes_stream = None; logger.debug("Notes stream %s complete (%s rows).", stream_id, self.notes_model.rowCount())
+
+    def _handle_snippets_chunk(self, stream_id: int, snippets: list[Snippet], is_last: bool):
+        if self._is_closing or stream_id != self._snippets_stream: return
+        self.snippets_model.add_stream_chunk(snippets)
+        if is_last: self.snippets_model.end_stream(); self._snippets_stream = None; logger.debug("Snippets stream %s complete (%s rows).", stream_id, self.snippets_model.rowCount())
 
     def _handle_db_error(self, task_id: str, error_message: str):
-        print(f"DB Error (Task '{task_id}'): {error_message}")
+        logger.error("DB Error (Task '%s'): %s", task_id, error_message)
+        action, _, rest = task_id.partition("_"); editor_type = rest.split("_", 1)[0]
+        if action in ("add", "update", "delete") and editor_type in self._new_editors_saving:
+            if action == "add": pending = self._new_editors_saving[editor_type]; failed = [pending.pop(0)] if pending else []
+            else: failed = [editor for editor in self._editors_awaiting_result if editor.editor_type == editor_type]
+            for editor in failed:
+                if editor is None: continue
+                self._editors_awaiting_result.discard(editor); editor.handle_db_error(error_message)
+        if task_id.startswith("backup"): self.backup_now_btn.setEnabled(True); self.backup_status_label.setText("")
         if hasattr(self, 'db_error_label') and self.db_error_label:
             self.db_error_label.setText(f"DB Error: {error_message[:100]}...")
             QTimer.singleShot(7000, lambda: self.db_error_label.setText("") if self.db_error_label else None)
 
     def _handle_save_requested(self, editor: QObject, save_data: dict):
-        print(f"Save requested from editor (ID: {save_data.get('id', 'New')}). Type: {save_data.get('editor_type')}")
+        logger.debug("Save requested from editor (ID: %s). Type: %s", save_data.get('id', 'New'), save_data.get('editor_type'))
         editor_type=save_data.get('editor_type'); obj_id=save_data.get('id'); title=save_data.get('title'); tags=save_data.get('tags'); specific_data=save_data.get('specific_data'); is_new=save_data.get('is_new')
+        if is_new: self._new_editors_saving.setdefault(editor_type, []).append(editor)
+        self._editors_awaiting_result.add(editor)
         if editor_type=='note': note=Note(id=obj_id, title=title, tags=tags, content=specific_data); (self.data_manager.add_note_async if is_new else self.data_manager.update_note_async)(note)
         elif editor_type=='snippet': code, language = specific_data; snippet=Snippet(id=obj_id, title=title, tags=tags, code=code, language=language); (self.data_manager.add_snippet_async if is_new else self.data_manager.update_snippet_async)(snippet)
 
     def _handle_delete_requested(self, editor: QObject, object_id: int):
-        print(f"Delete requested from editor for ID: {object_id}.")
+        logger.debug("Delete requested from editor for ID: %s.", object_id)
         if hasattr(editor, 'editor_type'):
+            self._editors_awaiting_result.add(editor)
             if editor.editor_type=='note': self.data_manager.delete_note_async(object_id)
             elif editor.editor_type=='snippet': self.data_manager.delete_snippet_async(object_id)
-        else: print(f"Error: Cannot determine editor type for delete request.")
+        else: logger.error("Cannot determine editor type for delete request.")
 
     def _handle_dirty_changed(self, is_dirty: bool):
         editor=self.sender(); index=self.content_area.indexOf(editor)
         if index == -1: return
         current_text=self.content_area.tabText(index)
-        base_title="New Note" if isinstance(editor,NoteEditor) and editor.is_new else "New Snippet" if isinstance(editor,SnippetEditor) and editor.is_new else getattr(editor.object_data, 'title', '') if editor.object_data else current_text.rstrip("*")
+        base_title="New Note" if editor.editor_type=='note' and editor.is_new else "New Snippet" if editor.editor_type=='snippet' and editor.is_new else getattr(editor.object_data, 'title', '') if editor.object_data else current_text.rstrip("*")
         clean_text=base_title or (f"Untitled {editor.editor_type.capitalize()}" if editor.is_new else "Untitled")
         if is_dirty:
             if not current_text.endswith("*"): self.content_area.setTabText(index, clean_text + "*")
         else: new_title = getattr(editor.object_data, 'title', clean_text) if editor.object_data else clean_text; self.content_area.setTabText(index, new_title)
 
-    def _find_list_item(self, list_widget: QListWidget, item_class: type, item_id: int) -> Optional[QListWidgetItem]:
-        for i in range(list_widget.count()):
-            item = list_widget.item(i)
-            if isinstance(item, item_class) and hasattr(item, 'data_object') and getattr(item.data_object, 'id', None) == item_id:
-                return item
-        return None
-
     def _update_note_list_item(self, note: Note):
         if self._is_closing: return
-        item_to_update = self._find_list_item(self.notes_list, NoteItem, note.id)
-        row = -1
-        if item_to_update:
-             row = self.notes_list.row(item_to_update)
-             self.notes_list.setItemWidget(item_to_update, None)
-             self.notes_list.takeItem(row)
-        new_item = NoteItem(note)
-        self.notes_list.insertItem(0, new_item)
-        # Corrected Indentation
-        if hasattr(new_item, 'widget') and new_item.widget:
-             self.notes_list.setItemWidget(new_item, new_item.widget)
+        self.notes_model.put_first(note)
 
     def _remove_note_list_item_and_tab(self, note_id: int):
         if self._is_closing: return
-        item_to_remove = self._find_list_item(self.notes_list, NoteItem, note_id)
-        if item_to_remove:
-            row = self.notes_list.row(item_to_remove)
-            self.notes_list.setItemWidget(item_to_remove, None)
-            self.notes_list.takeItem(row)
-            print(f"Removed note {note_id} from list.")
-        for i in range(self.content_area.count()):
-            widget = self.content_area.widget(i)
-            if isinstance(widget, NoteEditor) and widget.get_object_id() == note_id:
-                self.content_area.removeTab(i)
-                break
+        if self.notes_model.remove_id(note_id):
+            logger.debug("Removed note %s from list.", note_id)
+        editor = self._editors.get(('note', note_id)) or self._hibernated.get(('note', note_id))
+        if editor is not None: self._remove_editor_tab(self.content_area.indexOf(editor))
 
     def _update_snippet_list_item(self, snippet: Snippet):
         if self._is_closing: return
-        item_to_update = self._find_list_item(self.snippets_list, SnippetItem, snippet.id)
-        row = -1
-        if item_to_update:
-            row = self.snippets_list.row(item_to_update)
-            self.snippets_list.setItemWidget(item_to_update, None)
-            self.snippets_list.takeItem(row)
-        new_item = SnippetItem(snippet)
-        self.snippets_list.insertItem(0, new_item)
-        # Corrected Indentation
-        if hasattr(new_item, 'widget') and new_item.widget:
-            self.snippets_list.setItemWidget(new_item, new_item.widget)
+        self.snippets_model.put_first(snippet)
 
     def _remove_snippet_list_item_and_tab(self, snippet_id: int):
         if self._is_closing: return
-        item_to_remove = self._find_list_item(self.snippets_list, SnippetItem, snippet_id)
-        if item_to_remove:
-            row = self.snippets_list.row(item_to_remove)
-            self.snippets_list.setItemWidget(item_to_remove, None)
-            self.snippets_list.takeItem(row)
-            print(f"Removed snippet {snippet_id} from list.")
-        for i in range(self.content_area.count()):
-            widget = self.content_area.widget(i)
-            if isinstance(widget, SnippetEditor) and widget.get_object_id() == snippet_id:
-                self.content_area.removeTab(i)
-                break
+        if self.snippets_model.remove_id(snippet_id):
+            logger.debug("Removed snippet %s from list.", snippet_id)
+        editor = self._editors.get(('snippet', snippet_id)) or self._hibernated.get(('snippet', snippet_id))
+        if editor is not None: self._remove_editor_tab(self.content_area.indexOf(editor))
 
     def _close_tab_request(self, index):
         widget = self.content_area.widget(index)
-        if not isinstance(widget, (NoteEditor, SnippetEditor)):
-            print(f"Attempting to close non-editor tab at index {index}.")
-            self.content_area.removeTab(index)
+        if not isinstance(widget, BaseEditor):
+            logger.debug("Attempting to close non-editor tab at index %s.", index)
+            self._remove_editor_tab(index)
             return
         if widget.is_dirty():
             tab_text = self.content_area.tabText(index).rstrip("*")
             reply = QMessageBox.question(self, "Save Changes?",f"'{tab_text}' has unsaved changes.\nDo you want to save them?", QMessageBox.StandardButton.Save | QMessageBox.StandardButton.Discard | QMessageBox.StandardButton.Cancel)
             if reply == QMessageBox.StandardButton.Save:
                 widget.save_changes()
-                self.content_area.removeTab(index)
+                self._remove_editor_tab(index)
             elif reply == QMessageBox.StandardButton.Discard:
-                self.content_area.removeTab(index)
+                self._remove_editor_tab(index)
         else:
-            self.content_area.removeTab(index)
+            self._remove_editor_tab(index)
 
     def closeEvent(self, event):
-        print("Main window close event triggered.")
+        logger.debug("Main window close event triggered.")
         dirty_tabs_indices=[]
         for i in reversed(range(self.content_area.count())):
             widget=self.content_area.widget(i)
-            if isinstance(widget, (NoteEditor, SnippetEditor)) and widget.is_dirty():
+            if isinstance(widget, BaseEditor) and widget.is_dirty():
                 dirty_tabs_indices.append(i)
         if not dirty_tabs_indices:
-            print("No dirty editor tabs found. Setting closing flag and accepting event.")
+            logger.debug("No dirty editor tabs found. Setting closing flag and accepting event.")
+            self._save_list_snapshot(); self.settings["open_tabs"] = self._open_tabs_session(); self.autosave.shutdown()
             self._is_closing = True
             event.accept()
             return
-        print(f"Found dirty editor tabs at indices: {dirty_tabs_indices}. Prompting user...")
+        logger.debug("Found dirty editor tabs at indices: %s. Prompting user...", dirty_tabs_indices)
         for index in dirty_tabs_indices:
             if index >= self.content_area.count():
                 continue
             widget = self.content_area.widget(index)
-            if not isinstance(widget, (NoteEditor, SnippetEditor)) or not widget.is_dirty():
+            if not isinstance(widget, BaseEditor) or not widget.is_dirty():
                 continue
             self.content_area.setCurrentIndex(index)
             tab_text=self.content_area.tabText(index).rstrip("*")
@@ -592,15 +812,16 @@ class MainWindow(QMainWindow):
                                          f"'{tab_text}' has unsaved changes.\nDo you want to save them?",
                                          QMessageBox.StandardButton.Save | QMessageBox.StandardButton.Discard | QMessageBox.StandardButton.Cancel)
             if reply == QMessageBox.StandardButton.Save:
-                print(f"User chose SAVE for tab {index} during window close.")
+                logger.debug("User chose SAVE for tab %s during window close.", index)
                 widget.save_changes()
             elif reply == QMessageBox.StandardButton.Discard:
-                print(f"User chose DISCARD for tab {index} during window close.")
+                logger.debug("User chose DISCARD for tab %s during window close.", index)
             else: # Cancel
-                print(f"User chose CANCEL for tab {index} during window close. Aborting window close.")
+                logger.debug("User chose CANCEL for tab %s during window close. Aborting window close.", index)
                 event.ignore()
                 return
-        print("All dirty editor tabs handled. Setting closing flag and accepting event.")
+        logger.debug("All dirty editor tabs handled. Setting closing flag and accepting event.")
+        self._save_list_snapshot(); self.settings["open_tabs"] = self._open_tabs_session(); self.autosave.shutdown()
         self._is_closing = True
         event.accept()
 
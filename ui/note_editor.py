@@ -5,22 +5,102 @@
 from PyQt6.QtWidgets import (
     QVBoxLayout, QTextEdit, QHBoxLayout, QToolBar, QComboBox, QFontComboBox,
     QSpinBox, QColorDialog, QApplication, QStyle, QWidgetAction,
-    QDialog, QLineEdit, QDialogButtonBox, QFormLayout, QMessageBox
+    QDialog, QLineEdit, QDialogButtonBox, QFormLayout, QMessageBox,
+    QWidget, QLabel, QPushButton, QPlainTextEdit
 )
 from PyQt6.QtGui import (
     QAction, QIcon, QTextCharFormat, QFont, QKeySequence, QDesktopServices, QTextCursor,
-    QMouseEvent, QColor, QTextFormat, QPalette
+    QMouseEvent, QColor, QPalette, QTextDocument, QTextDocumentFragment, QImage
 )
-from PyQt6.QtCore import Qt, pyqtSignal, QObject, QUrl, QSize
+from PyQt6.QtCore import Qt, pyqtSignal, QObject, QUrl, QSize, QTimer, QByteArray, QBuffer, QIODevice, QMimeData
 from ui.base_editor import BaseEditor, get_icon
 from database.models import Note
+from database.attachments import ATTACHMENT_SCHEME, attachment_url, extract_inline_images
 from database.data_manager import DataManager
-from typing import Optional, List, Tuple, Dict
+from utils.image_cache import image_cache
+from utils.note_format import LINK_URL_PROPERTY, compact_note_html
+from typing import Optional, List, Set, Tuple, Dict
 from pathlib import Path
+import logging
 import re
 import html
+import time
 
-LINK_URL_PROPERTY = QTextFormat.Property.UserProperty + 1
+logger = logging.getLogger(__name__)
+
+NOTE_BACKGROUND_LOAD_CHARS = 100_000 # Stored HTML at least this long is loaded in slices instead of one setHtml()
+NOTE_PREVIEW_CHARS = 2_000_000 # Default for "note_preview_min_chars": notes this long open as a read-only text preview first
+NOTE_LOAD_SLICE_SECONDS = 0.008 # Work done per event-loop turn while loading
+NOTE_LOAD_PIECE_CHARS = 16_000 # Rough size of the HTML pieces imported one at a time
+
+_PREVIEW_DROP = re.compile(r"<(head|style|script)\b.*?</\1\s*>", re.S | re.I)
+_PREVIEW_BREAK = re.compile(r"<(?:br|/p|/div|/h[1-6]|/li|/tr|/blockquote|/pre)\b[^>]*>", re.I)
+_PREVIEW_TAG = re.compile(r"<[^>]*>")
+_BODY_START = re.compile(r"<body\b[^>]*>", re.I)
+_CONTAINER_TAG = re.compile(r"<(/?)(?:table|ul|ol|dl|pre|div|blockquote)\b", re.I)
+_TOP_LEVEL_BREAK = re.compile(r"\n<")
+# Leads every piece after the first: its empty block merges into the last block already imported, so the
+# piece's real first block keeps its own format. Qt writes empty paragraphs exactly like this.
+_MERGE_GUARD = '<p style="-qt-paragraph-type:empty;"><br /></p>'
+
+def html_preview_text(html_content: str) -> str:
+    """Plain text of stored note HTML, one line per paragraph. Much faster than parsing it into a QTextDocument."""
+    text = _PREVIEW_TAG.sub("", _PREVIEW_BREAK.sub("\n", _PREVIEW_DROP.sub("", html_content)))
+    return re.sub(r"\n\s*\n\s*", "\n\n", html.unescape(text)).strip()
+
+def split_note_html(html_content: str, piece_chars: int = NOTE_LOAD_PIECE_CHARS) -> Tuple[str, List[str]]:
+    """
+    Splits stored HTML into its head (up to and including <body>) and body
+    pieces of about `piece_chars`, cut only before top-level elements, so
+    the pieces can be imported one after another.
+    """
+    match = _BODY_START.search(html_content)
+    head = html_content[:match.end()] if match else ""
+    end = html_content.lower().rfind("</body>")
+    body = html_content[len(head):end if end >= len(head) else len(html_content)]
+    containers = [(m.start(), m.group(1) == "/") for m in _CONTAINER_TAG.finditer(body)]
+    cuts = [0]; depth = 0; next_container = 0
+    for m in _TOP_LEVEL_BREAK.finditer(body):
+        while next_container < len(containers) and containers[next_container][0] < m.start():
+            depth += -1 if containers[next_container][1] else 1; next_container += 1
+        if depth <= 0 and m.start() - cuts[-1] >= piece_chars: cuts.append(m.start())
+    cuts.append(len(body))
+    return head, [body[start:stop] for start, stop in zip(cuts, cuts[1:])]
+
+class ProgressiveNoteLoader(QObject):
+    """
+    Builds a note body from stored HTML a few pieces per event-loop turn:
+    either a detached QTextDocument, emitted through `document_ready` once
+    complete, or (with `preview`) plain text, emitted piece by piece.
+    """
+    progressed = pyqtSignal(int) # Percent of the HTML processed
+    preview_text = pyqtSignal(str)
+    document_ready = pyqtSignal(object)
+
+    def __init__(self, html_content: str, preview: bool, parent: QObject = None):
+        super().__init__(parent)
+        self.preview = preview; self.total = max(1, len(html_content)); self.done = 0
+        self.head, self.pieces = split_note_html(html_content); self.tail = "</body></html>" if self.head else ""
+        self.document: Optional[QTextDocument] = None
+        self._timer = QTimer(self); self._timer.setSingleShot(True); self._timer.timeout.connect(self._slice)
+
+    def start(self): self._timer.start(0)
+    def cancel(self): self._timer.stop(); self.pieces = []
+
+    def _slice(self):
+        deadline = time.perf_counter() + NOTE_LOAD_SLICE_SECONDS; texts = []
+        while self.pieces and time.perf_counter() < deadline:
+            piece = self.pieces.pop(0); self.done += len(piece)
+            if self.preview: texts.append(html_preview_text(piece))
+            elif self.document is None:
+                self.document = QTextDocument(); self.document.setUndoRedoEnabled(False); self.document.setHtml(self.head + piece + self.tail)
+            else:
+                cursor = QTextCursor(self.document); cursor.movePosition(QTextCursor.MoveOperation.End); cursor.insertHtml(self.head + _MERGE_GUARD + piece + self.tail)
+        if texts: self.preview_text.emit("\n\n".join(text for text in texts if text))
+        if self.pieces: self.progressed.emit(min(99, 100 * self.done // self.total)); self._timer.start(0); return
+        if not self.preview:
+            if self.document is None: self.document = QTextDocument()
+            self.document.setUndoRedoEnabled(True); self.document_ready.emit(self.document)
 
 class InsertLinkDialog(QDialog):
     # ... (InsertLinkDialog definition remains the same) ...
@@ -45,15 +125,63 @@ class InsertLinkDialog(QDialog):
         return None
 
 
+def _link_url(char_format: QTextCharFormat) -> Optional[str]:
+    """URL of a link made with apply_link_format() or read back from stored <a href>; None outside links."""
+    url = char_format.property(LINK_URL_PROPERTY)
+    if url: return str(url)
+    return (char_format.anchorHref() or None) if char_format.isAnchor() else None
+
+_OBJECT_CHAR = "\ufffc" # Stands in for an image in the document text
+_placeholder: Optional[QImage] = None
+
+def _image_placeholder() -> QImage:
+    global _placeholder
+    if _placeholder is None: _placeholder = QImage(16, 16, QImage.Format.Format_ARGB32_Premultiplied); _placeholder.fill(Qt.GlobalColor.transparent)
+    return _placeholder
+
 class ClickableTextEdit(QTextEdit):
     # ... (Other methods remain the same) ...
-    def __init__(self, parent=None): super().__init__(parent); self.setAcceptRichText(True)
+    def __init__(self, parent=None):
+        super().__init__(parent); self.setAcceptRichText(True); self.attachment_store: Optional[DataManager] = None # Set by NoteEditor
+        self._awaited_images: Set[str] = set(); image_cache().image_ready.connect(self._on_image_ready)
+    def loadResource(self, resource_type: int, name: QUrl):
+        """Attachment images come from the shared image cache; a missing one is decoded in the background while a placeholder is shown."""
+        if name.scheme() == ATTACHMENT_SCHEME and self.attachment_store is not None:
+            digest = name.path(); cache = image_cache(); image = cache.get(digest)
+            if image is not None: return image
+            if cache.request(digest, self.attachment_store.get_attachment_sync): self._awaited_images.add(digest); return _image_placeholder()
+            logger.warning("Attachment %s referenced by the note could not be loaded.", digest)
+        return super().loadResource(resource_type, name)
+    def _on_image_ready(self, digest: str):
+        if digest not in self._awaited_images: return
+        self._awaited_images.discard(digest); url = attachment_url(digest); document = self.document()
+        document.addResource(QTextDocument.ResourceType.ImageResource.value, QUrl(url), image_cache().get(digest))
+        cursor = document.find(_OBJECT_CHAR) # Lay out again only the image characters showing it
+        while not cursor.isNull():
+            char_format = cursor.charFormat()
+            if char_format.isImageFormat() and char_format.toImageFormat().name() == url: document.markContentsDirty(cursor.selectionStart(), 1)
+            cursor = document.find(_OBJECT_CHAR, cursor)
+    def canInsertFromMimeData(self, source: QMimeData) -> bool:
+        return (source.hasImage() and self.attachment_store is not None) or super().canInsertFromMimeData(source)
+    def insertFromMimeData(self, source: QMimeData):
+        """Pasted images are stored as attachments straight away and inserted as references instead of inline base64."""
+        if self.attachment_store is not None and source.hasHtml() and ";base64," in source.html():
+            html_content, images = extract_inline_images(source.html())
+            if images and all(self.attachment_store.add_attachment_sync(data, mime) for mime, data in images.values()):
+                self.textCursor().insertFragment(QTextDocumentFragment.fromHtml(html_content, self.document())); self.ensureCursorVisible(); return
+        elif self.attachment_store is not None and source.hasImage() and not source.hasHtml():
+            image = source.imageData(); data = QByteArray(); buffer = QBuffer(data); buffer.open(QIODevice.OpenModeFlag.WriteOnly)
+            if isinstance(image, QImage) and not image.isNull() and image.save(buffer, "PNG"):
+                digest = self.attachment_store.add_attachment_sync(bytes(data), "image/png")
+                if digest:
+                    url = attachment_url(digest); self.document().addResource(QTextDocument.ResourceType.ImageResource.value, QUrl(url), image_cache().put(digest, image))
+                    self.textCursor().insertImage(url); self.ensureCursorVisible(); return
+        super().insertFromMimeData(source)
     def get_link_property_at_cursor(self, cursor: QTextCursor) -> Optional[str]:
-        char_format = cursor.charFormat(); url_variant = char_format.property(LINK_URL_PROPERTY)
-        if url_variant is not None: return str(url_variant)
-        cursor.movePosition(QTextCursor.MoveOperation.Left, QTextCursor.MoveMode.MoveAnchor, 1); char_format_before = cursor.charFormat(); url_variant_before = char_format_before.property(LINK_URL_PROPERTY)
-        if url_variant_before is not None: return str(url_variant_before)
-        return None
+        url = _link_url(cursor.charFormat())
+        if url is not None: return url
+        cursor.movePosition(QTextCursor.MoveOperation.Left, QTextCursor.MoveMode.MoveAnchor, 1)
+        return _link_url(cursor.charFormat())
     def mousePressEvent(self, event: QMouseEvent):
         cursor = self.cursorForPosition(event.pos()); url_str = self.get_link_property_at_cursor(cursor)
         if url_str: self.viewport().setCursor(Qt.CursorShape.PointingHandCursor)
@@ -71,25 +199,25 @@ class ClickableTextEdit(QTextEdit):
             if not url_str:
                  anchor = self.anchorAt(event.pos())
                  if anchor:
-                     print(f"    Found anchor via anchorAt(): {anchor}")
+                     logger.debug("    Found anchor via anchorAt(): %s", anchor)
                      if "://" in anchor or "@" in anchor or anchor.startswith("www.") or anchor.startswith("mailto:"): url_str = anchor
-                     else: print(f"    Anchor '{anchor}' seems invalid or unsupported.")
-                 else: print("--- ClickableTextEdit: No link property or anchor found at release position ---")
+                     else: logger.warning("    Anchor '%s' seems invalid or unsupported.", anchor)
+                 else: logger.debug("--- ClickableTextEdit: No link property or anchor found at release position ---")
             if url_str:
-                print(f"--- ClickableTextEdit: Trying to open link: {url_str} ---"); final_url = QUrl.fromUserInput(url_str)
+                logger.debug("--- ClickableTextEdit: Trying to open link: %s ---", url_str); final_url = QUrl.fromUserInput(url_str)
                 if not final_url.scheme():
                     href_string = final_url.toString(QUrl.UrlFormattingOption.RemoveScheme | QUrl.UrlFormattingOption.RemoveUserInfo | QUrl.UrlFormattingOption.RemovePort | QUrl.UrlFormattingOption.RemoveQuery | QUrl.UrlFormattingOption.RemoveFragment).strip('/'); email_regex = r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$"
-                    print(f"    Re-Checking string from href (no scheme): '{href_string}'")
+                    logger.debug("    Re-Checking string from href (no scheme): '%s'", href_string)
                     if re.match(email_regex, href_string): final_url = QUrl(f"mailto:{href_string}")
                     elif href_string.startswith("www.") or "." in href_string:
                          if "://" not in href_string: final_url = QUrl(f"https://{href_string}")
-                    else: print(f"    Still cannot determine type for link without scheme: {href_string}"); return
-                is_valid = final_url.isValid(); print(f"    Final URL check: {final_url.toString()}, Scheme: {final_url.scheme() or 'None'}, Valid: {is_valid}")
+                    else: logger.warning("    Still cannot determine type for link without scheme: %s", href_string); return
+                is_valid = final_url.isValid(); logger.debug("    Final URL check: %s, Scheme: %s, Valid: %s", final_url.toString(), final_url.scheme() or 'None', is_valid)
                 if is_valid:
-                    print(f"    Attempting to open valid URL with QDesktopServices...")
-                    if not QDesktopServices.openUrl(final_url): print(f"    !!! Failed to open URL via QDesktopServices: {final_url.toString()}")
-                    else: print(f"    QDesktopServices.openUrl call succeeded.")
-                else: print(f"    !!! Final URL is invalid, not attempting to open.")
+                    logger.debug("    Attempting to open valid URL with QDesktopServices...")
+                    if not QDesktopServices.openUrl(final_url): logger.error("    !!! Failed to open URL via QDesktopServices: %s", final_url.toString())
+                    else: logger.debug("    QDesktopServices.openUrl call succeeded.")
+                else: logger.error("    !!! Final URL is invalid, not attempting to open.")
                 event.accept(); return
         super().mouseReleaseEvent(event)
 
@@ -108,7 +236,7 @@ class ClickableTextEdit(QTextEdit):
                   qurl_check = QUrl.fromUserInput(valid_url_str)
 
          if not qurl_check.isValid():
-             print(f"Warning: Cannot apply invalid link URL: {url_str} (Validated as: {valid_url_str})")
+             logger.warning("Cannot apply invalid link URL: %s (Validated as: %s)", url_str, valid_url_str)
              # Correct Indent
              if not cursor.hasSelection():
                  cursor.insertText(text)
@@ -119,7 +247,7 @@ class ClickableTextEdit(QTextEdit):
          link_format = QTextCharFormat()
          link_format.setForeground(QApplication.palette().color(QPalette.ColorRole.Link))
          link_format.setFontUnderline(True)
-         link_format.setProperty(LINK_URL_PROPERTY, valid_url_str)
+         link_format.setProperty(LINK_URL_PROPERTY, valid_url_str); link_format.setAnchor(True); link_format.setAnchorHref(valid_url_str)
          link_format.setToolTip(f"Link: {valid_url_str}")
 
          # Correct Indent
@@ -143,14 +271,14 @@ class ClickableTextEdit(QTextEdit):
                  cursor.select(QTextCursor.SelectionType.WordUnderCursor)
                  if self.get_link_property_at_cursor(cursor) != url_prop:
                      cursor.clearSelection()
-                     print("Remove Link: Word under cursor doesn't match link property.")
+                     logger.debug("Remove Link: Word under cursor doesn't match link property.")
                      return
              else:
-                 print("Remove Link: No text selected.")
+                 logger.debug("Remove Link: No text selected.")
                  return
-        neutral_format = QTextCharFormat(); neutral_format.setForeground(QApplication.palette().color(QPalette.ColorRole.WindowText)); neutral_format.setFontUnderline(False); neutral_format.clearProperty(LINK_URL_PROPERTY); neutral_format.setToolTip("")
+        neutral_format = QTextCharFormat(); neutral_format.setForeground(QApplication.palette().color(QPalette.ColorRole.WindowText)); neutral_format.setFontUnderline(False); neutral_format.setProperty(LINK_URL_PROPERTY, ""); neutral_format.setAnchor(False); neutral_format.setAnchorHref(""); neutral_format.setToolTip("") # Merging cannot drop properties, so they are blanked
         cursor.mergeCharFormat(neutral_format) # Use merge to remove link specific, keep others
-        print(f"Removed link format from selection.")
+        logger.debug("Removed link format from selection.")
 
 
 class NoteEditor(BaseEditor):
@@ -159,12 +287,14 @@ class NoteEditor(BaseEditor):
 
     def __init__(self, note_data: Optional[Note] = None, data_manager: DataManager = None, settings: Optional[Dict] = None, **kwargs):
         self.settings = settings if settings else {}
+        self._body_loader: Optional[ProgressiveNoteLoader] = None; self.preview_panel: Optional[QWidget] = None
+        image_cache().set_max_bytes(self.settings.get("image_cache_mb", 128) * 1024 * 1024)
         super().__init__(editor_type='note', object_data=note_data, data_manager=data_manager, **kwargs)
         self.alignment_actions: List[QAction] = []
         self._apply_default_font_settings()
 
     def _setup_specific_editor_ui(self):
-        self.content_editor = ClickableTextEdit(self)
+        self.content_editor = ClickableTextEdit(self); self.content_editor.attachment_store = self.data_manager
         self.format_toolbar = QToolBar("Formatting")
         self.format_toolbar.setFloatable(False); self.format_toolbar.setMovable(False); self.format_toolbar.setIconSize(QSize(18, 18))
         action_bold = QAction(get_icon("bold.png", QStyle.StandardPixmap.SP_DialogYesButton), "Bold", self); action_bold.setToolTip("Bold (Ctrl+B)"); action_bold.setShortcut(QKeySequence("Ctrl+B")); action_bold.setCheckable(True); action_bold.triggered.connect(self._text_bold); self.format_toolbar.addAction(action_bold)
@@ -193,19 +323,20 @@ class NoteEditor(BaseEditor):
         # Ensure spinbox exists before setting value
         if hasattr(self, 'font_size_spin'):
             self.font_size_spin.setValue(default_size if default_size > 0 else 10)
-        print(f"Applied default font: {current_font.family()}, {current_font.pointSize()}pt")
+        logger.debug("Applied default font: %s, %spt", current_font.family(), current_font.pointSize())
 
     def _show_insert_link_dialog(self):
+        if self._body_loading: return
         cursor = self.content_editor.textCursor(); selected_text = cursor.selectedText(); existing_url = ""
         url_prop = self.content_editor.get_link_property_at_cursor(cursor)
         if url_prop:
             existing_url = url_prop
             if not selected_text:
                  temp_cursor = QTextCursor(cursor); temp_cursor.select(QTextCursor.SelectionType.WordUnderCursor)
-                 if self.content_editor.get_link_property_at_cursor(temp_cursor) == url_prop: selected_text = temp_cursor.selectedText(); print(f"Editing link under cursor: Text='{selected_text}', URL='{existing_url}'")
-                 else: selected_text = ""; print(f"Cursor inside link span (URL: {existing_url}), but no text selected. Inserting new link.")
-            else: print(f"Editing selected link: Text='{selected_text}', URL='{existing_url}'")
-        else: print(f"No existing link found at cursor. Inserting new link. Selected text: '{selected_text}'")
+                 if self.content_editor.get_link_property_at_cursor(temp_cursor) == url_prop: selected_text = temp_cursor.selectedText(); logger.debug("Editing link under cursor: Text='%s', URL='%s'", selected_text, existing_url)
+                 else: selected_text = ""; logger.debug("Cursor inside link span (URL: %s), but no text selected. Inserting new link.", existing_url)
+            else: logger.debug("Editing selected link: Text='%s', URL='%s'", selected_text, existing_url)
+        else: logger.debug("No existing link found at cursor. Inserting new link. Selected text: '%s'", selected_text)
         dialog = InsertLinkDialog(self, selected_text=selected_text, existing_url=existing_url); result = dialog.get_link_data()
         if result:
             display_text, url_str, removed_flag = result
@@ -213,16 +344,81 @@ class NoteEditor(BaseEditor):
             elif display_text and url_str: self.content_editor.apply_link_format(display_text, url_str)
 
     def _load_specific_fields(self):
-        if self.object_data and isinstance(self.object_data, Note): html_content = self.object_data.content or ""; print(f"--- Loading HTML From DB (Link properties might be missing for old links) ---"); self.content_editor.setHtml(html_content)
-        else: print("--- Loading a New Note ---"); self.content_editor.clear()
+        if self.object_data and isinstance(self.object_data, Note):
+            html_content = self.object_data.content or ""; preview_chars = self.settings.get("note_preview_min_chars", NOTE_PREVIEW_CHARS)
+            if len(html_content) >= NOTE_BACKGROUND_LOAD_CHARS: self._load_body_in_background(html_content, preview=0 < preview_chars <= len(html_content))
+            else: logger.debug("--- Loading HTML From DB (Link properties might be missing for old links) ---"); self.content_editor.setHtml(html_content)
+        else: logger.debug("--- Loading a New Note ---"); self.content_editor.clear()
         self._update_format_toolbar()
 
-    def _get_specific_fields_data(self) -> str: return self.content_editor.toHtml()
+    # --- Progressive loading of large notes ---
+    def _load_body_in_background(self, html_content: str, preview: bool):
+        """Imports `html_content` in slices while the editor stays read-only; the finished document is swapped in by _on_document_ready."""
+        if self._body_loader is not None: self._body_loader.cancel(); self._body_loader.deleteLater()
+        self._body_loading = True
+        if preview: self._show_preview()
+        elif self.preview_panel is not None and self.preview_panel.isVisible(): self.edit_full_btn.setEnabled(False)
+        else: self.content_editor.clear(); self.content_editor.setPlaceholderText("Loading note...")
+        self.content_editor.setReadOnly(True); self.format_toolbar.setEnabled(False)
+        self._body_loader = ProgressiveNoteLoader(html_content, preview, self)
+        self._body_loader.progressed.connect(self._on_load_progress); self._body_loader.preview_text.connect(self._append_preview_text); self._body_loader.document_ready.connect(self._on_document_ready)
+        self._body_loader.start()
+        logger.debug("Note %s: loading %d chars of HTML progressively (preview: %s).", self.object_id, len(html_content), preview)
+
+    def _on_load_progress(self, percent: int):
+        if self.preview_panel is not None and self.preview_panel.isVisible():
+            if not self._body_loader.preview: self.edit_full_btn.setText(f"Loading... {percent}%")
+        else: self.content_editor.setPlaceholderText(f"Loading note... {percent}%")
+
+    def _on_document_ready(self, document: QTextDocument):
+        document.setParent(self.content_editor); document.setDefaultFont(self.content_editor.font())
+        self.content_editor.setDocument(document)
+        if self.preview_panel is not None: self.preview_panel.hide(); self.content_editor.show()
+        self._finish_body_load()
+        # Only the body becomes clean: a title or tags edited while it loaded stay unsaved.
+        self._mark_clean(self._get_specific_initial_state_data(), (self._initial_title, self._initial_tags, self._initial_extra_state, document.revision())); self._update_dirty_state()
+
+    def _finish_body_load(self):
+        if self._body_loader is not None: self._body_loader.cancel(); self._body_loader.deleteLater(); self._body_loader = None
+        self._body_loading = False
+        self.content_editor.setReadOnly(False); self.content_editor.setPlaceholderText(""); self.format_toolbar.setEnabled(True); self._update_format_toolbar()
+        if self._pending_view_state: state = self._pending_view_state; self._pending_view_state = None; self.restore_view_state(state)
+
+    def _show_preview(self):
+        if self.preview_panel is None:
+            self.preview_panel = QWidget(self); panel_layout = QVBoxLayout(self.preview_panel); panel_layout.setContentsMargins(0, 0, 0, 0)
+            bar = QHBoxLayout(); self.preview_label = QLabel(); self.preview_label.setWordWrap(True); bar.addWidget(self.preview_label, 1)
+            self.edit_full_btn = QPushButton("Edit Note"); self.edit_full_btn.setToolTip("Load the full formatted note for editing"); self.edit_full_btn.clicked.connect(self._edit_full_note); bar.addWidget(self.edit_full_btn)
+            self.preview_view = QPlainTextEdit(); self.preview_view.setReadOnly(True)
+            panel_layout.addLayout(bar); panel_layout.addWidget(self.preview_view, 1)
+            self.layout().insertWidget(self.layout().indexOf(self.content_editor), self.preview_panel, 1)
+        size_mb = len(self.object_data.content or "") / (1024 * 1024)
+        self.preview_label.setText(f"This note is large ({size_mb:.1f} MB), so it is shown as a read-only preview without formatting.")
+        self.edit_full_btn.setEnabled(True); self.edit_full_btn.setText("Edit Note")
+        self.preview_view.clear(); self.content_editor.hide(); self.preview_panel.show()
+
+    def _append_preview_text(self, text: str):
+        if text: self.preview_view.appendPlainText(text if self.preview_view.document().isEmpty() else "\n" + text)
+
+    def _edit_full_note(self):
+        if self.object_data: self._load_body_in_background(self.object_data.content or "", preview=False)
+
+    def _get_specific_fields_data(self) -> str:
+        if self._body_loading and self.object_data: return self.object_data.content or "" # The editor is read-only and still empty; the stored body is unchanged
+        return compact_note_html(self.content_editor.document())
+    def _set_specific_fields_data(self, specific_data: Optional[str]):
+        if self._body_loading: # Replaces whatever is still loading
+            self._finish_body_load()
+            if self.preview_panel is not None: self.preview_panel.hide(); self.content_editor.show()
+        self.content_editor.setHtml(specific_data or "")
+    def _content_view(self) -> QTextEdit: return self.content_editor
     def _get_specific_initial_state_data(self) -> str:
         if self.object_data and isinstance(self.object_data, Note): return self.object_data.content or ""
-        return self.content_editor.toHtml()
+        return compact_note_html(self.content_editor.document())
 
-    def _merge_char_format(self, fmt: QTextCharFormat): cursor = self.content_editor.textCursor(); cursor.mergeCharFormat(fmt); self.content_editor.mergeCurrentCharFormat(fmt)
+    def _merge_char_format(self, fmt: QTextCharFormat):
+        if self._body_loading: return # Toolbar shortcuts stay live while the body is read-only
+        cursor = self.content_editor.textCursor(); cursor.mergeCharFormat(fmt); self.content_editor.mergeCurrentCharFormat(fmt)
     def _text_bold(self): fmt = QTextCharFormat(); current_weight = self.content_editor.currentCharFormat().fontWeight(); fmt.setFontWeight(QFont.Weight.Normal if current_weight == QFont.Weight.Bold else QFont.Weight.Bold); self._merge_char_format(fmt)
     def _text_italic(self): fmt = QTextCharFormat(); fmt.setFontItalic(not self.content_editor.currentCharFormat().fontItalic()); self._merge_char_format(fmt)
     def _text_underline(self): fmt = QTextCharFormat(); fmt.setFontUnderline(not self.content_editor.currentCharFormat().fontUnderline()); self._merge_char_format(fmt)
@@ -236,6 +432,7 @@ class NoteEditor(BaseEditor):
             fmt.setForeground(color)
             self._merge_char_format(fmt)
     def _handle_alignment_change(self, triggered_action: QAction, alignment: Qt.AlignmentFlag):
+        if self._body_loading: return
         if self.content_editor.alignment() != alignment:
             self.content_editor.setAlignment(alignment)
             for action in self.alignment_actions:
@@ -263,11 +460,11 @@ class NoteEditor(BaseEditor):
         try:
             current_font_in_combo = self.font_combo.currentFont(); current_format_font = char_format.font()
             if current_font_in_combo.family() != current_format_font.family(): self.font_combo.blockSignals(True); self.font_combo.setCurrentFont(current_format_font); self.font_combo.blockSignals(False)
-        except Exception as e: print(f"Error updating font combo: {e}")
+        except Exception as e: logger.error("Error updating font combo: %s", e)
         try:
             point_size = char_format.fontPointSize(); current_spin_value = self.font_size_spin.value(); target_value = int(point_size) if point_size > 0 else self.settings.get("default_note_font_size", 10)
             if current_spin_value != target_value: self.font_size_spin.blockSignals(True); self.font_size_spin.setValue(target_value); self.font_size_spin.blockSignals(False)
-        except Exception as e: print(f"Error updating font size spin: {e}")
+        except Exception as e: logger.error("Error updating font size spin: %s", e)
 
     def _is_specific_data_empty(self, specific_data) -> bool:
          return not self.content_editor.toPlainText().strip()
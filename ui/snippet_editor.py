@@ -2,8 +2,9 @@
 
 # ui/snippet_editor.py
 
+import logging
 from PyQt6.QtWidgets import (
-    QVBoxLayout, QTextEdit, QComboBox, QHBoxLayout, QPushButton, QMessageBox,
+    QVBoxLayout, QPlainTextEdit, QComboBox, QHBoxLayout, QPushButton, QMessageBox,
     QApplication, QStyle # Added QApplication, QStyle
 )
 from PyQt6.QtCore import Qt, pyqtSignal, QObject
@@ -11,17 +12,20 @@ from PyQt6.QtCore import Qt, pyqtSignal, QObject
 from PyQt6.QtGui import QKeySequence, QIcon, QFont
 # --------------------------
 from ui.base_editor import BaseEditor, get_icon # Import base class and icon helper
-from .syntax_highlighter import SyntaxHighlighter
+from .syntax_highlighter import SyntaxHighlighter, HIGHLIGHT_MAX_CHARS
 from database.models import Snippet
 from database.data_manager import DataManager
-from typing import Optional, Tuple
+from typing import Optional, Tuple, Dict
+
+logger = logging.getLogger(__name__)
 
 class SnippetEditor(BaseEditor):
     # Specific signals for snippets (emitted by base class handlers)
     snippet_saved = pyqtSignal(Snippet)
     snippet_deleted = pyqtSignal(int)
 
-    def __init__(self, snippet_data: Optional[Snippet] = None, data_manager: DataManager = None):
+    def __init__(self, snippet_data: Optional[Snippet] = None, data_manager: DataManager = None, settings: Optional[Dict] = None):
+        self.settings = settings if settings else {}
         # Pass 'snippet' editor_type and data to the base class.
         super().__init__(editor_type='snippet', object_data=snippet_data, data_manager=data_manager)
         # Specific widgets are created in _setup_specific_editor_ui
@@ -32,7 +36,7 @@ class SnippetEditor(BaseEditor):
         self.language_combo.addItems(["Python", "JavaScript", "HTML", "CSS", "SQL", "Java", "C++", "C#", "PHP", "Ruby", "Go", "Text"]) # Added more languages + Text
         self.language_combo.setToolTip("Select programming language for syntax highlighting")
 
-        self.code_editor = QTextEdit()
+        self.code_editor = QPlainTextEdit() # Lays out lazily per block, so huge pastes and dumps stay responsive
         # Improve font for code
         font = QFont("Courier New", 11) # Or another monospace font like 'Consolas', 'Monaco', 'Source Code Pro'
         # Check if the font is actually available, otherwise default font will be used
@@ -44,14 +48,14 @@ class SnippetEditor(BaseEditor):
         #     font.setPointSize(11)
 
         self.code_editor.setFont(font)
-        # Optionally disable rich text features if only plain code is desired
-        self.code_editor.setAcceptRichText(False)
         # Set tab stop distance (e.g., 4 spaces)
         self.code_editor.setTabStopDistance(font.pointSize() * 4)
 
 
         # Setup Syntax Highlighting
-        self.highlighter = SyntaxHighlighter(self.code_editor.document(), self.language_combo.currentText())
+        # Highlights the visible lines first and the rest in short slices; very large snippets stay plain text.
+        self.highlighter = SyntaxHighlighter(self.code_editor.document(), self.language_combo.currentText(), max_chars=self.settings.get("snippet_highlight_max_chars", HIGHLIGHT_MAX_CHARS))
+        self.highlighter.set_view(self.code_editor)
         self.language_combo.currentTextChanged.connect(self.highlighter.set_language)
 
         # --- Copy Code Button ---
@@ -75,10 +79,14 @@ class SnippetEditor(BaseEditor):
         main_layout.addLayout(self._controls_layout) # Add common controls layout
 
         # Connect specific editor signals for dirty tracking
-        self.code_editor.textChanged.connect(self._on_editor_text_changed)
+        self.code_editor.textChanged.connect(self._on_code_changed)
         self.language_combo.currentTextChanged.connect(self._on_editor_text_changed)
 
 
+    def _on_code_changed(self):
+        # Highlighting slices re-format blocks after the fact, which the editor reports as text changes too.
+        if not self.highlighter.reformatting: self._on_editor_text_changed()
+
     def _load_specific_fields(self):
         """Implement abstract method: Load data into specific SnippetEditor fields."""
         if self.object_data and isinstance(self.object_data, Snippet):
@@ -101,6 +109,15 @@ class SnippetEditor(BaseEditor):
         """Implement abstract method: Return data from specific SnippetEditor fields."""
         return (self.code_editor.toPlainText(), self.language_combo.currentText())
 
+    def _set_specific_fields_data(self, specific_data):
+        code, language = specific_data if isinstance(specific_data, (list, tuple)) and len(specific_data) == 2 else (specific_data or "", self.language_combo.currentText())
+        self.code_editor.setPlainText(code or "")
+        index = self.language_combo.findText(language or "Text", Qt.MatchFlag.MatchFixedString)
+        if index >= 0: self.language_combo.setCurrentIndex(index)
+
+    def _content_view(self) -> QPlainTextEdit: return self.code_editor
+    def _get_specific_extra_state(self) -> str: return self.language_combo.currentText()
+
     def _get_specific_initial_state_data(self) -> Tuple[str, str]:
         """Implement abstract method: Return initial data from specific SnippetEditor fields."""
          # Called after initial load or setup
@@ -116,13 +133,13 @@ class SnippetEditor(BaseEditor):
         if clipboard:
              code = self.code_editor.toPlainText()
              clipboard.setText(code)
-             print(f"Copied {len(code)} characters to clipboard.") # Feedback
+             logger.debug("Copied %s characters to clipboard.", len(code)) # Feedback
              # Optionally show a brief status message in status bar if available
              # Accessing main window's status bar requires passing a reference or using signals
              # For simplicity, just print for now.
              # Alternative: emit a signal that MainWindow connects to show status.
         else:
-             print("Error: Could not access clipboard.")
+             logger.warning("Could not access clipboard.")
 
 
     def _is_specific_data_empty(self, specific_data) -> bool:
@@ -1,114 +1,89 @@
 # ui/syntax_highlighter.py
+import logging
+import re
+import time
 from PyQt6.QtGui import QSyntaxHighlighter, QTextCharFormat, QFont, QColor, QTextDocument
-from PyQt6.QtCore import QRegularExpression, Qt
+from PyQt6.QtCore import QPoint, QTimer
+from PyQt6.QtWidgets import QPlainTextEdit
 
-class SyntaxHighlighter(QSyntaxHighlighter):
-    """
-    Custom syntax highlighter for various languages in a QTextDocument.
-    Supports Python, JavaScript, HTML, CSS, SQL, and basic highlighting for others.
-    """
-
-    def __init__(self, parent: QTextDocument = None, language: str = "python"):
-        super().__init__(parent)
-        self.language = "" # Will be set by set_language
-        self.highlighting_rules = []
-
-        # Common formats
-        self.keyword_format = QTextCharFormat()
-        self.keyword_format.setForeground(QColor(197, 134, 192)) # Purple
-        self.keyword_format.setFontWeight(QFont.Weight.Bold)
-
-        self.builtin_format = QTextCharFormat()
-        self.builtin_format.setForeground(QColor(229, 192, 123)) # Yellow/Gold
-
-        self.number_format = QTextCharFormat()
-        self.number_format.setForeground(QColor(255, 170, 0)) # Orange
-
-        self.string_format = QTextCharFormat()
-        self.string_format.setForeground(QColor(152, 195, 121)) # Green
-
-        self.singleline_comment_format = QTextCharFormat()
-        self.singleline_comment_format.setForeground(QColor(128, 128, 128)) # Grey
-        self.singleline_comment_format.setFontItalic(True)
-
-        self.multiline_comment_format = QTextCharFormat()
-        self.multiline_comment_format.setForeground(QColor(128, 128, 128)) # Grey
-        self.multiline_comment_format.setFontItalic(True)
-
-        self.html_tag_format = QTextCharFormat()
-        self.html_tag_format.setForeground(QColor(86, 156, 214)) # Blue
-        self.html_attr_format = QTextCharFormat()
-        self.html_attr_format.setForeground(QColor(156, 220, 254)) # Light Blue
-        self.html_value_format = QTextCharFormat()
-        self.html_value_format.setForeground(QColor(152, 195, 121)) # Green (like strings)
-
-        self.css_selector_format = QTextCharFormat()
-        self.css_selector_format.setForeground(QColor(215, 186, 125)) # Tan/Brown
-        self.css_property_format = QTextCharFormat()
-        self.css_property_format.setForeground(QColor(156, 220, 254)) # Light Blue
-        self.css_value_format = QTextCharFormat()
-        self.css_value_format.setForeground(QColor(184, 115, 211)) # Light Purple
+logger = logging.getLogger(__name__)
 
-        # Multi-line comment delimiters
-        self.comment_start = None
-        self.comment_end = None
-        self.singleline_comment_pattern = None
+def _char_format(red: int, green: int, blue: int, bold: bool = False, italic: bool = False) -> QTextCharFormat:
+    fmt = QTextCharFormat(); fmt.setForeground(QColor(red, green, blue))
+    if bold: fmt.setFontWeight(QFont.Weight.Bold)
+    if italic: fmt.setFontItalic(True)
+    return fmt
 
-        self.set_language(language) # Initialize rules
-
-    def set_language(self, language: str):
-        """Sets the language for syntax highlighting and rebuilds rules."""
-        new_lang = language.lower().strip()
-        if new_lang == self.language:
-            return # No change needed
+# Token patterns shared by several languages. None of them may match an empty string.
+_NUMBER = r"\b\d+(?:\.\d+)?(?:[eE][+-]?\d+)?\b"
+_STRING = r'"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\''
+_WORD = r"[^\W\d]\w*" # Identifier; looked up in the language's word table
+_BLOCK_COMMENT_END = re.compile(r".*?\*/")
 
-        self.language = new_lang
-        self.highlighting_rules.clear()
-        self.comment_start = None
-        self.comment_end = None
-        self.singleline_comment_pattern = None
+# Block states carried between lines: the low 4 bits say which multi-line construct is still open
+# (0 = none), the bits above hold the lexer mode (CSS: inside a { } declaration block).
+_IN_COMMENT, _IN_TRIPLE_DOUBLE, _IN_TRIPLE_SINGLE, _IN_TEMPLATE = 1, 2, 3, 4
+_MODE_SHIFT = 4
 
-        print(f"SyntaxHighlighter: Setting language to '{self.language}'") # Debug print
+HIGHLIGHT_SLICE_SECONDS = 0.008 # Time spent in highlightBlock per event-loop turn; the rest of the document waits for later turns
+HIGHLIGHT_MAX_CHARS = 2_000_000 # Larger documents are shown as plain text (overridable per editor)
 
-        # Always add common rules first (can be overridden by specific language rules)
-        self._add_common_rules()
+class _LanguageRules:
+    """
+    Token table for one language, compiled into one master pattern per lexer
+    mode. Built once per process and shared by every SyntaxHighlighter.
+    """
+    # Common formats
+    keyword_format = _char_format(197, 134, 192, bold=True) # Purple
+    builtin_format = _char_format(229, 192, 123) # Yellow/Gold
+    number_format = _char_format(255, 170, 0) # Orange
+    string_format = _char_format(152, 195, 121) # Green
+    singleline_comment_format = _char_format(128, 128, 128, italic=True) # Grey
+    multiline_comment_format = _char_format(128, 128, 128, italic=True) # Grey
+    literal_format = _char_format(86, 156, 214) # Blue: self, true/false/null
+    decorator_format = _char_format(220, 220, 170) # Light yellow
+    template_literal_format = _char_format(206, 145, 120) # Brown/Orange
+    preprocessor_format = _char_format(155, 155, 155) # Dark Grey
+    html_tag_format = _char_format(86, 156, 214) # Blue
+    html_attr_format = _char_format(156, 220, 254) # Light Blue
+    html_value_format = _char_format(152, 195, 121) # Green (like strings)
+    doctype_format = _char_format(128, 128, 128) # Grey
+    css_selector_format = _char_format(215, 186, 125) # Tan/Brown
+    css_property_format = _char_format(156, 220, 254) # Light Blue
+    css_value_format = _char_format(184, 115, 211) # Light Purple
+
+    def __init__(self, language: str):
+        self.language = language
+        self.words: dict[str, QTextCharFormat] = {} # Identifier -> format, for the "word" token
+        self.modes: list[list[tuple]] = [[]] # Per mode: (token name, pattern, format) in priority order
+        self.openers: dict[str, tuple] = {} # Token name -> (state, end pattern, format) for multi-line constructs
+        self.mode_switches: dict[str, int] = {} # Token name -> mode entered after it
 
-        # Add language-specific rules
         if self.language == "python": self._setup_python_rules()
         elif self.language == "javascript": self._setup_javascript_rules()
         elif self.language == "html": self._setup_html_rules()
         elif self.language == "css": self._setup_css_rules()
         elif self.language == "sql": self._setup_sql_rules()
         elif self.language in ["java", "c++", "c#", "php", "ruby", "go"]:
-             self._setup_generic_c_style_rules() # Use common rules for these
-        # Default: Only common rules (numbers, strings) and no comments for "Text" or unknown
+             self._setup_generic_c_style_rules()
+        else: self._add_tokens(("string", _STRING, self.string_format), ("number", _NUMBER, self.number_format)) # "Text" or unknown
 
-        self.rehighlight() # Re-apply highlighting to the entire document
+        # Alternation order is priority order: at a given position the earliest listed token wins.
+        self.masters = [re.compile("|".join(f"(?P<{name}>{pattern})" for name, pattern, _ in tokens)) for tokens in self.modes]
+        self.token_formats = [{name: fmt for name, _, fmt in tokens} for tokens in self.modes]
+        self.continuations = {state: (end, fmt) for state, end, fmt in self.openers.values()}
 
-    def _add_common_rules(self):
-        """Adds rules common to most languages (numbers, strings)."""
-        # Numbers (integers and floats)
-        self.highlighting_rules.append(
-            (QRegularExpression(r"\b\d+(\.\d+)?([eE][+-]?\d+)?\b"), self.number_format)
-        )
-        # Strings (double and single quoted)
-        self.highlighting_rules.extend([
-            (QRegularExpression(r'"(?:\\.|[^"\\])*"'), self.string_format),
-            (QRegularExpression(r"'(?:\\.|[^'\\])*'"), self.string_format)
-        ])
-
-    def _add_keywords(self, keywords: list[str]):
-        """Helper to add keyword highlighting rules."""
-        for keyword in keywords:
-            # Use word boundaries to avoid matching parts of words
-            pattern = QRegularExpression(r'\b' + keyword + r'\b')
-            self.highlighting_rules.append((pattern, self.keyword_format))
-
-    def _add_builtins(self, builtins: list[str]):
-        """Helper to add built-in function/type highlighting rules."""
-        for builtin in builtins:
-            pattern = QRegularExpression(r'\b' + builtin + r'\b')
-            self.highlighting_rules.append((pattern, self.builtin_format))
+    def _add_tokens(self, *tokens, mode: int = 0):
+        while len(self.modes) <= mode: self.modes.append([])
+        self.modes[mode].extend(tokens)
+
+    def _add_words(self, words: list[str], fmt: QTextCharFormat):
+        """Later calls win for words listed twice (e.g. SQL DATE is both a type and a function)."""
+        for word in words: self.words[word] = fmt
+
+    def _add_block_comment(self, start: str = r"/\*", end: re.Pattern = _BLOCK_COMMENT_END, mode: int = 0):
+        self._add_tokens(("block_comment", start, self.multiline_comment_format), mode=mode)
+        self.openers["block_comment"] = (_IN_COMMENT, end, self.multiline_comment_format)
 
     def _setup_python_rules(self):
         python_keywords = [
@@ -118,7 +93,7 @@ class SyntaxHighlighter(QSyntaxHighlighter):
             'lambda', 'nonlocal', 'not', 'or', 'pass', 'raise', 'return',
             'try', 'while', 'with', 'yield', 'match', 'case' # Added match/case
         ]
-        self._add_keywords(python_keywords)
+        self._add_words(python_keywords, self.keyword_format)
 
         python_builtins = [
             'abs', 'all', 'any', 'ascii', 'bin', 'bool', 'breakpoint', 'bytearray',
@@ -132,27 +107,21 @@ class SyntaxHighlighter(QSyntaxHighlighter):
             'setattr', 'slice', 'sorted', 'staticmethod', 'str', 'sum', 'super',
             'tuple', 'type', 'vars', 'zip', '__import__'
         ]
-        self._add_builtins(python_builtins)
-
-        # Decorators
-        decorator_format = QTextCharFormat()
-        decorator_format.setForeground(QColor(220, 220, 170)) # Light yellow
-        self.highlighting_rules.append((QRegularExpression(r"@[a-zA-Z_][a-zA-Z0-9_]*"), decorator_format))
-
-        # self keyword
-        self_format = QTextCharFormat()
-        self_format.setForeground(QColor(86, 156, 214)) # Blue
-        self.highlighting_rules.append((QRegularExpression(r"\bself\b"), self_format))
-
-        # Triple-quoted strings (multi-line handled separately)
-        self.highlighting_rules.extend([
-            (QRegularExpression(r'"""(?:\\.|[^"\\])*"""'), self.string_format),
-            (QRegularExpression(r"'''(?:\\.|[^'\\])*'''"), self.string_format)
-        ])
-
-        self.singleline_comment_pattern = QRegularExpression(r'#.*$')
-        self.comment_start = QRegularExpression(r'"""|\'\'\'')
-        self.comment_end = QRegularExpression(r'"""|\'\'\'') # Python uses same delimiter
+        self._add_words(python_builtins, self.builtin_format)
+        self._add_words(['self'], self.literal_format)
+
+        self._add_tokens(
+            ("comment", r"#.*", self.singleline_comment_format),
+            ("triple_double", r'"""', self.string_format), # Before "string" so """ is not read as "" + "
+            ("triple_single", r"'''", self.string_format),
+            ("string", _STRING, self.string_format),
+            ("decorator", r"@[^\W\d]\w*", self.decorator_format),
+            ("word", _WORD, None),
+            ("number", _NUMBER, self.number_format),
+        )
+        # Triple-quoted strings may span lines; the end pattern skips escaped characters.
+        self.openers["triple_double"] = (_IN_TRIPLE_DOUBLE, re.compile(r'(?:\\.|[^\\])*?"""'), self.string_format)
+        self.openers["triple_single"] = (_IN_TRIPLE_SINGLE, re.compile(r"(?:\\.|[^\\])*?'''"), self.string_format)
 
     def _setup_javascript_rules(self):
         js_keywords = [
@@ -163,7 +132,7 @@ class SyntaxHighlighter(QSyntaxHighlighter):
             'var', 'void', 'while', 'with', 'yield', 'let', 'static', 'async', 'await',
             'get', 'set' # Added get/set
         ]
-        self._add_keywords(js_keywords)
+        self._add_words(js_keywords, self.keyword_format)
 
         js_builtins = [ # Examples
              'Array', 'Boolean', 'Date', 'Error', 'EvalError', 'Function', 'Infinity',
@@ -174,53 +143,47 @@ class SyntaxHighlighter(QSyntaxHighlighter):
              'encodeURIComponent', 'eval', 'isFinite', 'isNaN', 'null', 'parseFloat',
              'parseInt', 'undefined', 'window', 'globalThis', 'arguments' # Added more
         ]
-        self._add_builtins(js_builtins)
-
-        # Boolean literals
-        bool_format = QTextCharFormat()
-        bool_format.setForeground(QColor(86, 156, 214)) # Blue
-        self.highlighting_rules.append((QRegularExpression(r"\b(true|false)\b"), bool_format))
-
-        # Template literals (basic highlighting)
-        template_literal_format = QTextCharFormat()
-        template_literal_format.setForeground(QColor(206, 145, 120)) # Brown/Orange
-        self.highlighting_rules.append((QRegularExpression(r"`(?:\\.|[^`])*`"), template_literal_format))
-
-        self.singleline_comment_pattern = QRegularExpression(r'//.*$')
-        self.comment_start = QRegularExpression(r'/\*')
-        self.comment_end = QRegularExpression(r'\*/')
+        self._add_words(js_builtins, self.builtin_format)
+        self._add_words(['true', 'false'], self.literal_format) # Boolean literals
+
+        self._add_block_comment()
+        self._add_tokens(
+            ("comment", r"//.*", self.singleline_comment_format),
+            ("template", r"`", self.template_literal_format), # Template literals may span lines
+            ("string", _STRING, self.string_format),
+            ("word", _WORD, None),
+            ("number", _NUMBER, self.number_format),
+        )
+        self.openers["template"] = (_IN_TEMPLATE, re.compile(r"(?:\\.|[^\\])*?`"), self.template_literal_format)
 
     def _setup_html_rules(self):
-         # Basic HTML tags <...>
-         self.highlighting_rules.append((QRegularExpression(r"</?\s*([a-zA-Z0-9\-\:]+)[^>]*>"), self.html_tag_format))
-         # Attributes (e.g., class=...) - simple match
-         self.highlighting_rules.append((QRegularExpression(r"\b([a-zA-Z\-]+)\s*="), self.html_attr_format))
-         # Values in quotes are handled by common string rules
-         # Doctype
-         doctype_format = QTextCharFormat()
-         doctype_format.setForeground(QColor(128, 128, 128)) # Grey
-         self.highlighting_rules.append((QRegularExpression(r"<!DOCTYPE[^>]*>"), doctype_format))
-
-         self.comment_start = QRegularExpression(r"<!--")
-         self.comment_end = QRegularExpression(r"-->")
-         self.singleline_comment_pattern = None
+        self._add_block_comment(r"<!--", re.compile(r".*?-->"))
+        self._add_tokens(
+            ("doctype", r"<!DOCTYPE[^>]*>", self.doctype_format),
+            ("tag", r"</?\s*[a-zA-Z0-9\-:]+|/?>", self.html_tag_format), # Tag name and the closing bracket
+            ("attribute", r"[a-zA-Z\-:]+(?=\s*=)", self.html_attr_format),
+            ("string", _STRING, self.html_value_format),
+            ("number", _NUMBER, self.number_format),
+        )
 
     def _setup_css_rules(self):
-         # Selectors (IDs, classes, tags, pseudo-classes) - Simplified
-         self.highlighting_rules.append((QRegularExpression(r"(^|[,{\s])([#.]?[a-zA-Z][a-zA-Z0-9\-_]*|[*])"), self.css_selector_format)) # Basic class/id/tag/universal
-         self.highlighting_rules.append((QRegularExpression(r":[a-zA-Z\-]+"), self.css_selector_format)) # Pseudo classes/elements
-
-         # Properties (e.g., color:)
-         self.highlighting_rules.append((QRegularExpression(r"\b([a-zA-Z\-]+)\s*:"), self.css_property_format))
-
-         # Values - includes hex colors, numbers with units, keywords
-         self.highlighting_rules.append((QRegularExpression(r":\s*(#[0-9a-fA-F]{3,8}|rgb[a]?\(.*?\)|hsl[a]?\(.*?\)|[-\w]+|\d+(\.\d+)?(px|em|rem|%|pt|vh|vw)?)\b"), self.css_value_format))
-         # Strings are handled by common rules
-         # Numbers are partially handled by common rules, unit handling is basic here
-
-         self.comment_start = QRegularExpression(r'/\*')
-         self.comment_end = QRegularExpression(r'\*/')
-         self.singleline_comment_pattern = None # CSS uses block comments
+        # Mode 0: selectors; mode 1: inside a { } declaration block.
+        for mode in (0, 1):
+            self._add_block_comment(mode=mode)
+            self._add_tokens(("string", _STRING, self.string_format), mode=mode)
+        self._add_tokens(
+            ("open_brace", r"\{", None),
+            ("at_rule", r"@[\w\-]+", self.keyword_format),
+            ("pseudo", r"::?[a-zA-Z\-]+", self.css_selector_format), # Pseudo classes/elements
+            ("selector", r"[#.]?[a-zA-Z][\w\-]*|\*", self.css_selector_format), # Basic class/id/tag/universal
+            mode=0)
+        self._add_tokens(
+            ("close_brace", r"\}", None),
+            ("property", r"[a-zA-Z\-]+(?=\s*:)", self.css_property_format),
+            ("important", r"!\s*important\b", self.keyword_format),
+            ("value", r"#[0-9a-fA-F]{3,8}\b|(?:rgb|hsl)a?\([^)]*\)|-?\d*\.?\d+(?:px|em|rem|%|pt|vh|vw|s|ms|deg)?|[a-zA-Z\-]+", self.css_value_format),
+            mode=1)
+        self.mode_switches = {"open_brace": 1, "close_brace": 0}
 
     def _setup_sql_rules(self):
         sql_keywords = [
@@ -235,18 +198,22 @@ class SyntaxHighlighter(QSyntaxHighlighter):
             'INTEGER', 'TEXT', 'BLOB', 'REAL', 'FLOAT', 'DATE', 'DATETIME', 'TIMESTAMP',
             'BOOLEAN', 'TRUE', 'FALSE'
         ]
-        self._add_keywords(sql_keywords)
+        self._add_words(sql_keywords, self.keyword_format)
 
         sql_functions = [ # Common examples
              'COUNT', 'SUM', 'AVG', 'MIN', 'MAX', 'ABS', 'ROUND', 'UPPER', 'LOWER',
              'SUBSTR', 'SUBSTRING', 'LENGTH', 'CAST', 'COALESCE', 'NULLIF', 'DATE',
              'TIME', 'DATETIME', 'STRFTIME', 'RANDOM'
         ]
-        self._add_builtins(sql_functions) # Use builtin format for functions
-
-        self.singleline_comment_pattern = QRegularExpression(r'--.*$')
-        self.comment_start = QRegularExpression(r'/\*')
-        self.comment_end = QRegularExpression(r'\*/')
+        self._add_words(sql_functions, self.builtin_format) # Use builtin format for functions
+
+        self._add_block_comment()
+        self._add_tokens(
+            ("comment", r"--.*", self.singleline_comment_format),
+            ("string", _STRING, self.string_format),
+            ("word", _WORD, None),
+            ("number", _NUMBER, self.number_format),
+        )
 
     def _setup_generic_c_style_rules(self):
         """ Basic highlighting for C-style languages (Java, C++, C#, PHP etc.) """
@@ -260,106 +227,188 @@ class SyntaxHighlighter(QSyntaxHighlighter):
             'void', 'int', 'long', 'float', 'double', 'char', 'byte', 'short', 'boolean',
             'string', 'var', 'let', 'auto' # Include common type keywords
         ]
-        self._add_keywords(c_style_keywords)
+        self._add_words(c_style_keywords, self.keyword_format)
+        self._add_words(['true', 'false', 'null', 'nullptr', 'undefined'], self.literal_format)
+
+        self._add_block_comment()
+        self._add_tokens(
+            ("preprocessor", r"^\s*#.*", self.preprocessor_format), # Basic #... at the start of a line
+            ("comment", r"//.*", self.singleline_comment_format),
+            ("string", _STRING, self.string_format),
+            ("word", _WORD, None),
+            ("number", _NUMBER, self.number_format),
+        )
+
+    def scan(self, text: str, state: int) -> tuple[list[tuple[int, int, QTextCharFormat]], int]:
+        """
+        Tokenizes one line left to right, starting in `state` (the previous
+        line's end state). Returns the (start, length, format) spans, each
+        character covered at most once, and the state for the next line.
+        """
+        spans = []; length = len(text); pos = 0
+        mode = state >> _MODE_SHIFT; open_construct = state & ((1 << _MODE_SHIFT) - 1)
+        if open_construct:
+            end, fmt = self.continuations[open_construct]
+            match = end.match(text)
+            if match is None: # The construct runs through this whole line
+                if length: spans.append((0, length, fmt))
+                return spans, state
+            pos = match.end(); spans.append((0, pos, fmt))
+        master = self.masters[mode]; formats = self.token_formats[mode]; words = self.words
+        while True:
+            match = master.search(text, pos)
+            if match is None: break
+            name = match.lastgroup; start, pos = match.span()
+            if name == "word":
+                fmt = words.get(match.group())
+                if fmt is not None: spans.append((start, pos - start, fmt))
+                continue
+            opener = self.openers.get(name)
+            if opener is not None:
+                open_state, end, fmt = opener; match = end.match(text, pos)
+                if match is None: # Unterminated: it continues on the next line
+                    spans.append((start, length - start, fmt))
+                    return spans, open_state | (mode << _MODE_SHIFT)
+                pos = match.end(); spans.append((start, pos - start, fmt))
+                continue
+            fmt = formats[name]
+            if fmt is not None: spans.append((start, pos - start, fmt))
+            if name in self.mode_switches:
+                mode = self.mode_switches[name]; master = self.masters[mode]; formats = self.token_formats[mode]
+        return spans, mode << _MODE_SHIFT
+
+_RULES: dict[str, _LanguageRules] = {}
+
+def language_rules(language: str) -> _LanguageRules:
+    """The shared compiled rules for `language` (case-insensitive), built on first use."""
+    language = language.lower().strip()
+    rules = _RULES.get(language)
+    if rules is None: rules = _RULES[language] = _LanguageRules(language)
+    return rules
+
+def _utf16_spans(text: str, spans: list) -> list:
+    """Converts str offsets to the UTF-16 offsets Qt uses; they differ after characters outside the BMP (e.g. emoji)."""
+    offsets = [0]
+    for char in text: offsets.append(offsets[-1] + (2 if char > "\uffff" else 1))
+    return [(offsets[start], offsets[start + length] - offsets[start], fmt) for start, length, fmt in spans]
+
+class SyntaxHighlighter(QSyntaxHighlighter):
+    """
+    Custom syntax highlighter for various languages in a QTextDocument.
+    Supports Python, JavaScript, HTML, CSS, SQL, and basic highlighting for others.
+
+    Highlighting is time-sliced: each event-loop turn spends at most
+    HIGHLIGHT_SLICE_SECONDS in highlightBlock. Blocks reached after that are
+    left unformatted and finished on later turns, the visible ones (see
+    set_view) first. Documents over `max_chars` are not highlighted at all.
+    """
+
+    def __init__(self, parent: QTextDocument = None, language: str = "python", max_chars: int = HIGHLIGHT_MAX_CHARS):
+        super().__init__(parent)
+        self.language = "" # Will be set by set_language
+        self.rules: _LanguageRules = None
+        self.max_chars = max_chars
+        self._view: QPlainTextEdit = None
+        self._turn_spent = None # Seconds spent highlighting this event-loop turn; None until the turn highlights something
+        self._deadline = None # Wall-clock end of a slice run by _next_turn, which also pays for Qt's relayout of each block
+        self._pending_from = None # First block number not highlighted yet with a known start state; None when all are done
+        self._guess_until = -1 # Blocks past _pending_from up to here (the viewport) may be highlighted ahead of their turn
+        self._viewport_painted = None
+        self._plain = False
+        self._block_count = parent.blockCount() if parent is not None else 0
+        self.reformatting = False # True while a later slice rehighlights blocks; the document then reports format-only changes
+        self._turn_timer = QTimer(self); self._turn_timer.setSingleShot(True); self._turn_timer.setInterval(0)
+        self._turn_timer.timeout.connect(self._next_turn)
+        if parent is not None:
+            parent.contentsChange.connect(self._on_contents_change); self._plain = parent.characterCount() > max_chars
+        self.set_language(language) # Initialize rules
+
+    def set_view(self, view: QPlainTextEdit):
+        """The editor showing the document; its visible blocks are highlighted before the rest."""
+        self._view = view
+        view.verticalScrollBar().valueChanged.connect(lambda _: self._pending_from is not None and self._turn_timer.start())
+
+    def set_language(self, language: str):
+        """Switches to the shared rules of `language` and rehighlights, dropping any unfinished pass."""
+        new_lang = language.lower().strip()
+        if new_lang == self.language:
+            return # No change needed
+
+        self.language = new_lang
+        logger.debug("SyntaxHighlighter: Setting language to '%s'", self.language) # Debug print
+        self.rules = language_rules(new_lang)
+        self._pending_from = None; self._viewport_painted = None; self._guess_until = -1
 
-        c_style_literals = ['true', 'false', 'null', 'nullptr', 'undefined']
-        literal_format = QTextCharFormat()
-        literal_format.setForeground(QColor(86, 156, 214)) # Blue
-        for literal in c_style_literals:
-             self.highlighting_rules.append((QRegularExpression(r"\b" + literal + r"\b"), literal_format))
+        self.rehighlight() # Re-apply highlighting to the entire document (the part over budget is deferred)
 
-        # Preprocessor directives (basic #...)
-        preprocessor_format = QTextCharFormat()
-        preprocessor_format.setForeground(QColor(155, 155, 155)) # Dark Grey
-        self.highlighting_rules.append((QRegularExpression(r"^\s*#.*"), preprocessor_format))
+    @property
+    def finished(self) -> bool:
+        """True when every block has been highlighted (or the document is shown as plain text)."""
+        return self._pending_from is None
 
-        self.singleline_comment_pattern = QRegularExpression(r'//.*$')
-        self.comment_start = QRegularExpression(r'/\*')
-        self.comment_end = QRegularExpression(r'\*/')
+    def _within_budget(self) -> bool:
+        if self._turn_spent is None: # First highlighting this turn: open a slice and come back next turn
+            self._turn_spent = 0.0; self._turn_timer.start()
+        return self._turn_spent < HIGHLIGHT_SLICE_SECONDS and (self._deadline is None or time.perf_counter() < self._deadline)
 
+    def _defer(self, number: int):
+        if self._pending_from is None or number < self._pending_from: self._pending_from = number
 
     def highlightBlock(self, text: str):
-        """Applies highlighting rules to the given text block."""
-
-        # --- 1. Apply language-specific rules first ---
-        for pattern, fmt in self.highlighting_rules:
-            match_iterator = pattern.globalMatch(text)
-            while match_iterator.hasNext():
-                match = match_iterator.next()
-                # Check if already formatted by multi-line comment state
-                is_commented = False
-                for i in range(match.capturedLength()):
-                     if self.format(match.capturedStart() + i) == self.multiline_comment_format:
-                         is_commented = True
-                         break
-                if not is_commented:
-                     self.setFormat(match.capturedStart(), match.capturedLength(), fmt)
-
-        # --- 2. Handle multi-line comments ---
-        current_block_state = 0 # 0 = normal, 1 = inside multi-line comment
-        search_index = 0
-
-        # Check previous block state
-        previous_state = self.previousBlockState()
-        if previous_state == 1 and self.comment_end:
-            # Continuing a comment from the previous block
-            end_match = self.comment_end.match(text, 0)
-            if end_match.hasMatch():
-                # Comment ends in this block
-                end_offset = end_match.capturedStart() + end_match.capturedLength()
-                self.setFormat(0, end_offset, self.multiline_comment_format)
-                search_index = end_offset
-                current_block_state = 0
-            else:
-                # Comment continues through this block
-                self.setFormat(0, len(text), self.multiline_comment_format)
-                current_block_state = 1
-                self.setCurrentBlockState(current_block_state)
-                return # Nothing else to format in this block
-        else:
-             current_block_state = 0 # Start in normal state
-
-
-        # Find comment start/end within the rest of the block
-        if self.comment_start and self.comment_end:
-            while search_index < len(text):
-                start_match = self.comment_start.match(text, search_index)
-                if not start_match.hasMatch():
-                    break # No more comment starts in this block
-
-                start_offset = start_match.capturedStart()
-                search_index = start_offset + start_match.capturedLength() # Start looking for end after start
-
-                end_match = self.comment_end.match(text, search_index)
-                if end_match.hasMatch():
-                    # Comment starts and ends in this block
-                    end_offset = end_match.capturedStart() + end_match.capturedLength()
-                    self.setFormat(start_offset, end_offset - start_offset, self.multiline_comment_format)
-                    search_index = end_offset
-                    current_block_state = 0
-                else:
-                    # Comment starts but doesn't end in this block
-                    self.setFormat(start_offset, len(text) - start_offset, self.multiline_comment_format)
-                    current_block_state = 1
-                    break # Stop searching this block
-
-        # --- 3. Handle single-line comments ---
-        # Apply *after* other rules and multi-line comments
-        if self.singleline_comment_pattern and current_block_state == 0: # Only apply if not inside multi-line
-             match_iterator = self.singleline_comment_pattern.globalMatch(text)
-             while match_iterator.hasNext():
-                 match = match_iterator.next()
-                 # Check if the start of the match is inside a multi-line comment first
-                 is_in_multiline = False
-                 if self.format(match.capturedStart()) == self.multiline_comment_format:
-                      is_in_multiline = True
-
-                 if not is_in_multiline:
-                      self.setFormat(match.capturedStart(), match.capturedLength(), self.singleline_comment_format)
-
-
-        # --- Set the final state for the *next* block ---
-        self.setCurrentBlockState(current_block_state)
+        """Formats one block in a single left-to-right pass; multi-line strings and comments carry over via the block state."""
+        if self._plain: return
+        number = self.currentBlock().blockNumber(); pending_from = self._pending_from
+        if pending_from is not None and number > pending_from and number > self._guess_until: return # Not its turn yet
+        if not self._within_budget(): self._defer(number); return # Leaves the block's state alone, so Qt stops here
+        started = time.perf_counter()
+        spans, state = self.rules.scan(text, max(self.previousBlockState(), 0))
+        if spans and not text.isascii() and max(text) > "\uffff": spans = _utf16_spans(text, spans)
+        for start, length, fmt in spans: self.setFormat(start, length, fmt)
+        self.setCurrentBlockState(state)
+        self._turn_spent += time.perf_counter() - started
+        if number == pending_from: self._pending_from = number + 1 if self.currentBlock().next().isValid() else None
+
+    def _on_contents_change(self, position: int, removed: int, added: int):
+        document = self.document()
+        if document is None: return
+        plain = document.characterCount() > self.max_chars
+        if plain != self._plain: # Crossed the size limit: redo everything in the new mode
+            self._plain = plain; self._pending_from = None; self._viewport_painted = None
+            logger.debug("SyntaxHighlighter: %s highlighting (%s characters).", "Disabling" if plain else "Resuming", document.characterCount())
+            self.rehighlight(); return
+        block_count = document.blockCount()
+        if block_count != self._block_count: # Lines inserted/removed; if above the frontier, its number has shifted
+            self._block_count = block_count
+            if self._pending_from is not None: self._defer(document.findBlock(position).blockNumber()); self._viewport_painted = None
+
+    def _visible_blocks(self) -> tuple[int, int]:
+        viewport = self._view.viewport()
+        first = self._view.cursorForPosition(QPoint(0, 0)).blockNumber()
+        return first, self._view.cursorForPosition(QPoint(viewport.width() - 1, viewport.height() - 1)).blockNumber()
+
+    def _next_turn(self):
+        """Continues an unfinished pass for one slice: the visible blocks first, then onward from the frontier."""
+        self._turn_spent = None; document = self.document()
+        if self._pending_from is None or document is None: return
+        if self._pending_from >= document.blockCount(): self._pending_from = None; return
+        self._within_budget(); self.reformatting = True; self._deadline = time.perf_counter() + HIGHLIGHT_SLICE_SECONDS
+        try: self._highlight_slice(document)
+        finally: self.reformatting = False; self._deadline = None
+        if self._pending_from is None: logger.debug("SyntaxHighlighter: Finished highlighting %s blocks.", document.blockCount())
+
+    def _highlight_slice(self, document: QTextDocument):
+        if self._view is not None:
+            first, last = self._visible_blocks()
+            if (first, last) != self._viewport_painted and last > self._pending_from:
+                # States above the viewport are not known yet; highlight as if they were 0, the frontier corrects it later.
+                self._viewport_painted = (first, last); self._guess_until = last
+                block = document.findBlockByNumber(max(first, self._pending_from + 1))
+                while block.isValid() and block.blockNumber() <= last: self.rehighlightBlock(block); block = block.next()
+                self._guess_until = -1
+        while self._pending_from is not None and self._within_budget():
+            frontier = self._pending_from
+            self.rehighlightBlock(document.findBlockByNumber(frontier))
+            if self._pending_from == frontier: break # Deferred again (out of budget)
 
 # ui/syntax_highlighter.py
 # --- END OF FILE syntax_highlighter.py ---
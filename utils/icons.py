@@ -0,0 +1,77 @@
+# utils/icons.py
+"""
+Process-wide icon registry. Icons come from icons/icons.bundle, a single
+uncompressed zip of the PNGs in icons/ scaled down to BUNDLE_ICON_SIZE, which
+is read once on first use; every later get_icon() call for the same name
+returns the same shared QIcon without touching the disk.
+
+Rebuild the bundle after changing a PNG:  python -m utils.icons
+"""
+import logging
+import zipfile
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from PyQt6.QtCore import QBuffer, QByteArray, QIODevice, Qt
+from PyQt6.QtGui import QIcon, QImage, QPixmap
+from PyQt6.QtWidgets import QApplication, QStyle
+
+logger = logging.getLogger(__name__)
+
+ICONS_DIR = Path(__file__).parent.parent / "icons"
+ICON_BUNDLE = ICONS_DIR / "icons.bundle"
+BUNDLE_ICON_SIZE = 64 # Largest side kept in the bundle; toolbars draw at 16-18 px, so this covers 3x HiDPI
+
+_bundle: Optional[Dict[str, bytes]] = None
+_icons: Dict[Tuple[str, Optional[QStyle.StandardPixmap]], QIcon] = {}
+
+def _bundle_data() -> Dict[str, bytes]:
+    """Name -> PNG bytes, read from the bundle on the first call. Falls back to the loose files if the bundle is missing or unreadable."""
+    global _bundle
+    if _bundle is not None: return _bundle
+    try:
+        with zipfile.ZipFile(ICON_BUNDLE) as bundle: _bundle = {name: bundle.read(name) for name in bundle.namelist()}
+        logger.debug("Loaded %d icons from %s.", len(_bundle), ICON_BUNDLE)
+    except (OSError, zipfile.BadZipFile) as e:
+        logger.warning("Icon bundle %s unavailable (%s); reading icons from %s.", ICON_BUNDLE, e, ICONS_DIR)
+        _bundle = {}
+        for path in ICONS_DIR.glob("*.png"):
+            try: _bundle[path.name] = path.read_bytes()
+            except OSError as read_error: logger.warning("Could not read icon %s: %s", path, read_error)
+    return _bundle
+
+def get_icon(icon_name: str, fallback_pixmap: Optional[QStyle.StandardPixmap] = None) -> QIcon:
+    key = (icon_name, fallback_pixmap)
+    icon = _icons.get(key)
+    if icon is not None: return icon
+    icon = QIcon(); data = _bundle_data().get(icon_name)
+    if data:
+        pixmap = QPixmap()
+        if pixmap.loadFromData(data): icon = QIcon(pixmap)
+        else: logger.warning("Icon %s in the bundle could not be decoded.", icon_name)
+    if icon.isNull() and fallback_pixmap is not None:
+        style = QApplication.style()
+        if style: icon = style.standardIcon(fallback_pixmap)
+    _icons[key] = icon
+    return icon
+
+def build_icon_bundle(source_dir: Path = ICONS_DIR, bundle_path: Path = ICON_BUNDLE, max_size: int = BUNDLE_ICON_SIZE) -> int:
+    """Packs every PNG in `source_dir` into `bundle_path`, scaled so neither side exceeds `max_size`. Returns the number of icons packed."""
+    packed = 0; temp_path = bundle_path.with_suffix(bundle_path.suffix + ".tmp")
+    with zipfile.ZipFile(temp_path, "w", compression=zipfile.ZIP_STORED) as bundle: # PNGs are already compressed
+        for path in sorted(source_dir.glob("*.png")):
+            image = QImage(str(path))
+            if image.isNull(): logger.warning("Skipping unreadable icon %s.", path); continue
+            if image.width() > max_size or image.height() > max_size:
+                image = image.scaled(max_size, max_size, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
+            data = QByteArray(); buffer = QBuffer(data); buffer.open(QIODevice.OpenModeFlag.WriteOnly); image.save(buffer, "PNG"); buffer.close()
+            bundle.writestr(path.name, bytes(data)); packed += 1
+    temp_path.replace(bundle_path)
+    return packed
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    count = build_icon_bundle()
+    print(f"Packed {count} icons into {ICON_BUNDLE} ({ICON_BUNDLE.stat().st_size / 1024:.1f} KiB).")
+
+# utils/icons.py
+# --- END OF FILE icons.py ---
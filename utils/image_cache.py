@@ -0,0 +1,101 @@
+# utils/image_cache.py
+"""
+Process-wide cache of decoded note images, shared by every open note editor.
+Attachment bytes are fetched through the `load` callable on a small thread
+pool and decoded there (DataManager's loader blocks on a read queued on the
+database executor, so only decoding runs in parallel); images larger than
+IMAGE_MAX_SIDE are decoded straight to a scaled-down variant, and the least
+recently used images are dropped once the cache holds more than `max_bytes`
+of pixel data. QImage data is implicitly shared, so tabs showing the same
+image hold one decoded copy between them.
+"""
+import logging
+from collections import OrderedDict
+from typing import Callable, Optional, Set, Tuple
+from PyQt6.QtCore import QBuffer, QByteArray, QIODevice, QObject, QRunnable, QThreadPool, Qt, pyqtSignal
+from PyQt6.QtGui import QImage, QImageReader
+
+logger = logging.getLogger(__name__)
+
+IMAGE_MAX_SIDE = 1600 # Larger images are shown (and cached) scaled down to this
+IMAGE_CACHE_BYTES = 128 * 1024 * 1024
+DECODE_THREADS = 2
+
+def decode_image(data: bytes, max_side: int = IMAGE_MAX_SIDE) -> QImage:
+    """Decodes image bytes, at a reduced size if either side exceeds `max_side`. Null QImage if undecodable."""
+    buffer = QBuffer(); buffer.setData(QByteArray(data)); buffer.open(QIODevice.OpenModeFlag.ReadOnly)
+    reader = QImageReader(buffer); reader.setAutoTransform(True); size = reader.size()
+    if size.isValid() and max(size.width(), size.height()) > max_side: reader.setScaledSize(size.scaled(max_side, max_side, Qt.AspectRatioMode.KeepAspectRatio))
+    image = reader.read()
+    if image.isNull(): logger.warning("Could not decode image (%d bytes): %s", len(data), reader.errorString())
+    return image
+
+def fit_image(image: QImage, max_side: int = IMAGE_MAX_SIDE) -> QImage:
+    if max(image.width(), image.height()) <= max_side: return image
+    return image.scaled(max_side, max_side, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
+
+class _DecodeTask(QRunnable):
+    def __init__(self, digest: str, load: Callable[[str], Optional[Tuple[str, bytes]]], done: pyqtSignal):
+        super().__init__(); self.digest = digest; self.load = load; self.done = done
+
+    def run(self):
+        try:
+            attachment = self.load(self.digest)
+            image = decode_image(attachment[1]) if attachment else QImage()
+        except Exception as e: logger.error("Decoding attachment %s failed: %s", self.digest, e); image = QImage()
+        self.done.emit(self.digest, image)
+
+class ImageCache(QObject):
+    image_ready = pyqtSignal(str) # Digest of an image that has just been decoded into the cache
+    _decoded = pyqtSignal(str, QImage)
+
+    def __init__(self, max_bytes: int = IMAGE_CACHE_BYTES, parent: QObject = None):
+        super().__init__(parent)
+        self.max_bytes = max_bytes
+        self._images: "OrderedDict[str, QImage]" = OrderedDict(); self._bytes = 0 # Least recently used first
+        self._pending: Set[str] = set(); self._failed: Set[str] = set()
+        self._pool = QThreadPool(self); self._pool.setMaxThreadCount(DECODE_THREADS)
+        self._decoded.connect(self._on_decoded)
+
+    def get(self, digest: str) -> Optional[QImage]:
+        image = self._images.get(digest)
+        if image is not None: self._images.move_to_end(digest)
+        return image
+
+    def put(self, digest: str, image: QImage) -> QImage:
+        """Caches `image` (scaled down if needed) under `digest` and returns the cached copy."""
+        image = fit_image(image); old = self._images.pop(digest, None)
+        if old is not None: self._bytes -= old.sizeInBytes()
+        self._images[digest] = image; self._bytes += image.sizeInBytes(); self._failed.discard(digest)
+        self._evict()
+        return image
+
+    def request(self, digest: str, load: Callable[[str], Optional[Tuple[str, bytes]]]) -> bool:
+        """Starts reading (through `load`) and decoding an image that is not cached; `image_ready` follows. False if it cannot be loaded."""
+        if digest in self._failed: return False
+        if digest in self._images or digest in self._pending: return True
+        self._pending.add(digest); self._pool.start(_DecodeTask(digest, load, self._decoded))
+        return True
+
+    def set_max_bytes(self, max_bytes: int): self.max_bytes = max(0, int(max_bytes)); self._evict()
+    def clear(self): self._images.clear(); self._bytes = 0; self._failed.clear()
+    def stats(self) -> dict: return {"images": len(self._images), "bytes": self._bytes, "max_bytes": self.max_bytes, "pending": len(self._pending)}
+
+    def _evict(self):
+        while self._bytes > self.max_bytes and len(self._images) > 1: # The newest image stays even if it alone exceeds the limit
+            _, image = self._images.popitem(last=False); self._bytes -= image.sizeInBytes()
+
+    def _on_decoded(self, digest: str, image: QImage):
+        self._pending.discard(digest)
+        if image.isNull(): self._failed.add(digest); return
+        self.put(digest, image); self.image_ready.emit(digest)
+
+_cache: Optional[ImageCache] = None
+
+def image_cache() -> ImageCache:
+    global _cache
+    if _cache is None: _cache = ImageCache()
+    return _cache
+
+# utils/image_cache.py
+# --- END OF FILE image_cache.py ---
@@ -0,0 +1,57 @@
+# utils/list_snapshot.py
+"""
+What the sidebar showed when the app was last closed: the top rows of both
+lists, the tags, the active filter/search and the scroll positions. The main
+window paints it on startup before the database has answered, then
+reconciles in the background unless the database change token still matches.
+"""
+import json
+import logging
+import os
+from pathlib import Path
+from datetime import datetime
+from typing import List, Optional
+from database.models import Note, Snippet
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 1
+SNAPSHOT_ROWS = 200 # Rows kept per list; enough to fill a tall window
+
+def _iso(dt: Optional[datetime]) -> Optional[str]: return dt.isoformat() if dt else None
+def _parse(text: Optional[str]) -> Optional[datetime]: return datetime.fromisoformat(text) if text else None
+
+# Rows are stored as short lists rather than dicts to keep the file small.
+def note_summary(note: Note) -> list: return [note.id, note.title, note.tags, _iso(note.created_at), _iso(note.updated_at)]
+def snippet_summary(snippet: Snippet) -> list: return [snippet.id, snippet.title, snippet.language, snippet.tags, _iso(snippet.created_at)]
+
+def notes_from_summaries(rows: List[list]) -> List[Note]:
+    return [Note(id=row[0], title=row[1] or "", tags=row[2] or "", created_at=_parse(row[3]), updated_at=_parse(row[4])) for row in rows]
+
+def snippets_from_summaries(rows: List[list]) -> List[Snippet]:
+    return [Snippet(id=row[0], title=row[1] or "", language=row[2] or "Text", tags=row[3] or "", created_at=_parse(row[4])) for row in rows]
+
+def save_list_snapshot(path: Path, snapshot: dict):
+    """Writes `snapshot` (plus the format version) atomically; a crash mid-write leaves the previous file."""
+    path = Path(path); temp_path = path.with_suffix(path.suffix + ".tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(temp_path, "w", encoding="utf-8") as f: json.dump(dict(snapshot, version=SNAPSHOT_VERSION), f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(temp_path, path)
+        logger.debug("List snapshot saved to %s (%s notes, %s snippets).", path, len(snapshot.get("notes", [])), len(snapshot.get("snippets", [])))
+    except OSError as e: logger.warning("Could not save list snapshot to %s: %s", path, e)
+
+def load_list_snapshot(path: Path) -> Optional[dict]:
+    """The saved snapshot, or None if there is none or it cannot be used."""
+    try:
+        with open(path, "r", encoding="utf-8") as f: snapshot = json.load(f)
+    except FileNotFoundError: return None
+    except (OSError, ValueError) as e: logger.warning("Ignoring unreadable list snapshot %s: %s", path, e); return None
+    if not isinstance(snapshot, dict) or snapshot.get("version") != SNAPSHOT_VERSION: logger.debug("Ignoring list snapshot %s with another format version.", path); return None
+    try:
+        snapshot["notes"] = notes_from_summaries(snapshot.get("notes", [])); snapshot["snippets"] = snippets_from_summaries(snapshot.get("snippets", []))
+    except (TypeError, ValueError, IndexError) as e: logger.warning("Ignoring malformed list snapshot %s: %s", path, e); return None
+    return snapshot
+
+# utils/list_snapshot.py
+# --- END OF FILE list_snapshot.py ---
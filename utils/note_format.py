@@ -0,0 +1,224 @@
+# utils/note_format.py
+"""
+Compact canonical HTML for note bodies. QTextEdit.toHtml() repeats a DOCTYPE,
+a style sheet and every margin and indent on each paragraph; the compact form
+states the paragraph defaults once in a short style sheet and writes only what
+differs from them: <b>, <i>, <u>, <s>, <sub>, <sup>, <a href> (including links
+made with ClickableTextEdit's LINK_URL_PROPERTY), <img>, alignment, margins,
+indents, flat lists, and colors, fonts and sizes in short style attributes.
+QTextDocument.setHtml() reads it back into the same document.
+
+A document using anything else (tables, headings, nested frames, ...) is stored
+as toHtml() output, so nothing is ever lost by converting.
+
+Report how much existing notes would shrink:  python -m utils.note_format [notes.db]
+"""
+import html
+import logging
+import re
+from typing import Dict, List, Optional, Tuple
+from PyQt6.QtCore import Qt
+from PyQt6.QtGui import QFont, QGuiApplication, QTextBlock, QTextCharFormat, QTextDocument, QTextFormat, QTextListFormat
+from utils.note_text import COMPACT_HEAD
+
+logger = logging.getLogger(__name__)
+
+LINK_URL_PROPERTY = QTextFormat.Property.UserProperty + 1 # URL of a link made in ClickableTextEdit
+
+_P = QTextFormat.Property
+_CHAR_PROPERTIES = {p.value for p in (
+    _P.FontFamilies, _P.FontPointSize, _P.FontWeight, _P.FontItalic, _P.FontUnderline, _P.TextUnderlineStyle, _P.FontStrikeOut,
+    _P.ForegroundBrush, _P.BackgroundBrush, _P.TextVerticalAlignment, _P.IsAnchor, _P.AnchorHref, _P.AnchorName, _P.TextToolTip,
+    _P.ObjectType, _P.ObjectIndex, _P.ImageName, _P.ImageWidth, _P.ImageHeight)} | {LINK_URL_PROPERTY}
+_BLOCK_PROPERTIES = {p.value for p in (
+    _P.BlockAlignment, _P.BlockTopMargin, _P.BlockBottomMargin, _P.BlockLeftMargin, _P.BlockRightMargin, _P.BlockIndent, _P.TextIndent, _P.ObjectIndex, _P.LayoutDirection)}
+_LIST_PROPERTIES = {p.value for p in (_P.ListStyle, _P.ListIndent, _P.ListStart, _P.ObjectIndex)}
+_LIST_STYLES = {QTextListFormat.Style.ListDisc: ("ul", "disc"), QTextListFormat.Style.ListCircle: ("ul", "circle"), QTextListFormat.Style.ListSquare: ("ul", "square"),
+                QTextListFormat.Style.ListDecimal: ("ol", "decimal"), QTextListFormat.Style.ListLowerAlpha: ("ol", "lower-alpha"), QTextListFormat.Style.ListUpperAlpha: ("ol", "upper-alpha"),
+                QTextListFormat.Style.ListLowerRoman: ("ol", "lower-roman"), QTextListFormat.Style.ListUpperRoman: ("ol", "upper-roman")}
+_DEFAULT_LIST_TYPE = {"ul": "disc", "ol": "decimal"}
+_TAG_CSS = {"b": "font-weight:700", "i": "font-style:italic", "u": "text-decoration:underline", "s": "text-decoration:line-through", "sub": "vertical-align:sub", "sup": "vertical-align:super"}
+_ALIGNMENTS = {Qt.AlignmentFlag.AlignHCenter: "center", Qt.AlignmentFlag.AlignRight: "right", Qt.AlignmentFlag.AlignJustify: "justify",
+               Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignAbsolute: "right", Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignAbsolute: "left"} # setHtml reads align="left"/"right" as absolute
+_BODY_FONT = re.compile(r"<body\b[^>]*?\bstyle=\"([^\"]*)\"", re.IGNORECASE)
+_OBJECT_CHAR = "\ufffc"; _LINE_SEPARATOR = "\u2028"
+
+class _Unsupported(Exception):
+    """The document uses something the compact form does not express."""
+
+def is_compact(html_content: str) -> bool: return (html_content or "").startswith(COMPACT_HEAD)
+
+def _number(value: float) -> str: return f"{value:g}"
+def _attribute(value: str) -> str: return html.escape(value, quote=False).replace('"', "&quot;")
+
+def _color(brush) -> str:
+    if brush.style() != Qt.BrushStyle.SolidPattern or brush.color().alpha() != 255: raise _Unsupported("brush")
+    return brush.color().name()
+
+def _char_style(char_format: QTextCharFormat, props: Dict[int, object], link_defaults: bool, default_font: QFont) -> Tuple[List[str], List[str]]:
+    """
+    Tags and CSS declarations for a character format. Like toHtml(), font
+    properties equal to the document's default font are left out.
+    `link_defaults`: setHtml already underlines and colors <a href> text.
+    """
+    tags: List[str] = []; css: List[str] = []
+    if _P.FontFamilies.value in props:
+        families = char_format.fontFamilies() or []
+        if families and families != [default_font.family()]: css.append("font-family:" + ",".join("'" + family.replace("'", "\\'") + "'" for family in families))
+    if _P.FontPointSize.value in props and char_format.fontPointSize() != default_font.pointSizeF(): css.append(f"font-size:{_number(char_format.fontPointSize())}pt")
+    if _P.FontWeight.value in props and char_format.fontWeight() != default_font.weight():
+        weight = char_format.fontWeight()
+        if weight == QFont.Weight.Bold: tags.append("b")
+        else: css.append(f"font-weight:{weight}")
+    if char_format.fontItalic(): tags.append("i")
+    if char_format.fontUnderline() != link_defaults: tags.append("u") if not link_defaults else css.append("text-decoration:none")
+    if char_format.fontStrikeOut(): tags.append("s")
+    if _P.TextVerticalAlignment.value in props:
+        alignment = char_format.verticalAlignment()
+        if alignment == QTextCharFormat.VerticalAlignment.AlignSubScript: tags.append("sub")
+        elif alignment == QTextCharFormat.VerticalAlignment.AlignSuperScript: tags.append("sup")
+        elif alignment != QTextCharFormat.VerticalAlignment.AlignNormal: raise _Unsupported("vertical-align")
+    if _P.ForegroundBrush.value in props:
+        color = _color(char_format.foreground())
+        if not link_defaults or color != QGuiApplication.palette().link().color().name(): css.append("color:" + color)
+    elif link_defaults: raise _Unsupported("link without color")
+    if _P.BackgroundBrush.value in props: css.append("background-color:" + _color(char_format.background()))
+    return tags, css
+
+def _char_markup(char_format: QTextCharFormat, default_font: QFont) -> Tuple[str, str]:
+    props = char_format.properties()
+    if not _CHAR_PROPERTIES.issuperset(props): raise _Unsupported(f"character properties {sorted(set(props) - _CHAR_PROPERTIES)}")
+    href = props.get(LINK_URL_PROPERTY) or (char_format.anchorHref() if char_format.isAnchor() else "")
+    names = char_format.anchorNames() if char_format.isAnchor() else []
+    tags, css = _char_style(char_format, props, bool(href), default_font)
+    if css: tags.append('span style="' + _attribute(";".join(css)) + '"')
+    if href or names:
+        anchor = "a" + (f' href="{_attribute(str(href))}"' if href else "") + (f' name="{_attribute(names[0])}"' if names else "")
+        tags.insert(0, anchor)
+    return "".join(f"<{tag}>" for tag in tags), "".join(f"</{tag.split(' ', 1)[0]}>" for tag in reversed(tags))
+
+def _image_markup(char_format: QTextCharFormat) -> str:
+    image_format = char_format.toImageFormat(); markup = f'<img src="{_attribute(image_format.name())}"'
+    if image_format.hasProperty(_P.ImageWidth): markup += f' width="{_number(image_format.width())}"'
+    if image_format.hasProperty(_P.ImageHeight): markup += f' height="{_number(image_format.height())}"'
+    return markup + " />"
+
+def _block_markup(block: QTextBlock, tag: str) -> str:
+    block_format = block.blockFormat(); props = block_format.properties()
+    if not _BLOCK_PROPERTIES.issuperset(props): raise _Unsupported(f"block properties {sorted(set(props) - _BLOCK_PROPERTIES)}")
+    attributes = ""; css = []
+    alignment = _ALIGNMENTS.get(block_format.alignment() & Qt.AlignmentFlag.AlignHorizontal_Mask)
+    if alignment: attributes += f' align="{alignment}"'
+    if block_format.layoutDirection() == Qt.LayoutDirection.RightToLeft: attributes += ' dir="rtl"'
+    for name, value in (("margin-top", block_format.topMargin()), ("margin-bottom", block_format.bottomMargin()), ("margin-left", block_format.leftMargin()), ("margin-right", block_format.rightMargin()), ("text-indent", block_format.textIndent())):
+        if value: css.append(f"{name}:{_number(value)}px")
+    if block_format.indent(): css.append(f"-qt-block-indent:{block_format.indent()}")
+    empty = block.length() <= 1; marker_props = block.charFormat().properties()
+    char_tags, char_css = _char_style(block.charFormat(), marker_props, False, block.document().defaultFont()) # Format of an empty line, or of a list marker
+    if tag == "li" and not empty and (char_tags or char_css):
+        # Text in the item inherits the <li> style, so it can only carry the marker's format if all the text shares it
+        fragments = block.begin()
+        while not fragments.atEnd():
+            props = fragments.fragment().charFormat().properties(); fragments += 1
+            if any(props.get(key) != value for key, value in marker_props.items()): raise _Unsupported("formatted list item marker")
+    if empty or tag == "li":
+        css += [_TAG_CSS[tag] for tag in char_tags] + [rule for rule in char_css if not rule.startswith("background-color:")] # On a <p> that would color the whole block; toHtml() drops it too
+    if empty: attributes += ' class="e"'
+    if css: attributes += f' style="{_attribute(";".join(css))}"'
+    return f"<{tag}{attributes}>"
+
+def _block_body(block: QTextBlock, markup_cache: Dict[int, Tuple[str, str]], default_font: QFont) -> str:
+    if block.length() <= 1: return "<br />"
+    parts = []; fragments = block.begin()
+    while not fragments.atEnd():
+        fragment = fragments.fragment(); fragments += 1
+        if not fragment.isValid(): continue
+        index = fragment.charFormatIndex(); markup = markup_cache.get(index)
+        if markup is None: markup = markup_cache[index] = _char_markup(fragment.charFormat(), default_font)
+        text = fragment.text()
+        if _OBJECT_CHAR in text and fragment.charFormat().isImageFormat(): body = _image_markup(fragment.charFormat()) * len(text)
+        else: body = html.escape(text, quote=False).replace(_LINE_SEPARATOR, "<br />")
+        parts.append(markup[0] + body + markup[1])
+    return "".join(parts)
+
+def _body_tag(font: QFont) -> str:
+    size = f"{_number(font.pointSizeF())}pt" if font.pointSizeF() > 0 else f"{font.pixelSize()}px"
+    return f"<body style=\"font-family:'{_attribute(font.family())}';font-size:{size}\">"
+
+def compact_note_html(document: QTextDocument) -> str:
+    """The document in the compact form, or toHtml() if it uses something the compact form does not cover."""
+    try: return _write_compact(document)
+    except _Unsupported as e:
+        logger.debug("Note body kept as full HTML: %s", e)
+        return document.toHtml()
+
+def _write_compact(document: QTextDocument) -> str:
+    if any(frame.lastPosition() >= frame.firstPosition() for frame in document.rootFrame().childFrames()): raise _Unsupported("tables or frames") # setHtml adds an empty frame per <img>
+    default_font = document.defaultFont(); parts = [COMPACT_HEAD, _body_tag(default_font)]; markup_cache: Dict[int, Tuple[str, str]] = {}
+    open_list = None; closed_lists = set(); list_tag = "" # Object index of the list being written, and of lists already closed
+    block = document.begin()
+    while block.isValid():
+        text_list = block.textList(); list_index = text_list.objectIndex() if text_list is not None else None
+        if list_index != open_list:
+            if open_list is not None: parts.append(f"</{list_tag}>"); closed_lists.add(open_list); open_list = None
+            if text_list is not None:
+                if list_index in closed_lists: raise _Unsupported("list continued after other blocks")
+                list_format = text_list.format()
+                if not _LIST_PROPERTIES.issuperset(list_format.properties()) or list_format.style() not in _LIST_STYLES: raise _Unsupported("list format")
+                list_tag, list_type = _LIST_STYLES[list_format.style()]; css = []
+                if list_type != _DEFAULT_LIST_TYPE[list_tag]: css.append(f"list-style-type:{list_type}")
+                if list_format.indent() != 1: css.append(f"-qt-list-indent:{list_format.indent()}")
+                start = f' start="{list_format.start()}"' if list_format.hasProperty(_P.ListStart) and list_format.start() != 1 else ""
+                parts.append(f"<{list_tag}{start}" + (f' style="{";".join(css)}"' if css else "") + ">"); open_list = list_index
+        tag = "li" if open_list is not None else "p"
+        parts.append("\n" + _block_markup(block, tag) + _block_body(block, markup_cache, default_font) + f"</{tag}>")
+        block = block.next()
+    if open_list is not None: parts.append(f"</{list_tag}>")
+    parts.append("</body></html>")
+    return "".join(parts)
+
+def legacy_default_font(html_content: str) -> Optional[QFont]:
+    """Default font a toHtml() document was written with (from its <body> style), or None."""
+    match = _BODY_FONT.search(html_content[:4096])
+    if not match: return None
+    family = re.search(r"font-family:\s*'([^']*)'", match.group(1)); size = re.search(r"font-size:\s*([\d.]+)pt", match.group(1))
+    if not family: return None
+    font = QFont(family.group(1))
+    if size: font.setPointSizeF(float(size.group(1)))
+    return font
+
+def compact_stored_html(html_content: str) -> Optional[str]:
+    """
+    Stored toHtml() output converted to the compact form, or None if it is
+    already compact, cannot be expressed compactly, or does not read back into
+    exactly the same document.
+    """
+    if not html_content or is_compact(html_content): return None
+    font = legacy_default_font(html_content)
+    original = QTextDocument()
+    if font is not None: original.setDefaultFont(font)
+    original.setHtml(html_content)
+    try: compact = _write_compact(original)
+    except _Unsupported as e: logger.debug("Note body cannot be compacted: %s", e); return None
+    check = QTextDocument(); check.setDefaultFont(original.defaultFont()); check.setHtml(compact)
+    if check.toHtml() != original.toHtml(): logger.debug("Compact note body does not read back identically; kept as is."); return None
+    return compact
+
+if __name__ == "__main__":
+    import sqlite3, sys
+    from PyQt6.QtGui import QGuiApplication as _App
+    from database.paths import DB_PATH
+    logging.basicConfig(level=logging.INFO)
+    app = _App(sys.argv[:1])
+    db_path = sys.argv[1] if len(sys.argv) > 1 else DB_PATH
+    connection = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    notes = compact = before = after = 0
+    for (content,) in connection.execute("SELECT content FROM notes"):
+        notes += 1; before += len(content or "")
+        converted = compact_stored_html(content or "")
+        if converted is not None: compact += 1; after += len(converted)
+        else: after += len(content or "")
+    print(f"{notes} notes, {compact} convertible: {before / 1024:.1f} KiB -> {after / 1024:.1f} KiB ({100 * (1 - after / max(1, before)):.0f}% smaller).")
+
+# utils/note_format.py
+# --- END OF FILE note_format.py ---
@@ -0,0 +1,51 @@
+# utils/note_text.py
+"""
+Plain text <-> note HTML without Qt, for tools that run without a GUI
+(notes_cli.py). COMPACT_HEAD is the head of the compact note format
+(see utils/note_format.py), so text converted here is already compact.
+"""
+import html
+from html.parser import HTMLParser
+from typing import List
+
+COMPACT_HEAD = "<html><head><style>p,li{white-space:pre-wrap;margin:0}ul,ol{margin:0}.e{-qt-paragraph-type:empty}</style></head>"
+LEGACY_PREFIX = "<!DOCTYPE HTML" # Start of toHtml() output
+
+_BLOCK_TAGS = {"p", "div", "li", "tr", "h1", "h2", "h3", "h4", "h5", "h6", "pre", "blockquote"}
+
+def note_html_from_text(text: str) -> str:
+    """Note HTML with one paragraph per line of `text`."""
+    paragraphs = [f"<p>{html.escape(line, quote=False)}</p>" if line else '<p class="e"><br /></p>' for line in (text or "").replace("\r\n", "\n").split("\n")]
+    return COMPACT_HEAD + "<body>\n" + "\n".join(paragraphs) + "</body></html>"
+
+class _TextExtractor(HTMLParser):
+    def __init__(self):
+        super().__init__(); self.parts: List[str] = []; self._skip = 0; self._block_starts: List[int] = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag in ("head", "style", "script"): self._skip += 1
+        elif tag == "br": self.parts.append("\n")
+        elif tag in _BLOCK_TAGS:
+            self._block_starts.append(len(self.parts))
+            if tag == "li": self.parts.append("- ")
+
+    def handle_endtag(self, tag):
+        if tag in ("head", "style", "script"): self._skip = max(0, self._skip - 1)
+        elif tag in _BLOCK_TAGS:
+            start = self._block_starts.pop() if self._block_starts else len(self.parts)
+            if self.parts[start:] == ["\n"]: del self.parts[start:] # An empty paragraph is written as <p><br /></p>
+            self.parts.append("\n")
+
+    def handle_data(self, data):
+        if self._skip or (not self._block_starts and not data.strip()): return # Layout whitespace between blocks
+        self.parts.append(data)
+
+def note_text_from_html(html_content: str) -> str:
+    """The text of note HTML, one line per paragraph; images and formatting are dropped."""
+    if not html_content: return ""
+    extractor = _TextExtractor(); extractor.feed(html_content); extractor.close()
+    text = "".join(extractor.parts).replace("\u2028", "\n").replace("\xa0", " ").lstrip("\n")
+    return text[:-1] if text.endswith("\n") else text # The last paragraph's line break
+
+# utils/note_text.py
+# --- END OF FILE note_text.py ---
@@ -0,0 +1,87 @@
+# utils/recovery_journal.py
+"""
+Append-only journal of unsaved editor contents, so a crash loses at most the
+last few seconds of typing. Each line is a JSON entry holding the latest
+contents of one editor (keyed by "note:12", or "new-note:<hex>" before the
+first save), or a marker that the key was saved or discarded. Appends run on
+a private writer thread; the journal is rewritten with only the live entries
+once it grows past `compact_bytes`, and removed on a clean shutdown.
+"""
+import json
+import logging
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List
+from PyQt6.QtCore import QThreadPool
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_COMPACT_BYTES = 8 * 1024 * 1024
+
+def load_journal(path: Path) -> List[dict]:
+    """Entries left in the journal that were never saved or discarded, oldest first."""
+    entries: Dict[str, dict] = {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try: entry = json.loads(line)
+                except ValueError: logger.warning("Skipping damaged line in recovery journal %s.", path); continue # Usually a write cut short by the crash
+                if not isinstance(entry, dict) or not isinstance(entry.get("key"), str): continue
+                if entry.get("done"): entries.pop(entry["key"], None)
+                else: entries.pop(entry["key"], None); entries[entry["key"]] = entry
+    except FileNotFoundError: return []
+    except OSError as e: logger.warning("Could not read recovery journal %s: %s", path, e); return []
+    return list(entries.values())
+
+class RecoveryJournal:
+    def __init__(self, path: Path, compact_bytes: int = JOURNAL_COMPACT_BYTES):
+        self.path = Path(path)
+        self.compact_bytes = compact_bytes
+        self._live: Dict[str, dict] = {entry["key"]: entry for entry in load_journal(self.path)} # Latest entry per key not yet saved or discarded
+        self._bytes = self.path.stat().st_size if self.path.exists() else 0
+        self._writer = QThreadPool(); self._writer.setMaxThreadCount(1) # One thread, so writes land in submission order
+
+    def live_entries(self) -> List[dict]: return list(self._live.values())
+
+    def record(self, key: str, entry: dict):
+        entry = dict(entry, key=key, at=datetime.now().isoformat(timespec="seconds")); self._live[key] = entry
+        self._append(json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n")
+
+    def resolve(self, key: str):
+        """The edits under `key` were saved or discarded and need no recovery."""
+        if self._live.pop(key, None) is not None: self._append(json.dumps({"key": key, "done": True}) + "\n")
+
+    def clear(self):
+        self._live.clear(); self._bytes = 0
+        self._writer.start(self._remove)
+
+    def flush(self, timeout_ms: int = 5000) -> bool: return self._writer.waitForDone(timeout_ms)
+
+    def _append(self, line: str):
+        self._bytes += len(line)
+        if self._bytes > self.compact_bytes:
+            live = list(self._live.values()); self._bytes = sum(len(json.dumps(entry, ensure_ascii=False, separators=(",", ":"))) + 1 for entry in live)
+            self._writer.start(lambda: self._rewrite(live))
+        else: self._writer.start(lambda: self._write(line))
+
+    # --- Writer thread ---
+    def _write(self, line: str):
+        try:
+            with open(self.path, "a", encoding="utf-8") as f: f.write(line)
+        except OSError as e: logger.warning("Could not append to recovery journal %s: %s", self.path, e)
+
+    def _rewrite(self, live: List[dict]):
+        temp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        try:
+            with open(temp_path, "w", encoding="utf-8") as f: f.writelines(json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n" for entry in live)
+            os.replace(temp_path, self.path)
+            logger.debug("Recovery journal %s compacted to %d entries.", self.path, len(live))
+        except OSError as e: logger.warning("Could not compact recovery journal %s: %s", self.path, e)
+
+    def _remove(self):
+        try: self.path.unlink(missing_ok=True)
+        except OSError as e: logger.warning("Could not remove recovery journal %s: %s", self.path, e)
+
+# utils/recovery_journal.py
+# --- END OF FILE recovery_journal.py ---
@@ -0,0 +1,45 @@
+# utils/startup_profile.py
+"""
+Startup timeline for `python main.py --profile-startup`: named marks from the
+start of main.py up to the first paint of the main window, printed as a table.
+"""
+import logging
+import sys
+import time
+from typing import Callable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+class StartupProfile:
+    def __init__(self, enabled: bool, origin: Optional[float] = None):
+        self.enabled = enabled
+        self.origin = origin if origin is not None else time.perf_counter()
+        self.marks: List[Tuple[str, float]] = []
+
+    def mark(self, name: str):
+        """Records that the phase `name` ended now; it started at the previous mark."""
+        if self.enabled: self.marks.append((name, time.perf_counter()))
+
+    def report(self) -> str:
+        lines = [f"{'Phase':<22} {'Took ms':>9} {'At ms':>9}"]; previous = self.origin
+        for name, at in self.marks:
+            lines.append(f"{name:<22} {(at - previous) * 1000:>9.1f} {(at - self.origin) * 1000:>9.1f}"); previous = at
+        app_modules = sorted(name for name in sys.modules if name.split(".")[0] in ("ui", "widgets", "utils", "database"))
+        lines.append(f"{len(sys.modules)} modules imported; app modules: {', '.join(app_modules)}")
+        return "\n".join(lines)
+
+    def finish_on_first_paint(self, window, on_done: Callable[[], None]):
+        """Marks "first paint" when `window` is first painted, prints the report, then calls `on_done`."""
+        if not self.enabled: return
+        from PyQt6.QtCore import QEvent, QObject, QTimer
+        profile = self
+        class _FirstPaint(QObject):
+            def eventFilter(self, watched, event):
+                if event.type() == QEvent.Type.Paint:
+                    window.removeEventFilter(self); profile.mark("first paint")
+                    QTimer.singleShot(0, lambda: (print(profile.report()), on_done()))
+                return False
+        self._filter = _FirstPaint(window); window.installEventFilter(self._filter)
+
+# utils/startup_profile.py
+# --- END OF FILE startup_profile.py ---
@@ -1,44 +1,33 @@
 # --- START OF FILE utils/style.py ---
 
 # utils/style.py
-from PyQt6.QtGui import QColor, QPalette, QIcon
-from PyQt6.QtCore import Qt, QStandardPaths
-from PyQt6.QtWidgets import QStyle, QApplication
-from pathlib import Path
-from typing import Optional
+import logging
+from PyQt6.QtGui import QColor, QPalette
+from PyQt6.QtCore import Qt
+from PyQt6.QtWidgets import QApplication
 
-ICONS_DIR = Path(__file__).parent.parent / "icons"
-
-def get_icon(icon_name: str, fallback_pixmap: Optional[QStyle.StandardPixmap] = None) -> QIcon:
-    icon_path = ICONS_DIR / icon_name
-    if icon_path.exists():
-        custom_icon = QIcon(str(icon_path))
-        if not custom_icon.isNull(): return custom_icon
-    if fallback_pixmap is not None:
-        style = QApplication.style()
-        if style: return style.standardIcon(fallback_pixmap)
-    return QIcon()
+logger = logging.getLogger(__name__)
 
 def load_styles(app: QApplication, theme_name: str = "dark"):
     theme_name = theme_name.lower()
-    print(f"[style.py] load_styles called with theme_name: '{theme_name}'")
+    logger.debug("[style.py] load_styles called with theme_name: '%s'", theme_name)
     if theme_name == "dark":
         load_dark_theme(app)
     elif theme_name == "light":
         load_light_theme(app)
     else:
-        print(f"Warning: Theme '{theme_name}' not recognized. Using default Light theme.")
+        logger.warning("Theme '%s' not recognized; using the light theme.", theme_name)
         load_light_theme(app)
 
 def load_dark_theme(app: QApplication):
-    print("[style.py] Loading DARK theme...")
+    logger.debug("[style.py] Loading DARK theme...")
     app.setStyle("Fusion")
     palette = QPalette()
     dark_grey = QColor(53, 53, 53); grey = QColor(75, 75, 75); light_grey = QColor(90, 90, 90); black = QColor(35, 35, 35); white = QColor(240, 240, 240); blue = QColor(42, 130, 218); dark_blue = QColor(30, 100, 180); link_color = QColor(90, 170, 255); visited_color = QColor(180, 140, 255)
     palette.setColor(QPalette.ColorRole.Window, dark_grey); palette.setColor(QPalette.ColorRole.WindowText, white); palette.setColor(QPalette.ColorRole.Base, black); palette.setColor(QPalette.ColorRole.AlternateBase, dark_grey); palette.setColor(QPalette.ColorRole.ToolTipBase, QColor(25, 25, 25)); palette.setColor(QPalette.ColorRole.ToolTipText, white); palette.setColor(QPalette.ColorRole.Text, white); palette.setColor(QPalette.ColorRole.Button, dark_grey); palette.setColor(QPalette.ColorRole.ButtonText, white); palette.setColor(QPalette.ColorRole.BrightText, Qt.GlobalColor.red); palette.setColor(QPalette.ColorRole.Highlight, blue); palette.setColor(QPalette.ColorRole.HighlightedText, black); palette.setColor(QPalette.ColorGroup.Disabled, QPalette.ColorRole.WindowText, grey); palette.setColor(QPalette.ColorGroup.Disabled, QPalette.ColorRole.Text, grey); palette.setColor(QPalette.ColorGroup.Disabled, QPalette.ColorRole.ButtonText, grey); palette.setColor(QPalette.ColorGroup.Disabled, QPalette.ColorRole.Highlight, grey);
     palette.setColor(QPalette.ColorRole.Link, link_color); palette.setColor(QPalette.ColorRole.LinkVisited, visited_color)
     app.setPalette(palette)
-    print("[style.py] Dark palette set.")
+    logger.debug("[style.py] Dark palette set.")
     style_sheet = f"""
         QToolTip {{ color: {white.name()}; background-color: {blue.name()}; border: 1px solid {white.name()}; padding: 4px; opacity: 220; }}
         QMainWindow {{ background-color: {dark_grey.name()}; }}
@@ -57,14 +46,10 @@ def load_dark_theme(app: QApplication):
         QPushButton:hover {{ background-color: {light_grey.name()}; border: 1px solid {blue.name()}; }}
         QPushButton:pressed {{ background-color: {dark_blue.name()}; }}
         QPushButton:disabled {{ background-color: {grey.name()}; color: {light_grey.name()}; border-color: {dark_grey.name()}; }}
-        QListWidget {{ background-color: {black.name()}; border: 1px solid {grey.name()}; border-radius: 3px; padding: 2px; outline: 0; }}
-        QListWidget::item {{ border-radius: 0px; padding: 1px 0px; }}
-        NoteItemWidget QLabel#title_label, SnippetItemWidget QLabel#title_label {{ font-weight: bold; color: {white.name()}; background-color: transparent; }}
-        NoteItemWidget QLabel#tags_label, NoteItemWidget QLabel#date_label, SnippetItemWidget QLabel#lang_label, SnippetItemWidget QLabel#tags_label, SnippetItemWidget QLabel#date_label {{ color: #aaa; background-color: transparent; }}
-        QListWidget::item:selected {{ background-color: {blue.name()}; border-radius: 2px; }}
-        QListWidget::item:selected NoteItemWidget QLabel, QListWidget::item:selected SnippetItemWidget QLabel {{ color: {black.name()}; background-color: transparent; }}
-        QListWidget::item:selected NoteItemWidget QLabel#tags_label, QListWidget::item:selected NoteItemWidget QLabel#date_label, QListWidget::item:selected SnippetItemWidget QLabel#lang_label, QListWidget::item:selected SnippetItemWidget QLabel#tags_label, QListWidget::item:selected SnippetItemWidget QLabel#date_label {{ color: #333; background-color: transparent; }}
-        QListWidget::item:hover:!selected {{ background-color: {light_grey.name()}; border-radius: 2px; }}
+        QListView {{ background-color: {black.name()}; border: 1px solid {grey.name()}; border-radius: 3px; padding: 2px; outline: 0; }}
+        QListView::item {{ border-radius: 0px; padding: 1px 0px; }}
+        QListView::item:selected {{ background-color: {blue.name()}; border-radius: 2px; }}
+        QListView::item:hover:!selected {{ background-color: {light_grey.name()}; border-radius: 2px; }}
         QComboBox {{ background-color: {dark_grey.name()}; border: 1px solid {grey.name()}; border-radius: 3px; padding: 3px 5px; min-width: 6em; color: {white.name()}; selection-background-color: {blue.name()}; selection-color: {black.name()}; }}
         QComboBox:hover {{ border: 1px solid {blue.name()}; }}
         QComboBox::drop-down {{ subcontrol-origin: padding; subcontrol-position: top right; width: 15px; border-left-width: 1px; border-left-color: {grey.name()}; border-left-style: solid; border-top-right-radius: 3px; border-bottom-right-radius: 3px; }}
@@ -85,11 +70,11 @@ def load_dark_theme(app: QApplication):
         QStatusBar::item {{ border: none; }}
     """
     app.setStyleSheet(style_sheet)
-    print("[style.py] Dark theme styles applied.")
+    logger.debug("[style.py] Dark theme styles applied.")
 
 def load_light_theme(app: QApplication):
     """Loads an explicit light theme palette and specific stylesheet."""
-    print("[style.py] Loading explicit LIGHT theme...")
+    logger.debug("[style.py] Loading explicit LIGHT theme...")
     app.setStyle("Fusion") # Or "Windows"
 
     palette = QPalette()
@@ -128,7 +113,7 @@ def load_light_theme(app: QApplication):
     palette.setColor(QPalette.ColorRole.LinkVisited, light_link_visited)
 
     app.setPalette(palette)
-    print("[style.py] Explicit light palette set.")
+    logger.debug("[style.py] Explicit light palette set.")
 
     # Apply stylesheet for light theme overrides
     light_style_sheet = f"""
@@ -136,7 +121,7 @@ def load_light_theme(app: QApplication):
             color: {light_text.name()}; /* Default text color */
             background-color: palette(window);
         }}
-        QLineEdit, QTextEdit, QPlainTextEdit, QTextBrowser, QListWidget, QComboBox, QSpinBox {{
+        QLineEdit, QTextEdit, QPlainTextEdit, QTextBrowser, QListView, QComboBox, QSpinBox {{
             background-color: palette(base);
             color: palette(text);
             border: 1px solid {light_border.name()};
@@ -174,32 +159,13 @@ def load_light_theme(app: QApplication):
              border-color: {light_grey.name()}; /* Use defined light_grey */
          }}
          /* Explicitly set text color for list items */
-         QListWidget::item {{
+         QListView::item {{
              color: {light_text.name()};
          }}
-         NoteItemWidget QLabel#title_label, SnippetItemWidget QLabel#title_label {{
-              font-weight: bold;
-              color: {light_text.name()};
-          }}
-         NoteItemWidget QLabel#tags_label, NoteItemWidget QLabel#date_label,
-         SnippetItemWidget QLabel#lang_label, SnippetItemWidget QLabel#tags_label, SnippetItemWidget QLabel#date_label {{
-              color: #555; /* Darker grey for details */
-          }}
-         QListWidget::item:selected {{
+         QListView::item:selected {{
              background-color: palette(highlight);
              color: palette(highlighted-text);
          }}
-         QListWidget::item:selected NoteItemWidget QLabel,
-         QListWidget::item:selected SnippetItemWidget QLabel {{
-              color: palette(highlighted-text);
-          }}
-         QListWidget::item:selected NoteItemWidget QLabel#tags_label,
-         QListWidget::item:selected NoteItemWidget QLabel#date_label,
-         QListWidget::item:selected SnippetItemWidget QLabel#lang_label,
-         QListWidget::item:selected SnippetItemWidget QLabel#tags_label,
-         QListWidget::item:selected SnippetItemWidget QLabel#date_label {{
-              color: palette(highlighted-text); /* Keep details visible */
-          }}
          QToolBar QToolButton:checked {{
             background-color: palette(highlight);
             color: palette(highlighted-text);
@@ -209,7 +175,7 @@ def load_light_theme(app: QApplication):
         QComboBox QAbstractItemView {{ color: palette(text); }} /* Ensure dropdown text color is correct */
     """
     app.setStyleSheet(light_style_sheet)
-    print("[style.py] Explicit Light theme stylesheet applied.")
+    logger.debug("[style.py] Explicit Light theme stylesheet applied.")
 
 # utils/style.py
 # --- END OF FILE utils/style.py ---
\ No newline at end of file
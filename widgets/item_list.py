@@ -0,0 +1,340 @@
+# widgets/item_list.py
+import bisect
+import logging
+from typing import Any, Dict, List, Optional, Union
+from PyQt6.QtWidgets import QApplication, QListView, QStyle, QStyledItemDelegate, QStyleOptionViewItem
+from PyQt6.QtCore import Qt, QAbstractListModel, QModelIndex, QRect, QSize
+from PyQt6.QtGui import QColor, QFont, QFontMetrics, QPainter, QPalette
+from database.models import Note, Snippet
+
+logger = logging.getLogger(__name__)
+
+ListItem = Union[Note, Snippet]
+
+ITEM_ROLE = Qt.ItemDataRole.UserRole + 1 # The Note/Snippet object
+ID_ROLE = Qt.ItemDataRole.UserRole + 2
+DIFF_MIN_MOVES = 64 # apply_items() moves up to this many rows one by one...
+DIFF_MAX_MOVE_FRACTION = 0.1 # ...or this share of the rows; more becomes one layout change
+
+class ItemListModel(QAbstractListModel):
+    """
+    Notes or snippets shown in a sidebar list. Rows hold the model objects
+    directly; nothing per row is created until the view asks for it, and
+    tooltips are only formatted when one is shown.
+
+    `_row_index` maps an id to its row plus `_row_base`. Changing the base
+    shifts every row at once, so inserting at the top (new or just-saved
+    items) costs O(1). Other inserts and removals renumber only the shorter
+    side of the change.
+    """
+    def __init__(self, item_kind: str, parent=None):
+        super().__init__(parent)
+        self.item_kind = item_kind # 'note' or 'snippet'
+        self._items: List[ListItem] = []
+        self._row_index: Dict[int, int] = {}; self._row_base = 0
+        self._stream_seen: Optional[set] = None; self._stream_cursor = 0 # Set while a chunked result is being merged
+
+    # --- Qt model interface ---
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._items)
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if not index.isValid() or not 0 <= index.row() < len(self._items): return None
+        item = self._items[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole: return item.title or f"Untitled {self.item_kind.capitalize()}"
+        if role == ITEM_ROLE: return item
+        if role == ID_ROLE: return item.id
+        if role == Qt.ItemDataRole.ToolTipRole: return item_tooltip(item)
+        return None
+
+    # --- Item access ---
+    def items(self) -> List[ListItem]: return self._items
+    def item_at(self, row: int) -> Optional[ListItem]: return self._items[row] if 0 <= row < len(self._items) else None
+
+    def row_of(self, item_id: int) -> int:
+        stored = self._row_index.get(item_id)
+        return -1 if stored is None else stored - self._row_base
+
+    def item_by_id(self, item_id: int) -> Optional[ListItem]:
+        return self.item_at(self.row_of(item_id)) if item_id in self._row_index else None
+
+    # --- Row index upkeep ---
+    def _reindex(self):
+        self._row_base = 0; self._row_index = {item.id: row for row, item in enumerate(self._items)}
+
+    def _shift_rows(self, start: int, end: int, delta: int):
+        index = self._row_index
+        for item in self._items[start:end]: index[item.id] += delta
+
+    def _index_inserted(self, row: int, count: int):
+        """Call after `count` items were inserted at `row`."""
+        if row < len(self._items) - row - count: self._row_base -= count; self._shift_rows(0, row, -count)
+        else: self._shift_rows(row + count, len(self._items), count)
+        for offset, item in enumerate(self._items[row:row + count]): self._row_index[item.id] = row + offset + self._row_base
+
+    def _index_removed(self, row: int, removed: List[ListItem]):
+        """Call after `removed` items were deleted from `row`."""
+        for item in removed: self._row_index.pop(item.id, None)
+        if row < len(self._items) - row: self._row_base += len(removed); self._shift_rows(0, row, len(removed))
+        else: self._shift_rows(row, len(self._items), -len(removed))
+
+    def set_items(self, items: List[ListItem]):
+        self._stream_seen = None # A full result replaces any chunked one in progress
+        self.beginResetModel(); self._items = list(items); self._reindex(); self.endResetModel()
+
+    def apply_items(self, items: List[ListItem]):
+        """
+        Changes the rows to `items` with the fewest remove/move/insert
+        operations instead of a reset, so unchanged rows, the selection and
+        the scroll position survive. Narrowing a search by one character only
+        removes the rows that stopped matching.
+        """
+        self._stream_seen = None
+        new_ids = {item.id for item in items}
+        kept = sum(1 for item in self._items if item.id in new_ids)
+        if not kept or len(new_ids) != len(items):
+            # Nothing to keep (or duplicate ids, which the diff cannot track): a reset is cheaper.
+            self.set_items(items); return
+        try: self._apply_diff(items, new_ids)
+        finally: self._reindex()
+
+    def _apply_diff(self, items: List[ListItem], new_ids: set):
+
+        # 1. Remove rows that are gone, bottom-up in contiguous runs.
+        row = len(self._items) - 1
+        while row >= 0:
+            if self._items[row].id in new_ids: row -= 1; continue
+            end = row
+            while row >= 0 and self._items[row].id not in new_ids: row -= 1
+            self.beginRemoveRows(QModelIndex(), row + 1, end); del self._items[row + 1:end + 1]; self.endRemoveRows()
+
+        # 2. Move rows whose relative order changed. Rows on the longest run
+        # already in the new order stay put; each other row moves once, to just
+        # after the nearest row that precedes it in the new order.
+        # A large reorder (e.g. a new sort order) is one layout change instead.
+        position = {item.id: i for i, item in enumerate(items)}
+        placed = _longest_increasing([position[item.id] for item in self._items])
+        if len(self._items) - len(placed) > max(DIFF_MIN_MOVES, len(self._items) * DIFF_MAX_MOVE_FRACTION): self._reorder(position)
+        else:
+            in_place = set(placed); rows = {position[item.id]: row for row, item in enumerate(self._items)} # New position -> current row
+            for pos in sorted(position[item.id] for item in self._items if position[item.id] not in in_place):
+                before = bisect.bisect_left(placed, pos)
+                dest = rows[placed[before - 1]] + 1 if before else 0; source = rows[pos]
+                if dest != source and dest != source + 1:
+                    final = dest if dest < source else dest - 1
+                    self.beginMoveRows(QModelIndex(), source, source, QModelIndex(), dest)
+                    self._items.insert(final, self._items.pop(source)); self.endMoveRows()
+                    # Only the rows between source and final shifted by one.
+                    low, high, delta = (final + 1, source + 1, 1) if final < source else (source, final, -1)
+                    for item in self._items[low:high]: rows[position[item.id]] += delta
+                    rows[pos] = final
+                placed.insert(before, pos)
+
+        # 3. Insert runs of new rows and take the new data for kept ones.
+        kept_ids = {item.id for item in self._items}
+        changed: List[int] = []; target = 0
+        while target < len(items):
+            item = items[target]
+            if target < len(self._items) and self._items[target].id == item.id:
+                if self._items[target] is not item and self._items[target] != item: self._items[target] = item; changed.append(target)
+                target += 1; continue
+            end = target
+            while end < len(items) and items[end].id not in kept_ids: end += 1
+            self.beginInsertRows(QModelIndex(), target, end - 1); self._items[target:target] = items[target:end]; self.endInsertRows()
+            target = end
+
+        # 4. Repaint rows whose data changed, in contiguous ranges.
+        start = 0
+        while start < len(changed):
+            end = start
+            while end + 1 < len(changed) and changed[end + 1] == changed[end] + 1: end += 1
+            self.dataChanged.emit(self.index(changed[start]), self.index(changed[end]))
+            start = end + 1
+
+    def _reorder(self, position: Dict[int, int]):
+        """Sorts the rows by `position` (id -> new index) in one layout change; selected and current rows follow their items."""
+        self.layoutAboutToBeChanged.emit()
+        persistent = self.persistentIndexList(); ids = [self._items[index.row()].id for index in persistent]
+        self._items.sort(key=lambda item: position[item.id])
+        rows = {item.id: row for row, item in enumerate(self._items)}
+        self.changePersistentIndexList(persistent, [self.index(rows[item_id]) for item_id in ids])
+        self.layoutChanged.emit()
+
+    # --- Chunked results ---
+    def begin_stream(self):
+        """
+        Starts merging a result that arrives in chunks. Rows that are already
+        shown stay until end_stream(), so a reload does not blank the list.
+        Each chunk only touches its own rows.
+        """
+        self._stream_seen = set(); self._stream_cursor = 0
+
+    def add_stream_chunk(self, items: List[ListItem]):
+        """
+        Places each incoming item right after the previous one. An item that is
+        already shown further down stays where it is, and the rows it skips
+        over wait for end_stream(). New items are inserted in runs.
+        """
+        if self._stream_seen is None: self.begin_stream()
+        seen = self._stream_seen; i = 0
+        while i < len(items):
+            item = items[i]; row = self.row_of(item.id)
+            if row == -1:
+                end = i + 1
+                while end < len(items) and items[end].id not in self._row_index: end += 1
+                run = items[i:end]; cursor = self._stream_cursor
+                self.beginInsertRows(QModelIndex(), cursor, cursor + len(run) - 1); self._items[cursor:cursor] = run; self._index_inserted(cursor, len(run)); self.endInsertRows()
+                seen.update(x.id for x in run); self._stream_cursor += len(run); i = end; continue
+            if item.id in seen: i += 1; continue # Duplicate id within one result
+            if row >= self._stream_cursor: self._stream_cursor = row + 1
+            elif row < self._stream_cursor - 1 and self.beginMoveRows(QModelIndex(), row, row, QModelIndex(), self._stream_cursor):
+                # Seen earlier than the rows already confirmed: move it up to the cursor.
+                # (A row just above the cursor, e.g. after remove_id() during the stream, is already in place.)
+                moved = self._items.pop(row); self._index_removed(row, [moved]); self._items.insert(self._stream_cursor - 1, moved); self._index_inserted(self._stream_cursor - 1, 1)
+                self.endMoveRows(); row = self._stream_cursor - 1
+            seen.add(item.id)
+            if self._items[row] is not item and self._items[row] != item:
+                self._items[row] = item; changed = self.index(row); self.dataChanged.emit(changed, changed)
+            i += 1
+
+    def end_stream(self):
+        """Removes the rows the finished result did not contain."""
+        seen = self._stream_seen; self._stream_seen = None
+        if seen is None: return
+        row = len(self._items) - 1; removed_any = False
+        while row >= 0:
+            if self._items[row].id in seen: row -= 1; continue
+            end = row
+            while row >= 0 and self._items[row].id not in seen: row -= 1
+            self.beginRemoveRows(QModelIndex(), row + 1, end); del self._items[row + 1:end + 1]; self.endRemoveRows(); removed_any = True
+        if removed_any: self._reindex()
+
+    def put_first(self, item: ListItem):
+        """Inserts `item` at the top, or moves the row with the same id there and replaces its data."""
+        row = self.row_of(item.id)
+        if self._stream_seen is not None:
+            # Keep it through the running stream, which may have been read before it was saved.
+            self._stream_seen.add(item.id)
+            if row == -1 or row >= self._stream_cursor: self._stream_cursor += 1
+        if row == -1:
+            self.beginInsertRows(QModelIndex(), 0, 0); self._items.insert(0, item); self._index_inserted(0, 1); self.endInsertRows()
+            return
+        if row > 0:
+            # A move (rather than remove + insert) keeps the selection on the row.
+            self.beginMoveRows(QModelIndex(), row, row, QModelIndex(), 0)
+            moved = self._items.pop(row); self._index_removed(row, [moved]); self._items.insert(0, moved); self._index_inserted(0, 1)
+            self.endMoveRows()
+        self._items[0] = item
+        top = self.index(0); self.dataChanged.emit(top, top)
+
+    def remove_id(self, item_id: int) -> bool:
+        row = self.row_of(item_id)
+        if row == -1: return False
+        if self._stream_seen is not None:
+            self._stream_seen.discard(item_id)
+            if row < self._stream_cursor: self._stream_cursor -= 1
+        self.beginRemoveRows(QModelIndex(), row, row); self._index_removed(row, [self._items.pop(row)]); self.endRemoveRows()
+        return True
+
+def _longest_increasing(values: List[int]) -> List[int]:
+    """Sorted values of one longest strictly increasing subsequence of `values`."""
+    tails: List[int] = []; tail_index: List[int] = []; parent = [-1] * len(values)
+    for i, value in enumerate(values):
+        k = bisect.bisect_left(tails, value)
+        if k: parent[i] = tail_index[k - 1]
+        if k == len(tails): tails.append(value); tail_index.append(i)
+        else: tails[k] = value; tail_index[k] = i
+    result = []; i = tail_index[-1] if tail_index else -1
+    while i != -1: result.append(values[i]); i = parent[i]
+    return result[::-1]
+
+def item_date_text(item: ListItem) -> str:
+    date_obj = item.updated_at if isinstance(item, Note) else item.created_at # Notes show last change, snippets creation
+    return date_obj.strftime("%Y-%m-%d %H:%M") if date_obj else "No date"
+
+def item_tooltip(item: ListItem) -> str:
+    fmt = lambda dt: dt.strftime('%Y-%m-%d %H:%M:%S') if dt else 'N/A'
+    if isinstance(item, Snippet):
+        parts = [f"Title: {item.title or 'N/A'}", f"Language: {item.language or 'N/A'}", f"Tags: {item.tags or 'None'}", f"Created: {fmt(item.created_at)}"]
+    else:
+        parts = [f"Title: {item.title or 'N/A'}", f"Tags: {item.tags or 'None'}", f"Created: {fmt(item.created_at)}", f"Updated: {fmt(item.updated_at)}"]
+    return "\n".join(parts)
+
+def _blend(foreground: QColor, background: QColor, amount: float) -> QColor:
+    return QColor(int(foreground.red() * amount + background.red() * (1 - amount)), int(foreground.green() * amount + background.green() * (1 - amount)), int(foreground.blue() * amount + background.blue() * (1 - amount)))
+
+class ItemDelegate(QStyledItemDelegate):
+    """
+    Paints a row as a bold title line and a muted detail line
+    ("Lang: ...", "Tags: ..." on the left, the date on the right).
+    Every row has the same height, so the view never measures rows.
+    """
+    MARGIN_H = 5; MARGIN_V = 3; LINE_SPACING = 2; DETAIL_SPACING = 6
+    TITLE_POINT_SIZE = 12; DETAIL_POINT_SIZE = 10
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._font_key = None
+
+    def _fonts(self, base: QFont):
+        if self._font_key != base.key():
+            self._font_key = base.key()
+            self._title_font = QFont(base); self._title_font.setBold(True); self._title_font.setPointSize(self.TITLE_POINT_SIZE)
+            self._detail_font = QFont(base); self._detail_font.setPointSize(self.DETAIL_POINT_SIZE)
+            self._title_metrics = QFontMetrics(self._title_font); self._detail_metrics = QFontMetrics(self._detail_font)
+            self._row_height = self.MARGIN_V * 2 + self._title_metrics.height() + self.LINE_SPACING + self._detail_metrics.height()
+
+    def sizeHint(self, option: QStyleOptionViewItem, index: QModelIndex) -> QSize:
+        self._fonts(option.font)
+        return QSize(0, self._row_height) # Width follows the viewport
+
+    def paint(self, painter: QPainter, option: QStyleOptionViewItem, index: QModelIndex):
+        item = index.data(ITEM_ROLE)
+        if item is None: return super().paint(painter, option, index)
+        self._fonts(option.font)
+        opt = QStyleOptionViewItem(option); self.initStyleOption(opt, index); opt.text = "" # Background, selection and focus only
+        widget = opt.widget; style = widget.style() if widget else QApplication.style()
+        style.drawControl(QStyle.ControlElement.CE_ItemViewItem, opt, painter, widget)
+
+        selected = bool(opt.state & QStyle.StateFlag.State_Selected)
+        palette = opt.palette
+        text_color = palette.color(QPalette.ColorRole.HighlightedText if selected else QPalette.ColorRole.Text)
+        detail_color = _blend(text_color, palette.color(QPalette.ColorRole.Highlight if selected else QPalette.ColorRole.Base), 0.65)
+        rect = opt.rect.adjusted(self.MARGIN_H, self.MARGIN_V, -self.MARGIN_H, -self.MARGIN_V)
+
+        painter.save()
+        painter.setPen(text_color); painter.setFont(self._title_font)
+        title_rect = QRect(rect.left(), rect.top(), rect.width(), self._title_metrics.height())
+        painter.drawText(title_rect, Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter, self._title_metrics.elidedText(index.data(Qt.ItemDataRole.DisplayRole), Qt.TextElideMode.ElideRight, rect.width()))
+
+        painter.setPen(detail_color); painter.setFont(self._detail_font)
+        detail_rect = QRect(rect.left(), title_rect.bottom() + 1 + self.LINE_SPACING, rect.width(), self._detail_metrics.height())
+        date_text = item_date_text(item); date_width = self._detail_metrics.horizontalAdvance(date_text)
+        painter.drawText(detail_rect, Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter, date_text)
+        details = []
+        if isinstance(item, Snippet): details.append(f"Lang: {item.language or 'N/A'}")
+        if item.tags: details.append(f"Tags: {item.tags}")
+        if details:
+            available = max(0, rect.width() - date_width - self.DETAIL_SPACING)
+            painter.drawText(QRect(detail_rect.left(), detail_rect.top(), available, detail_rect.height()), Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter, self._detail_metrics.elidedText("  ".join(details), Qt.TextElideMode.ElideRight, available))
+        painter.restore()
+
+class ItemListView(QListView):
+    """QListView set up for large uniform lists of notes or snippets."""
+    def __init__(self, model: ItemListModel, parent=None):
+        super().__init__(parent)
+        self.setModel(model)
+        self.setItemDelegate(ItemDelegate(self))
+        self.setUniformItemSizes(True)
+        self.setSelectionMode(QListView.SelectionMode.SingleSelection)
+        self.setVerticalScrollMode(QListView.ScrollMode.ScrollPerPixel)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff) # Rows elide to the viewport width
+        self.setResizeMode(QListView.ResizeMode.Adjust)
+        self.setMouseTracking(True) # Hover highlight
+
+    def current_item(self) -> Optional[ListItem]:
+        index = self.currentIndex()
+        return index.data(ITEM_ROLE) if index.isValid() else None
+
+# widgets/item_list.py
+# --- END OF FILE item_list.py ---